@@ -0,0 +1,423 @@
+""" Analyze the critical path and available parallelism of a simulation trace
+
+A trace lists the events executed by a simulation, in the order they were executed, as :obj:`TraceRecord` records,
+or as the :obj:`~de_sim.visualize.SimulationEventMessage` records that :obj:`~de_sim.visualize.SpaceTime` reads
+from a plot log or a binary event trace. :obj:`CausalityGraph` builds the graph of the causal dependencies between
+the executions of event handlers in a trace: an execution depends on the execution that sent each of its events,
+and on the previous execution of its object. The longest path through the graph, weighted by the wall time of each
+execution, is its critical path. No parallel simulation of the model can take less time, so the total work divided
+by the length of the critical path bounds the speedup of any parallel simulation. :obj:`TracingEventQueue` records
+a trace, with wall times, of a sequential simulation.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-12-01
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+from array import array
+from collections import namedtuple
+import math
+import time
+
+from de_sim.errors import SimulatorError
+from de_sim.simulator import EventQueue
+from de_sim.visualize import EventCoordinates, SpaceTime
+
+
+TraceRecord = namedtuple('TraceRecord', 'message_type send_coordinates receive_coordinates wall_time '
+                                        'sending_execution execution', defaults=(None, None))
+TraceRecord.__doc__ += (': an event in a trace; a :obj:`~de_sim.visualize.SimulationEventMessage` with the wall '
+                        'time of its execution')
+TraceRecord.message_type.__doc__ += ': the class name of the event message'
+TraceRecord.send_coordinates.__doc__ += ': an :obj:`~de_sim.visualize.EventCoordinates`: the send coordinates'
+TraceRecord.receive_coordinates.__doc__ += ': an :obj:`~de_sim.visualize.EventCoordinates`: the receive coordinates'
+TraceRecord.wall_time.__doc__ += (': the wall time, in seconds, spent executing the event; the share of the event '
+                                  'in the wall time of the execution of its handler')
+TraceRecord.sending_execution.__doc__ += (': the index of the execution that sent the event, or :obj:`None` if it '
+                                          'was sent before the simulation started')
+TraceRecord.execution.__doc__ += (': the index of the execution that handled the event, or :obj:`None` if the trace '
+                                  "doesn't identify executions")
+
+
+class CausalityGraph(object):
+    """ The graph of the causal dependencies between the executions of event handlers in a simulation
+
+    Executions must be added in the order in which they were executed. An event is attributed to the execution
+    that sent it if that is known, as it is in traces recorded by :obj:`TracingEventQueue`. Otherwise, as in plot
+    logs and binary event traces, it is attributed to the latest execution of the sending object at the send time.
+    That over-approximates the dependencies, and may overstate the critical path: if an object executes more than
+    once at a time, for example after it sends itself an event with no delay, events sent by its earlier
+    executions are attributed to its last one; and events sent before the simulation starts may be attributed to
+    an execution that didn't send them.
+
+    Attributes:
+        names (:obj:`list` of :obj:`str`): the name of the object that performs each execution
+        times (:obj:`array.array`): the simulation time of each execution
+        work (:obj:`array.array`): the work, such as wall time, of each execution
+        predecessors (:obj:`list` of :obj:`tuple`): the indices of the executions that each execution depends on
+        finish (:obj:`array.array`): the length of the longest path that ends with each execution
+        executions_at (:obj:`dict`): map from each (object name, simulation time) to the index of the latest
+            execution of the object at the time
+        latest_executions (:obj:`dict`): map from each object's name to the index of its latest execution
+    """
+
+    def __init__(self):
+        self.names = []
+        self.times = array('d')
+        self.work = array('d')
+        self.predecessors = []
+        self.finish = array('d')
+        self.executions_at = {}
+        self.latest_executions = {}
+
+    def add_execution(self, name, sim_time, send_coordinates, work=1., senders=None):
+        """ Add an execution of an object's event handler
+
+        Args:
+            name (:obj:`str`): the name of the object
+            sim_time (:obj:`float`): the simulation time of the execution
+            send_coordinates (:obj:`iterable` of :obj:`~de_sim.visualize.EventCoordinates`): the send coordinates
+                of the events that the execution handles
+            work (:obj:`float`, optional): the work of the execution
+            senders (:obj:`iterable` of :obj:`int`, optional): the indices of the executions that sent the events;
+                if provided, `send_coordinates` isn't used to find them
+
+        Returns:
+            :obj:`int`: the index of the execution
+        """
+        predecessors = set()
+        previous = self.latest_executions.get(name)
+        if previous is not None:
+            predecessors.add(previous)
+        if senders is not None:
+            predecessors.update(senders)
+        else:
+            for sim_obj_id, send_time in send_coordinates:
+                sender = self.executions_at.get((sim_obj_id, send_time))
+                if sender is not None:
+                    predecessors.add(sender)
+        predecessors = tuple(sorted(predecessors))
+        index = len(self.names)
+        self.names.append(name)
+        self.times.append(sim_time)
+        self.work.append(work)
+        self.predecessors.append(predecessors)
+        finish = self.finish
+        finish.append(work + max((finish[predecessor] for predecessor in predecessors), default=0.))
+        self.executions_at[(name, sim_time)] = index
+        self.latest_executions[name] = index
+        return index
+
+    def add_trace(self, trace):
+        """ Add the executions in a trace
+
+        Events are grouped into executions by the records' `execution` indices. If a trace doesn't identify
+        executions, consecutive events received by an object at the same time are handled by one execution. The
+        work of an execution is the sum of the wall times of its events, or, if the trace contains
+        :obj:`~de_sim.visualize.SimulationEventMessage` records, which lack wall times, the number of events.
+
+        Args:
+            trace (:obj:`iterable` of :obj:`TraceRecord` or :obj:`~de_sim.visualize.SimulationEventMessage`):
+                the events executed by a simulation, in the order they were executed
+        """
+        # the indices of the trace's executions are offset by the executions already in the graph
+        offset = len(self.names)
+        key = None
+        receive_coordinates = None
+        send_coordinates = []
+        senders = None
+        work = 0.
+        for record in trace:
+            execution = getattr(record, 'execution', None)
+            record_key = record.receive_coordinates if execution is None else execution
+            if record_key != key:
+                if send_coordinates:
+                    self.add_execution(*receive_coordinates, send_coordinates, work=work, senders=senders)
+                key = record_key
+                receive_coordinates = record.receive_coordinates
+                send_coordinates = []
+                senders = None if execution is None else []
+                work = 0.
+            send_coordinates.append(record.send_coordinates)
+            if senders is not None and record.sending_execution is not None:
+                senders.append(offset + record.sending_execution)
+            work += getattr(record, 'wall_time', 1.)
+        if send_coordinates:
+            self.add_execution(*receive_coordinates, send_coordinates, work=work, senders=senders)
+
+    @classmethod
+    def read_plot_log(cls, plot_file):
+        """ Build the causality graph of a plot log, or of a binary event trace, in which each event's work is 1
+
+        Args:
+            plot_file (:obj:`str`): filename of a plot log, or of a trace written by :obj:`~de_sim.trace.TraceWriter`
+
+        Returns:
+            :obj:`CausalityGraph`: the causality graph of the events in the plot log
+        """
+        graph = cls()
+        graph.add_trace(SpaceTime().get_data(plot_file))
+        return graph
+
+    def get_total_work(self):
+        """ Get the total work of the executions
+
+        Returns:
+            :obj:`float`: the total work
+        """
+        return math.fsum(self.work)
+
+    def get_critical_path_length(self):
+        """ Get the length of the critical path
+
+        Returns:
+            :obj:`float`: the total work of the executions on the critical path
+        """
+        return max(self.finish, default=0.)
+
+    def get_max_speedup(self):
+        """ Get the maximum speedup of a parallel simulation, the total work divided by the critical path's length
+
+        Returns:
+            :obj:`float`: the maximum speedup; NaN if the critical path's length is 0
+        """
+        critical_path_length = self.get_critical_path_length()
+        if not critical_path_length:
+            return math.nan
+        return self.get_total_work() / critical_path_length
+
+    def get_critical_path(self):
+        """ Get the critical path
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.visualize.EventCoordinates`: the coordinates of the executions on the
+            critical path, in causal order
+        """
+        if not self.names:
+            return []
+        finish = self.finish
+        index = max(range(len(finish)), key=finish.__getitem__)
+        path = []
+        while index is not None:
+            path.append(EventCoordinates(self.names[index], self.times[index]))
+            index = max(self.predecessors[index], key=finish.__getitem__, default=None)
+        path.reverse()
+        return path
+
+    def get_parallelism_profile(self, num_bins=10):
+        """ Get the distribution of the available parallelism over simulation time
+
+        Simulation time, from the first execution to the last one, is divided into `num_bins` intervals of equal
+        length. The parallelism available in an interval is the work of the executions in it divided by the length
+        of the longest path through them, which ignores dependencies on executions in earlier intervals.
+
+        Args:
+            num_bins (:obj:`int`, optional): the number of intervals
+
+        Returns:
+            :obj:`list` of :obj:`dict`: for each interval, a :obj:`dict` with its `start` and `end` times,
+            `num_executions`, `work`, `critical_path_length`, and `parallelism`, which is NaN if the interval
+            contains no executions
+
+        Raises:
+            :obj:`SimulatorError`: if `num_bins` is not positive
+        """
+        if num_bins < 1:
+            raise SimulatorError(f"num_bins must be positive, but is {num_bins}")
+        if not self.names:
+            return []
+        start, end = min(self.times), max(self.times)
+        width = (end - start) / num_bins
+        intervals = [min(int((sim_time - start) / width), num_bins - 1) if width else 0 for sim_time in self.times]
+        num_executions = [0] * num_bins
+        work = [0.] * num_bins
+        critical_path_lengths = [0.] * num_bins
+        # the length of the longest path within its interval that ends with each execution
+        finish = array('d', [0.]) * len(self.work)
+        for index, (interval, predecessors) in enumerate(zip(intervals, self.predecessors)):
+            finish[index] = self.work[index] + max((finish[predecessor] for predecessor in predecessors
+                                                    if intervals[predecessor] == interval), default=0.)
+            num_executions[interval] += 1
+            work[interval] += self.work[index]
+            if critical_path_lengths[interval] < finish[index]:
+                critical_path_lengths[interval] = finish[index]
+
+        profile = []
+        for interval in range(num_bins):
+            length = critical_path_lengths[interval]
+            profile.append(dict(start=start + interval * width,
+                                end=start + (interval + 1) * width if interval < num_bins - 1 else end,
+                                num_executions=num_executions[interval], work=work[interval],
+                                critical_path_length=length,
+                                parallelism=work[interval] / length if length else math.nan))
+        return profile
+
+    def report(self, num_bins=10):
+        """ Describe the critical path and the available parallelism
+
+        Args:
+            num_bins (:obj:`int`, optional): the number of intervals in the parallelism profile
+
+        Returns:
+            :obj:`str`: a report of the total work, the critical path, the maximum speedup, and the profile of the
+            available parallelism made by :obj:`get_parallelism_profile`
+        """
+        critical_path = self.get_critical_path()
+        lines = [f"{len(self.names)} executions by {len(set(self.names))} objects",
+                 f"total work: {self.get_total_work():.6g}",
+                 f"critical path: {len(critical_path)} executions, length {self.get_critical_path_length():.6g}",
+                 f"maximum speedup: {self.get_max_speedup():.2f}",
+                 "parallelism over simulation time:",
+                 f"{'start':>12}{'end':>12}{'executions':>12}{'work':>12}{'parallelism':>12}"]
+        for interval in self.get_parallelism_profile(num_bins=num_bins):
+            lines.append(f"{interval['start']:>12.6g}{interval['end']:>12.6g}{interval['num_executions']:>12}"
+                         f"{interval['work']:>12.6g}{interval['parallelism']:>12.2f}")
+        return '\n'.join(lines)
+
+
+class TracingEventQueue(EventQueue):
+    """ An event queue that records a trace of the events that a simulation executes
+
+    The wall time of an execution is measured from when its events are popped from the queue to when the next
+    events are popped, or the trace is read, so it includes the simulator's overhead, and is divided evenly among
+    its events. Each event records the execution that sent it, which is the execution in progress when it was
+    scheduled.
+
+    Attributes:
+        num_executions (:obj:`int`): the number of executions that have started
+        sending_executions (:obj:`dict`): map from the id of each scheduled event to the index of the execution
+            that sent it, or :obj:`None` if it was sent before the simulation started
+    """
+
+    def __init__(self, backend='heap'):
+        """
+        Args:
+            backend (:obj:`str`, optional): the name of the event queue backend
+        """
+        super().__init__(backend=backend)
+        self._trace = []
+        self.num_executions = 0
+        self.sending_executions = {}
+        # the index of the execution in progress
+        self._current_execution = None
+        # the records of the events being executed, without wall times, and the time their execution started
+        self._executing = None
+
+    @classmethod
+    def install(cls, simulator, **kwargs):
+        """ Make a simulator record a trace of the events it executes
+
+        Args:
+            simulator (:obj:`~de_sim.simulator.Simulator`): a simulator that hasn't been initialized
+            kwargs (:obj:`dict`): arguments for the new event queue's constructor
+
+        Returns:
+            :obj:`TracingEventQueue`: the simulator's new event queue
+
+        Raises:
+            :obj:`SimulatorError`: if events have already been scheduled
+        """
+        if simulator.event_queue.len() or simulator.event_queue.deferred_events:
+            raise SimulatorError("a trace must be recorded before events are scheduled")
+        simulator.event_queue = cls(**kwargs)
+        return simulator.event_queue
+
+    @property
+    def trace(self):
+        """ Get the trace, including the execution in progress
+
+        Returns:
+            :obj:`list` of :obj:`TraceRecord`: the events executed, in the order they were executed
+        """
+        self.record_executing()
+        return self._trace
+
+    def record_executing(self):
+        """ Add the events of the execution in progress to the trace, with the wall time spent executing them
+
+        The execution's wall time is measured up to now. This is called when the next events are popped, and
+        when the trace is read, as a stop condition can end a simulation without popping more events.
+        """
+        if self._executing is not None:
+            records, start = self._executing
+            wall_time = (time.perf_counter() - start) / len(records)
+            self._trace.extend(TraceRecord(*record[:3], wall_time, *record[3:]) for record in records)
+            self._executing = None
+
+    def record_senders(self, events):
+        """ Record that the execution in progress sent events
+
+        Args:
+            events (:obj:`iterable` of :obj:`~de_sim.event.Event`): the events
+        """
+        for event in events:
+            self.sending_executions[id(event)] = self._current_execution
+
+    def schedule_event(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Schedule an event, and record the execution that sent it
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_event`.
+        """
+        event = super().schedule_event(send_time, receive_time, sending_object, receiving_object, event_message)
+        self.record_senders((event,))
+        return event
+
+    def schedule_events(self, events_args):
+        """ Schedule events, and record the execution that sent them
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_events`.
+        """
+        events = super().schedule_events(events_args)
+        self.record_senders(events)
+        return events
+
+    def schedule_multicast(self, send_time, receive_time, sending_object, receiving_objects, event_message):
+        """ Schedule a multicast's events, and record the execution that sent them
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_multicast`.
+        """
+        events = super().schedule_multicast(send_time, receive_time, sending_object, receiving_objects,
+                                            event_message)
+        self.record_senders(events)
+        return events
+
+    def cancel_event(self, event):
+        """ Cancel a scheduled event, and forget the execution that sent it
+
+        See :obj:`~de_sim.simulator.EventQueue.cancel_event`.
+        """
+        super().cancel_event(event)
+        self.sending_executions.pop(id(event), None)
+
+    def next_event_batch(self, max_time=float('inf')):
+        """ Record the events executed since the last call, and pop the next events
+
+        See :obj:`~de_sim.simulator.EventQueue.next_event_batch`.
+        """
+        self.record_executing()
+        batch = super().next_event_batch(max_time=max_time)
+        events = batch[2]
+        if events:
+            # copy the events' coordinates, as executed events may be recycled
+            execution = self.num_executions
+            sending_executions = self.sending_executions
+            records = [(event.message.__class__.__name__,
+                        EventCoordinates(event.sending_object.name, event.creation_time),
+                        EventCoordinates(event.receiving_object.name, event.event_time),
+                        sending_executions.pop(id(event), None),
+                        execution) for event in events]
+            self.num_executions += 1
+            self._current_execution = execution
+            self._executing = (records, time.perf_counter())
+        return batch
+
+    def get_causality_graph(self):
+        """ Get the causality graph of the trace
+
+        Returns:
+            :obj:`CausalityGraph`: the causality graph of the trace
+        """
+        graph = CausalityGraph()
+        graph.add_trace(self.trace)
+        return graph
@@ -0,0 +1,220 @@
+""" Run ensembles of simulations, such as parameter sweeps and stochastic replicates, on a pool of processes
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-25
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import itertools
+import numpy
+import os
+
+from de_sim.errors import SimulatorError
+from de_sim.simulator import Simulator
+
+EnsembleRun = namedtuple('EnsembleRun', 'index params seed return_value sim_metadata results')
+EnsembleRun.__doc__ += ': the outcome of one simulation run in an ensemble'
+EnsembleRun.index.__doc__ += ": the run's index in the ensemble"
+EnsembleRun.params.__doc__ += ": the model parameters used by the run"
+EnsembleRun.seed.__doc__ += ": the run's random seed"
+EnsembleRun.return_value.__doc__ += (": the :obj:`~de_sim.simulator.Simulator.SimulationReturnValue` returned by "
+                                     "the run; its `profile_stats` are not returned")
+EnsembleRun.sim_metadata.__doc__ += (": the run's :obj:`~de_sim.simulation_metadata.SimulationMetadata`, "
+                                     "prepared to be pickled")
+EnsembleRun.results.__doc__ += ": the value returned by the ensemble's `get_results` function, or `None`"
+
+
+def parameter_grid(grid):
+    """ Get all combinations of the values of some parameters
+
+    Args:
+        grid (:obj:`dict`): map from each parameter's name to a list of its values
+
+    Returns:
+        :obj:`list` of :obj:`dict`: a map from parameter name to value for each combination, in the
+        order of :obj:`itertools.product`
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*[grid[name] for name in names])]
+
+
+def run_seed(base_seed, index):
+    """ Derive the seed of a run in an ensemble from the ensemble's base seed and the run's index
+
+    Seeds are derived with :obj:`numpy.random.SeedSequence`, so that runs receive statistically
+    independent seeds, which depend only on `base_seed` and `index`.
+
+    Args:
+        base_seed (:obj:`int`): the ensemble's base seed
+        index (:obj:`int`): the index of the run in the ensemble
+
+    Returns:
+        :obj:`int`: the run's seed, in `[0, 2**32)`
+    """
+    seed_sequence = numpy.random.SeedSequence(base_seed, spawn_key=(index,))
+    return int(seed_sequence.generate_state(1, numpy.uint32)[0])
+
+
+def _run_simulation(build_model, get_results, config_dict, index, params, seed):
+    """ Build and run one simulation in an ensemble
+
+    Args:
+        build_model (:obj:`callable`): the ensemble's model builder
+        get_results (:obj:`callable`): the ensemble's results getter, or `None`
+        config_dict (:obj:`dict`): the simulation configuration of the ensemble's runs
+        index (:obj:`int`): the run's index
+        params (:obj:`dict`): the run's parameters
+        seed (:obj:`int`): the run's seed
+
+    Returns:
+        :obj:`EnsembleRun`: the outcome of the run
+    """
+    config_dict = dict(config_dict)
+    if config_dict.get('output_dir'):
+        config_dict['output_dir'] = os.path.join(config_dict['output_dir'], str(index))
+    if config_dict.get('trace_file'):
+        root, extension = os.path.splitext(config_dict['trace_file'])
+        config_dict['trace_file'] = f"{root}.{index}{extension}"
+    simulator = Simulator()
+    build_model(simulator, params, seed)
+    simulator.initialize()
+    return_value = simulator.simulate(config_dict=config_dict)
+    results = None
+    if get_results is not None:
+        results = get_results(simulator)
+    return EnsembleRun(index, params, seed, Simulator.SimulationReturnValue(return_value.num_events),
+                       simulator.sim_metadata.prepare_to_pickle(), results)
+
+
+def _run_chunk(build_model, get_results, config_dict, runs):
+    """ Run a chunk of the simulations in an ensemble
+
+    Args:
+        build_model (:obj:`callable`): the ensemble's model builder
+        get_results (:obj:`callable`): the ensemble's results getter, or `None`
+        config_dict (:obj:`dict`): the simulation configuration of the ensemble's runs
+        runs (:obj:`list` of :obj:`tuple`): an `(index, params, seed)` triple for each run
+
+    Returns:
+        :obj:`list` of :obj:`EnsembleRun`: the outcomes of the runs
+    """
+    return [_run_simulation(build_model, get_results, config_dict, *run) for run in runs]
+
+
+def run_ensemble(build_model, max_time=None, params=None, num_replicates=1, seeds=None, base_seed=None,
+                 config_dict=None, get_results=None, max_workers=None, chunksize=1, max_pending=None):
+    """ Run an ensemble of simulations on a pool of processes, and yield their outcomes as they finish
+
+    The ensemble runs each replicate of each parameter combination in `params`. Runs are numbered in
+    order, with the replicates of a parameter combination numbered consecutively. Each run builds
+    a new :obj:`~de_sim.simulator.Simulator` and calls `build_model(simulator, params, seed)`, which must add
+    the model's simulation objects to the simulator, and use `seed` to seed their random number generators.
+    The simulator is then initialized and simulated.
+
+    A run's seed depends only on its index and on the `seeds` or `base_seed` arguments, so
+    an ensemble produces the same results regardless of the number of processes that run it or the
+    order in which runs finish.
+
+    `build_model` and `get_results` are sent to worker processes, and must therefore be picklable,
+    e.g., module-level functions. At most `max_pending` chunks of `chunksize` runs are submitted to the pool
+    at once, so that large ensembles do not queue all of their runs' arguments.
+
+    Args:
+        build_model (:obj:`callable`): a function which builds a model in a simulator, given the simulator,
+            a parameter combination and a seed
+        max_time (:obj:`float`, optional): the maximum time of each run; must be provided, unless it is in
+            `config_dict`
+        params (:obj:`list` of :obj:`dict`, optional): parameter combinations, as returned by
+            :obj:`parameter_grid`; if not provided, each run receives an empty :obj:`dict`
+        num_replicates (:obj:`int`, optional): the number of runs of each parameter combination
+        seeds (:obj:`list` of :obj:`int`, optional): a seed for each replicate of a parameter combination;
+            if provided, `num_replicates` is `len(seeds)`
+        base_seed (:obj:`int`, optional): if `seeds` is not provided, a seed from which each run's seed
+            is derived by :obj:`run_seed`; if neither is provided, a random base seed is used
+        config_dict (:obj:`dict`, optional): the simulation configuration of every run, as used by
+            :obj:`~de_sim.simulator.Simulator.simulate`; if it contains an `output_dir`, each run writes to
+            a subdirectory named by its index; if it contains a `trace_file`, each run writes its trace to a
+            file whose name has the run's index inserted before the extension
+        get_results (:obj:`callable`, optional): a function which obtains a run's picklable results from
+            its simulator after the run ends
+        max_workers (:obj:`int`, optional): the number of worker processes; defaults to the number of CPUs;
+            if 0, the runs execute in this process
+        chunksize (:obj:`int`, optional): the number of runs sent to a worker at once
+        max_pending (:obj:`int`, optional): the maximum number of chunks submitted to the pool at once;
+            defaults to twice the number of workers
+
+    Returns:
+        :obj:`generator` of :obj:`EnsembleRun`: the outcome of each run, in the order in which runs finish
+
+    Raises:
+        :obj:`SimulatorError`: if the arguments are inconsistent
+    """
+    config_dict = dict(config_dict or {})
+    if max_time is not None:
+        if 'max_time' in config_dict:
+            raise SimulatorError('max_time cannot be provided in both max_time and config_dict')
+        config_dict['max_time'] = max_time
+    if 'max_time' not in config_dict:
+        raise SimulatorError('max_time must be provided')
+    if params is None:
+        params = [{}]
+    if seeds is not None:
+        if base_seed is not None:
+            raise SimulatorError('seeds and base_seed cannot both be provided')
+        num_replicates = len(seeds)
+    if num_replicates < 1:
+        raise SimulatorError(f"num_replicates must be positive, but is {num_replicates}")
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    if max_workers < 0:
+        raise SimulatorError(f"max_workers must be non-negative, but is {max_workers}")
+    if chunksize < 1:
+        raise SimulatorError(f"chunksize must be positive, but is {chunksize}")
+    if max_pending is None:
+        max_pending = 2 * max_workers
+    if max_pending < 1 and max_workers:
+        raise SimulatorError(f"max_pending must be positive, but is {max_pending}")
+    if seeds is None and base_seed is None:
+        base_seed = numpy.random.SeedSequence().entropy
+
+    return _run_ensemble(build_model, get_results, config_dict, params, num_replicates, seeds, base_seed,
+                         max_workers, chunksize, max_pending)
+
+
+def _run_ensemble(build_model, get_results, config_dict, params, num_replicates, seeds, base_seed,
+                  max_workers, chunksize, max_pending):
+    """ Generate the outcomes of an ensemble's runs; see :obj:`run_ensemble`, which validates the arguments
+    """
+    def runs():
+        for index, (param_combination, replicate) in enumerate(itertools.product(params,
+                                                                                 range(num_replicates))):
+            if seeds is not None:
+                seed = seeds[replicate]
+            else:
+                seed = run_seed(base_seed, index)
+            yield (index, param_combination, seed)
+
+    if not max_workers:
+        for run in runs():
+            yield _run_simulation(build_model, get_results, config_dict, *run)
+        return
+
+    chunks = iter(lambda runs=runs(): list(itertools.islice(runs, chunksize)), [])
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        try:
+            for chunk in itertools.islice(chunks, max_pending):
+                pending.add(executor.submit(_run_chunk, build_model, get_results, config_dict, chunk))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                # keep the pool busy while the finished runs are consumed
+                for chunk in itertools.islice(chunks, len(done)):
+                    pending.add(executor.submit(_run_chunk, build_model, get_results, config_dict, chunk))
+                for future in done:
+                    yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -6,6 +6,9 @@
 :License: MIT
 """
 
+import sys
+
+from de_sim.errors import SimulatorError
 from wc_utils.util.misc import round_direct
 from wc_utils.util.list import elements_to_str
 
@@ -24,6 +27,9 @@ class Event(object):
     is a unique value for each instance of the receiving object's class.
     This is implemented by the comparison operators for :obj:`Event` below. This ordering achieves
     deterministic and reproducible simulations. (For more theory, see Jefferson's LLNL course.)
+    When a :obj:`~de_sim.simulator.Simulator` is initialized it may give each simulation object an integer
+    `event_rank`, which preserves the order of the objects' (class priority, tiebreaker) pairs. Then the
+    sub-time of an event is the receiving object's `event_rank`, which is cheaper to compare.
 
     Attributes:
         creation_time (:obj:`float`): simulation time when the event is created (aka `send_time`)
@@ -32,16 +38,18 @@ class Event(object):
         receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): reference to the object that receives
             (aka executes) the event
         _order_time (:obj:`tuple`): the event time, sub-time that's used to sort events; cached
-            to improve performance
+            to improve performance; the sub-time is the receiving object's `event_rank`, if it has one
         message (:obj:`~de_sim.event_message.EventMessage`): an :obj:`~de_sim.event_message.EventMessage` carried by
             the event; its type provides the simulation application's type for an :obj:`Event`; it may also carry a
             payload for the :obj:`Event` in its attribute(s) identified in its slots.
+        live (:obj:`bool`): whether the event is still scheduled; set :obj:`False` when the event is
+            cancelled, or removed from the event queue for execution
     """
-    # TODO(Arthur): for performance, perhaps pre-allocate and reuse events
+    # for performance, a simulator can reuse events via an EventPool
 
     # use __slots__ to save space
     # TODO(Arthur): figure out how to stop Sphinx from documenting these __slots__ as attributes
-    __slots__ = "creation_time event_time sending_object receiving_object _order_time message".split()
+    __slots__ = "creation_time event_time sending_object receiving_object _order_time message live".split()
     BASE_HEADERS = ['t(send)', 't(event)', 'Sender', 'Receiver', 'Event type']
 
     def __init__(self, creation_time, event_time, sending_object, receiving_object, message):
@@ -52,6 +60,7 @@ class Event(object):
         # precompute _order_time to speed up simulation
         self._order_time = self._get_order_time()
         self.message = message
+        self.live = True
 
     def _get_order_time(self):
         """ Provide the tuple that determines this event's execution order
@@ -59,8 +68,12 @@ class Event(object):
         Returns:
             :obj:`tuple`: the tuple that determines this event's execution order
         """
-        return (self.event_time, self.receiving_object.class_event_priority,
-                self.receiving_object.event_time_tiebreaker)
+        receiving_object = self.receiving_object
+        if receiving_object.event_rank is not None:
+            # the receiver's rank encodes (class priority, tiebreaker) in one int, which compares quickly
+            return (self.event_time, receiving_object.event_rank)
+        return (self.event_time, receiving_object.class_event_priority,
+                receiving_object.event_time_tiebreaker)
 
     def __lt__(self, other):
         """ Does this :obj:`Event` occur earlier than `other`?
@@ -191,3 +204,99 @@ class Event(object):
             delimited by tabs
         """
         return self.render()
+
+
+def _measure_unreferenced_refcount():
+    """ Measure the reference count of an event that nothing else references, in `EventPool.release()`'s loop
+
+    Whether the interpreter holds references to a loop variable and to the argument of `sys.getrefcount()`
+    depends on its version, so the count is measured in a loop with the same shape as the one in `release()`.
+
+    Returns:
+        :obj:`int`: the reference count of an unreferenced event in `release()`
+    """
+    events = [Event.__new__(Event)]
+    getrefcount = sys.getrefcount
+    for event in events:
+        return getrefcount(event)
+
+
+class EventPool(object):
+    """ A free list of :obj:`Event`\ s, which recycles executed events to reduce allocation
+
+    A :obj:`~de_sim.simulator.Simulator` that recycles events returns each list of events to its pool
+    after they've been handled, and its event queue creates new events by reinitializing events in the pool.
+    An event is recycled only if nothing else references it, as determined by its reference count.
+    Thus, an event that a handler or another simulation object retains, such as an event returned by
+    `send_event()`, is not recycled, and references to events remain valid.
+    In `strict` mode, a retained event raises an exception instead, which identifies code that defeats
+    recycling.
+
+    Events' `_order_time` tuples cannot be recycled because tuples are immutable.
+
+    Attributes:
+        strict (:obj:`bool`): if set, raise an exception when an executed event is still referenced
+        free (:obj:`list` of :obj:`Event`): events available for reuse
+        num_allocated (:obj:`int`): number of events allocated by this pool
+        num_reused (:obj:`int`): number of events reused by this pool
+        num_retained (:obj:`int`): number of executed events that were not recycled because they were
+            still referenced
+    """
+    # the reference count of an event being released that no other code references; its references are
+    # held by the list of events, and, depending on the interpreter, the loop variable in `release()` and
+    # the argument of `sys.getrefcount()`
+    UNREFERENCED_REFCOUNT = _measure_unreferenced_refcount()
+
+    def __init__(self, strict=False):
+        """
+        Args:
+            strict (:obj:`bool`, optional): if set, raise an exception when an executed event is still referenced
+        """
+        self.strict = strict
+        self.free = []
+        self.num_allocated = 0
+        self.num_reused = 0
+        self.num_retained = 0
+
+    def get(self, creation_time, event_time, sending_object, receiving_object, message):
+        """ Get an event, reusing a recycled event if one is available
+
+        Args:
+            creation_time (:obj:`float`): simulation time when the event is created
+            event_time (:obj:`float`): simulation time when the event must be executed
+            sending_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object that sends the event
+            receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object that receives the event
+            message (:obj:`~de_sim.event_message.EventMessage`): the event's message
+
+        Returns:
+            :obj:`Event`: an initialized event
+        """
+        if self.free:
+            event = self.free.pop()
+            event.__init__(creation_time, event_time, sending_object, receiving_object, message)
+            self.num_reused += 1
+            return event
+        self.num_allocated += 1
+        return Event(creation_time, event_time, sending_object, receiving_object, message)
+
+    def release(self, events):
+        """ Return executed events to the pool
+
+        Args:
+            events (:obj:`list` of :obj:`Event`): events that have been executed
+
+        Raises:
+            :obj:`SimulatorError`: if `strict` is set and an event is still referenced
+        """
+        getrefcount = sys.getrefcount
+        free = self.free
+        for event in events:
+            if self.UNREFERENCED_REFCOUNT < getrefcount(event):
+                if self.strict:
+                    raise SimulatorError(f"event at time {event.event_time} to '{event.receiving_object.name}' "
+                                         f"is still referenced after it was handled, so it cannot be recycled")
+                self.num_retained += 1
+                continue
+            # drop references, so recycled events don't keep other objects alive
+            event.sending_object = event.receiving_object = event.message = None
+            free.append(event)
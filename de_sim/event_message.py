@@ -23,8 +23,11 @@ class EventMessageInterface(object, metaclass=ABCMeta):
 
     Attributes:
         __slots__ (:obj:`list`): use `__slots__` to save memory because a simulation may contain many event messages
+        _frozen (:obj:`bool`): class attribute indicating whether instances cannot be modified after
+            they're constructed
     """
     __slots__ = []
+    _frozen = False
 
     def __init__(self, *args):
         """ Initialize an :obj:`EventMessage`
@@ -169,7 +172,7 @@ class EventMessageInterface(object, metaclass=ABCMeta):
         Returns:
             :obj:`bool`: :obj:`True` if this :obj:`EventMessage` sorts after `other`
         """
-        return (self.__class__.__name__, self._values()) > (other.__class__.__name__, other._values())
+        return other < self
 
     def __ge__(self, other):
         """ Does this :obj:`EventMessage` sort after or equal `other`?
@@ -183,22 +186,100 @@ class EventMessageInterface(object, metaclass=ABCMeta):
         return not (self < other)
 
 
+# sentinel for required message fields that were not provided to a generated `__init__`
+_MISSING = object()
+
+
+def _wrong_number_of_args(event_message, required_args, num_args):
+    """ Raise an exception for a call to a generated `__init__` with the wrong number of arguments
+
+    Args:
+        event_message (:obj:`EventMessage`): the :obj:`EventMessage` being initialized
+        required_args (:obj:`tuple`): the values of the message's required arguments, with
+            `_MISSING` for those that were not provided
+        num_args (:obj:`int`): the number of arguments provided, if known
+
+    Raises:
+        :obj:`SimulatorError`: always
+    """
+    cls = event_message.__class__
+    num_slots = len(cls.__slots__)
+    num_required = num_slots - len(cls._default_values)
+    if num_args is None:
+        num_args = sum(arg is not _MISSING for arg in required_args)
+    if num_required == num_slots:
+        expected = str(num_slots)
+    else:
+        expected = f"{num_required} to {num_slots}"
+    raise SimulatorError(f"Constructor for EventMessage '{cls.__name__}' expects {expected} argument(s), "
+                         f"but {num_args} provided")
+
+
+def _frozen_setattr(self, name, value):
+    """ Prevent assignment to a field of a frozen :obj:`EventMessage`
+
+    Raises:
+        :obj:`SimulatorError`: always
+    """
+    raise SimulatorError(f"cannot assign to field '{name}' of frozen EventMessage '{self.__class__.__name__}'")
+
+
+def _frozen_delattr(self, name):
+    """ Prevent deletion of a field of a frozen :obj:`EventMessage`
+
+    Raises:
+        :obj:`SimulatorError`: always
+    """
+    raise SimulatorError(f"cannot delete field '{name}' of frozen EventMessage '{self.__class__.__name__}'")
+
+
+def _frozen_reduce(self):
+    """ Reduce a frozen :obj:`EventMessage` to its constructor arguments, so it can be copied and pickled
+
+    Returns:
+        :obj:`tuple`: the message's class and field values
+    """
+    return (self.__class__, tuple(self._values()))
+
+
 class EventMessageMeta(type):
     """ A custom metaclass that customizes the creation of :obj:`EventMessage` subclasses
+
+    Like :obj:`dataclasses`, the metaclass generates code for each subclass' `__init__`, `__lt__`,
+    `__gt__`, `__eq__` and `__hash__` methods, which access the subclass' attributes directly
+    rather than by iterating over `__slots__`. Methods defined in a subclass are not replaced, and
+    a subclass that defines `__lt__` or `__eq__` does not get a generated `__gt__` or `__hash__`.
+    Only frozen subclasses get a value-based `__eq__` and `__hash__`; instances of other subclasses,
+    whose fields may change, keep being equal and hashed by identity, so they can be used in sets and
+    as dictionary keys.
+
+    A subclass defined with the `frozen=True` class keyword, or derived from a frozen subclass, is frozen:
+    its instances raise a :obj:`SimulatorError` if their fields are assigned or deleted after construction.
     """
 
-    def __init__(self, *args, **kwargs):
+    # methods generated for each subclass
+    GENERATED_METHODS = ('__init__', '__lt__', '__gt__', '__eq__', '__hash__')
+
+    def __init__(self, *args, frozen=None, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def __new__(cls, clsname, superclasses, namespace):
+    def __new__(cls, clsname, superclasses, namespace, frozen=None):
         # Short circuit when EventMessage is defined
         if clsname == 'EventMessage':
             return super().__new__(cls, clsname, superclasses, namespace)
 
+        frozen_superclass = any(getattr(superclass, '_frozen', False) for superclass in superclasses)
+        if frozen is False and frozen_superclass:
+            raise SimulatorError(f"EventMessage '{clsname}' cannot be unfrozen, because it is derived from a "
+                                 f"frozen EventMessage")
+        frozen = bool(frozen) or frozen_superclass
+
         if '__doc__' not in namespace:
             warnings.warn(f"EventMessage '{clsname}' definition does not contain a docstring.")
 
-        attrs = {}
+        # keep the class' module and qualified name, so that messages can be pickled, e.g., to send them to
+        # another process
+        attrs = {'__module__': namespace['__module__'], '__qualname__': namespace.get('__qualname__', clsname)}
         msg_attribute_names = []
         if '__annotations__' in namespace:
             for attr in namespace['__annotations__']:
@@ -228,11 +309,89 @@ class EventMessageMeta(type):
                 raise SimulatorError(f"Optional attributes must follow required attributes in {clsname}: "
                                      f"'{attr}' is required but follows optional attribute(s)")
 
+        # generate methods, keeping any that are defined by the subclass
+        generated_methods = cls._generate_methods(attrs['__slots__'], attrs['_default_values'], frozen)
+        for method_name in cls.GENERATED_METHODS:
+            if method_name in namespace:
+                attrs[method_name] = namespace[method_name]
+            elif method_name in generated_methods and not (
+                    (method_name == '__hash__' and '__eq__' in namespace) or
+                    (method_name == '__gt__' and '__lt__' in namespace)):
+                attrs[method_name] = generated_methods[method_name]
+
+        if frozen:
+            attrs['_frozen'] = True
+            attrs['__setattr__'] = _frozen_setattr
+            attrs['__delattr__'] = _frozen_delattr
+            attrs['__reduce__'] = _frozen_reduce
+
         new_simulation_message_class = super().__new__(cls, clsname, superclasses, attrs)
+        for method_name in cls.GENERATED_METHODS:
+            method = attrs.get(method_name)
+            if method is not None and method is generated_methods.get(method_name):
+                method.__qualname__ = f"{clsname}.{method_name}"
         if '__doc__' in namespace:
             new_simulation_message_class.__doc__ = namespace['__doc__'].strip()
         return new_simulation_message_class
 
+    @staticmethod
+    def _generate_methods(slots, default_values, frozen=False):
+        """ Generate the `__init__`, comparison and hash methods for an :obj:`EventMessage` subclass
+
+        Args:
+            slots (:obj:`list` of :obj:`str`): the subclass' attributes
+            default_values (:obj:`dict`): map from optional attributes to their default values
+            frozen (:obj:`bool`, optional): whether the subclass is frozen, in which case `__init__`
+                must bypass its `__setattr__`
+
+        Returns:
+            :obj:`dict`: map from method name to generated function; `__eq__` and `__hash__` are only generated
+            if the subclass is frozen
+        """
+        required = [attr for attr in slots if attr not in default_values]
+        params = [f"{attr}=_MISSING" for attr in required] + \
+            [f"{attr}=_default_{attr}" for attr in slots if attr in default_values]
+        init_lines = [f"def __init__(self, {''.join(param + ', ' for param in params)}*_extra_args):"]
+        required_tuple = ''.join(f"{attr}, " for attr in required)
+        missing_checks = [f"{attr} is _MISSING" for attr in required]
+        init_lines.append(f"    if {' or '.join(missing_checks + ['_extra_args'])}:")
+        init_lines.append(f"        _wrong_number_of_args(self, ({required_tuple}), "
+                          f"{len(slots)} + len(_extra_args) if _extra_args else None)")
+        for attr in slots:
+            if frozen:
+                init_lines.append(f"    _object_setattr(self, '{attr}', {attr})")
+            else:
+                init_lines.append(f"    self.{attr} = {attr}")
+
+        self_values = ''.join(f"self.{attr}, " for attr in slots)
+        other_values = ''.join(f"other.{attr}, " for attr in slots)
+        source_lines = init_lines
+        for method_name, operator in (('__lt__', '<'), ('__gt__', '>')):
+            # messages of different classes are ordered by class name, as in EventMessageInterface
+            source_lines.extend([
+                f"def {method_name}(self, other):",
+                "    if self.__class__ is other.__class__:",
+                f"        return ({self_values}) {operator} ({other_values})",
+                f"    return _EventMessageInterface.{method_name}(self, other)"])
+        if frozen:
+            source_lines.extend([
+                "def __eq__(self, other):",
+                "    if self.__class__ is other.__class__:",
+                f"        return ({self_values}) == ({other_values})",
+                "    return NotImplemented",
+                "def __hash__(self):",
+                f"    return hash((self.__class__, {self_values}))"])
+
+        namespace = {'_MISSING': _MISSING,
+                     '_object_setattr': object.__setattr__,
+                     '_wrong_number_of_args': _wrong_number_of_args,
+                     '_EventMessageInterface': EventMessageInterface}
+        for attr, default_val in default_values.items():
+            namespace[f"_default_{attr}"] = default_val
+        exec('\n'.join(source_lines), namespace)
+        return {method_name: namespace[method_name] for method_name in EventMessageMeta.GENERATED_METHODS
+                if method_name in namespace}
+
 
 class CombinedEventMessageMeta(ConcreteABCMeta, EventMessageMeta):
     pass
@@ -260,12 +419,27 @@ class EventMessage(EventMessageInterface, metaclass=CombinedEventMessageMeta):
 
     creates an instance of the class.
 
-    However, as of 2020-10, :obj:`EventMessage` does not use default values or types which may be
-    provided.
+    Optional fields take their default values if they're not provided, so
+    `ExampleEventMessage(3)` sets `attr2` to `1.1`. Fields may also be provided as keyword
+    arguments. Types are not checked, except for those of default values.
+
+    Messages whose fields will not be modified after they're sent can be declared frozen::
+
+        class FrozenEventMessage(EventMessage, frozen=True):
+            "Docstring for FrozenEventMessage"
+            attr1: int
+
+    A frozen message raises a :obj:`~de_sim.errors.SimulatorError` if a field is assigned. Frozen
+    messages can be shared by events safely, so they are not copied when they are sent, even if
+    copying is requested by the `copy` argument of
+    :obj:`~de_sim.simulation_object.BaseSimulationObject.send_event` or the `copy_event_bodies`
+    configuration option.
 
     :obj:`EventMessage` subclasses must support the comparison operations `<`, `<=`, etc. This is
     provided automatically for message fields that support comparison. :obj:`EventMessage`
     subclasses with message fields that do not support comparison must override `__lt__`,
-    `__le__`, etc.
+    `__le__`, etc. Two frozen messages are equal if they are instances of the same class and
+    their field values are equal, and frozen messages with hashable field values are hashable.
+    Messages that aren't frozen are equal only to themselves, and are hashed by identity.
     """
     pass
@@ -0,0 +1,689 @@
+""" Priority queue backends that store the events in an :obj:`~de_sim.simulator.EventQueue`
+
+An :obj:`~de_sim.simulator.EventQueue` delegates the storage of its :obj:`~de_sim.event.Event`\ s
+to a backend. All backends order events identically, by the order provided by the comparison
+operations in :obj:`~de_sim.event.Event`, so the choice of backend affects only performance,
+not simulation results.
+
+* :obj:`HeapEventQueue`: a binary heap; `O(log(n))` schedule and pop
+* :obj:`CalendarEventQueue`: a calendar queue (Brown, 1988); expected `O(1)` schedule and pop when
+  event times are reasonably evenly distributed
+* :obj:`LadderEventQueue`: a ladder queue (Tang, Goh & Thng, 2005); expected `O(1)` schedule and pop,
+  and more robust than a calendar queue to skewed event time distributions
+* :obj:`TwoLevelEventQueue`: a heap of events for each receiving object, and a global heap of the
+  objects' earliest events; `O(log(m))` schedule and pop, where `m` is the number of events at one
+  object, plus `O(log(k))` global operations, where `k` is the number of objects
+
+Brown, R., 1988. Calendar queues: a fast O(1) priority queue implementation for the simulation
+event set problem. Communications of the ACM, 31(10), pp.1220-1227.
+
+Tang, W.T., Goh, R.S.M. and Thng, I.L.J., 2005. Ladder queue: An O(1) priority queue structure for
+large-scale discrete event simulation. ACM Transactions on Modeling and Computer Simulation, 15(3), pp.175-204.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-02
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+from abc import ABCMeta
+import abc
+import bisect
+import heapq
+import itertools
+import math
+
+from de_sim.errors import SimulatorError
+
+
+class EventQueueBackend(object, metaclass=ABCMeta):  # pragma: no cover
+    """ An abstract base class interface for the priority queues that store an event queue's events
+
+    Implementations must pop events in the order provided by the comparison operations
+    in :obj:`~de_sim.event.Event`, including among events with equal event times.
+    """
+
+    @abc.abstractmethod
+    def schedule(self, event):
+        """ Insert an event
+
+        Args:
+            event (:obj:`~de_sim.event.Event`): an event
+        """
+        pass
+
+    def schedule_many(self, events):
+        """ Insert many events
+
+        Backends may override this with a faster implementation.
+
+        Args:
+            events (:obj:`list` of :obj:`~de_sim.event.Event`): events
+        """
+        for event in events:
+            self.schedule(event)
+
+    @abc.abstractmethod
+    def pop(self):
+        """ Remove and return the earliest event
+
+        Returns:
+            :obj:`~de_sim.event.Event`: the earliest event
+
+        Raises:
+            :obj:`IndexError`: if the queue is empty
+        """
+        pass
+
+    @abc.abstractmethod
+    def peek(self):
+        """ Get the earliest event, without removing it
+
+        Returns:
+            :obj:`~de_sim.event.Event`: the earliest event, or :obj:`None` if the queue is empty
+        """
+        pass
+
+    def pop_batch(self):
+        """ Remove and return the earliest event and all events that are simultaneous with it at its receiver
+
+        That is, pop the earliest events that have the same event time and receiving object.
+        Backends may override this with a faster implementation.
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.event.Event`: the earliest events, in the order they were popped
+
+        Raises:
+            :obj:`IndexError`: if the queue is empty
+        """
+        event = self.pop()
+        events = [event]
+        event_time = event.event_time
+        receiving_object = event.receiving_object
+        next_event = self.peek()
+        while (next_event is not None and next_event.event_time == event_time and
+               next_event.receiving_object is receiving_object):
+            events.append(self.pop())
+            next_event = self.peek()
+        return events
+
+    def events_for(self, receiving_object):
+        """ Get the events that will be received by a simulation object
+
+        Backends may override this with a faster implementation.
+
+        Args:
+            receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): a simulation object
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.event.Event`: the events in the queue received by `receiving_object`,
+            in no particular order
+        """
+        return [event for event in self if event.receiving_object is receiving_object]
+
+    def retain(self, keep):
+        """ Remove all events that do not satisfy a predicate
+
+        Backends may override this with a faster implementation.
+
+        Args:
+            keep (:obj:`callable`): a predicate on events; events for which it returns :obj:`False` are removed
+        """
+        events = [event for event in self if keep(event)]
+        self.clear()
+        for event in events:
+            self.schedule(event)
+
+    @abc.abstractmethod
+    def clear(self):
+        """ Remove all events
+        """
+        pass
+
+    @abc.abstractmethod
+    def __len__(self):
+        """ Get the number of events in the queue
+
+        Returns:
+            :obj:`int`: the number of events in the queue
+        """
+        pass
+
+    @abc.abstractmethod
+    def __iter__(self):
+        """ Iterate over the events in the queue, in no particular order
+
+        Returns:
+            :obj:`iterator`: an iterator over the events in the queue
+        """
+        pass
+
+
+class HeapEventQueue(EventQueueBackend):
+    """ A binary heap of events
+
+    The heap is a 'min heap', which keeps the event with the smallest sort order at the root in `heap[0]`.
+
+    Attributes:
+        heap (:obj:`list`): a heap of events
+    """
+
+    def __init__(self):
+        self.heap = []
+
+    def schedule(self, event):
+        heapq.heappush(self.heap, event)
+
+    def schedule_many(self, events):
+        # heapify costs O(n + k), while k pushes cost O(k log(n + k)), so heapify large batches
+        heap = self.heap
+        size = len(heap) + len(events)
+        if len(events) * math.log2(size + 1) < size:
+            for event in events:
+                heapq.heappush(heap, event)
+        else:
+            heap.extend(events)
+            heapq.heapify(heap)
+
+    def pop(self):
+        return heapq.heappop(self.heap)
+
+    def peek(self):
+        if self.heap:
+            return self.heap[0]
+        return None
+
+    def pop_batch(self):
+        heap = self.heap
+        heappop = heapq.heappop
+        event = heappop(heap)
+        events = [event]
+        event_time = event.event_time
+        receiving_object = event.receiving_object
+        while heap and heap[0].event_time == event_time and heap[0].receiving_object is receiving_object:
+            events.append(heappop(heap))
+        return events
+
+    def retain(self, keep):
+        # filtering a heap and re-heapifying it costs O(n)
+        self.heap = [event for event in self.heap if keep(event)]
+        heapq.heapify(self.heap)
+
+    def clear(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        return iter(self.heap)
+
+
+class CalendarEventQueue(EventQueueBackend):
+    """ A calendar queue of events
+
+    Events are hashed on their event time into an array of buckets, like days in a calendar, each of
+    which covers an interval of time `width` long. Each bucket is a sorted list of events.
+    An event at time `t` is stored in *virtual* bucket `floor(t / width)`, which is held in bucket
+    `floor(t / width) % num_buckets`. Events are dequeued by scanning the virtual buckets in increasing
+    order. Virtual bucket numbers are integers, so the scan does not accumulate floating point error, and
+    events with equal event times always share a bucket, which keeps the order of simultaneous events
+    identical to a heap's.
+
+    The number of buckets doubles when the queue holds more than twice as many events as buckets, and halves
+    when it holds fewer than half as many, at which times `width` is re-estimated from the separation of
+    the earliest events.
+    Events with infinite event times are kept in a separate sorted `overflow` list.
+
+    Attributes:
+        num_buckets (:obj:`int`): the number of buckets
+        width (:obj:`float`): the time interval covered by each bucket
+        buckets (:obj:`list` of :obj:`list`): the buckets
+        current_vbucket (:obj:`int`): a lower bound on the virtual bucket that contains the earliest event
+        overflow (:obj:`list`): sorted events whose event times are infinite
+        size (:obj:`int`): the number of events in the queue
+    """
+    MIN_BUCKETS = 2
+    # number of events used to estimate bucket width
+    WIDTH_SAMPLE_SIZE = 25
+
+    def __init__(self, width=1.0):
+        """
+        Args:
+            width (:obj:`float`, optional): the initial bucket width
+        """
+        if not 0 < width < float('inf'):
+            raise SimulatorError(f"width ({width}) must be positive and finite")
+        self.initial_width = width
+        self.clear()
+
+    def clear(self):
+        self.num_buckets = self.MIN_BUCKETS
+        self.width = self.initial_width
+        self.buckets = [[] for _ in range(self.num_buckets)]
+        self.current_vbucket = 0
+        self.overflow = []
+        self.size = 0
+
+    def _vbucket(self, event_time):
+        """ Get the virtual bucket that holds an event time
+
+        Args:
+            event_time (:obj:`float`): a finite event time
+
+        Returns:
+            :obj:`int`: the virtual bucket that holds `event_time`
+        """
+        return int(event_time // self.width)
+
+    def schedule(self, event):
+        if event.event_time == float('inf'):
+            bisect.insort(self.overflow, event)
+        else:
+            vbucket = self._vbucket(event.event_time)
+            bisect.insort(self.buckets[vbucket % self.num_buckets], event)
+            if vbucket < self.current_vbucket:
+                self.current_vbucket = vbucket
+        self.size += 1
+        if 2 * self.num_buckets < self.size:
+            self._resize(2 * self.num_buckets)
+
+    def _find_earliest_bucket(self):
+        """ Find the bucket that contains the earliest finite event
+
+        Advances `current_vbucket` to the virtual bucket of the earliest event.
+
+        Returns:
+            :obj:`list`: the bucket that contains the earliest finite event, or :obj:`None` if
+            no finite events are stored
+        """
+        if len(self.overflow) == self.size:
+            return None
+
+        # scan one year of the calendar
+        buckets = self.buckets
+        num_buckets = self.num_buckets
+        for vbucket in range(self.current_vbucket, self.current_vbucket + num_buckets):
+            bucket = buckets[vbucket % num_buckets]
+            if bucket and self._vbucket(bucket[0].event_time) <= vbucket:
+                self.current_vbucket = vbucket
+                return bucket
+
+        # no event occurs in the year; directly search for the earliest event
+        earliest_bucket = min((bucket for bucket in buckets if bucket), key=lambda bucket: bucket[0])
+        self.current_vbucket = self._vbucket(earliest_bucket[0].event_time)
+        return earliest_bucket
+
+    def pop(self):
+        bucket = self._find_earliest_bucket()
+        if bucket is None:
+            if not self.overflow:
+                raise IndexError('pop from an empty CalendarEventQueue')
+            event = self.overflow.pop(0)
+        else:
+            event = bucket.pop(0)
+        self.size -= 1
+        if self.MIN_BUCKETS < self.num_buckets and self.size < self.num_buckets // 2:
+            self._resize(self.num_buckets // 2)
+        return event
+
+    def peek(self):
+        bucket = self._find_earliest_bucket()
+        if bucket is None:
+            if self.overflow:
+                return self.overflow[0]
+            return None
+        return bucket[0]
+
+    def _estimate_width(self, events):
+        """ Estimate a good bucket width from the separation of the earliest events
+
+        Args:
+            events (:obj:`list` of :obj:`~de_sim.event.Event`): the finite events in the queue
+
+        Returns:
+            :obj:`float`: an estimated bucket width
+        """
+        sample = heapq.nsmallest(self.WIDTH_SAMPLE_SIZE, events)
+        separations = [later.event_time - earlier.event_time
+                       for earlier, later in zip(sample, sample[1:])
+                       if earlier.event_time < later.event_time]
+        if not separations:
+            return self.width
+        width = 3 * sum(separations) / len(separations)
+        if 0 < width < float('inf'):
+            return width
+        return self.width   # pragma: no cover
+
+    def _resize(self, num_buckets):
+        """ Redistribute the events among `num_buckets` buckets
+
+        Args:
+            num_buckets (:obj:`int`): the new number of buckets
+        """
+        events = [event for bucket in self.buckets for event in bucket]
+        self.width = self._estimate_width(events)
+        self.num_buckets = num_buckets
+        self.buckets = [[] for _ in range(num_buckets)]
+        for event in events:
+            self.buckets[self._vbucket(event.event_time) % num_buckets].append(event)
+        for bucket in self.buckets:
+            bucket.sort()
+        if events:
+            self.current_vbucket = self._vbucket(min(events).event_time)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return itertools.chain(itertools.chain.from_iterable(self.buckets), self.overflow)
+
+
+class _Rung(object):
+    """ A rung in a :obj:`LadderEventQueue`
+
+    Attributes:
+        start (:obj:`float`): the start time of the rung's first bucket
+        width (:obj:`float`): the time interval covered by each bucket
+        buckets (:obj:`list` of :obj:`list`): the rung's buckets of unsorted events
+        current (:obj:`int`): index of the first bucket which has not been dequeued
+        count (:obj:`int`): the number of events in buckets that have not been dequeued
+    """
+    __slots__ = "start width buckets current count".split()
+
+    def __init__(self, start, width, num_buckets):
+        self.start = start
+        self.width = width
+        self.buckets = [[] for _ in range(num_buckets)]
+        self.current = 0
+        self.count = 0
+
+    def index(self, event_time):
+        """ Get the index of the bucket that covers an event time, clamped to the rung's buckets
+
+        Args:
+            event_time (:obj:`float`): a finite event time
+
+        Returns:
+            :obj:`int`: the index of the bucket that covers `event_time`
+        """
+        return min(max(int((event_time - self.start) // self.width), 0), len(self.buckets) - 1)
+
+
+class LadderEventQueue(EventQueueBackend):
+    """ A ladder queue of events
+
+    A ladder queue has three tiers:
+
+    * `top`, an unsorted list of events later than all events in the ladder
+    * the `ladder`, a list of :obj:`_Rung`\ s of buckets of unsorted events; each rung below
+      the first subdivides one bucket of the rung above it
+    * `bottom`, a small sorted list of the earliest events
+
+    Events are dequeued from `bottom`. When `bottom` is empty it is refilled by sorting the next
+    non-empty bucket in the lowest rung or, if that bucket holds more than `THRESHOLD` events, by
+    subdividing the bucket into a new rung. When the ladder is empty, `top` is moved into a new first rung.
+    Thus, an event is sorted only when it's near the front of the queue, in a small `bottom`.
+
+    Bucket indices are monotonic in event time, and events with equal event times are always placed in the
+    same bucket. This keeps the order of simultaneous events identical to a heap's.
+
+    Attributes:
+        top (:obj:`list`): unsorted events later than all events in the ladder
+        ladder (:obj:`list` of :obj:`_Rung`): the rungs of the ladder
+        bottom (:obj:`list`): sorted earliest events
+        size (:obj:`int`): the number of events in the queue
+    """
+    # the largest number of events in a bucket that will be sorted into bottom, rather than subdivided
+    THRESHOLD = 50
+    MAX_RUNGS = 8
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.top = []
+        self.ladder = []
+        self.bottom = []
+        self.size = 0
+
+    def schedule(self, event):
+        self.size += 1
+        event_time = event.event_time
+        ladder = self.ladder
+        if not ladder:
+            if self.bottom and event_time <= self.bottom[-1].event_time:
+                bisect.insort(self.bottom, event)
+            else:
+                self.top.append(event)
+            return
+
+        # events later than the last bucket in the first rung go to top
+        rung_0 = ladder[0]
+        if event_time == float('inf') or len(rung_0.buckets) <= (event_time - rung_0.start) // rung_0.width:
+            self.top.append(event)
+            return
+
+        for depth, rung in enumerate(ladder):
+            index = rung.index(event_time)
+            if rung.current <= index:
+                rung.buckets[index].append(event)
+                rung.count += 1
+                return
+            if index < rung.current - 1 or depth == len(ladder) - 1:
+                break
+            # index == rung.current - 1 identifies the bucket that was subdivided into the next rung
+        bisect.insort(self.bottom, event)
+
+    def _new_rung(self, events):
+        """ Create a rung that holds some events
+
+        Args:
+            events (:obj:`list`): events whose event times are finite and not all equal
+
+        Returns:
+            :obj:`_Rung`: a new rung containing `events`
+        """
+        start = min(event.event_time for event in events)
+        max_time = max(event.event_time for event in events)
+        width = (max_time - start) / len(events)
+        num_buckets = int((max_time - start) // width) + 1
+        rung = _Rung(start, width, num_buckets)
+        for event in events:
+            rung.buckets[rung.index(event.event_time)].append(event)
+        rung.count = len(events)
+        return rung
+
+    @staticmethod
+    def _splittable(events):
+        """ Can a list of events be spread over multiple buckets?
+
+        Args:
+            events (:obj:`list`): events with finite event times
+
+        Returns:
+            :obj:`bool`: whether the events have multiple event times
+        """
+        event_time = events[0].event_time
+        return any(event.event_time != event_time for event in events)
+
+    def _refill_bottom(self):
+        """ Refill an empty `bottom` with the earliest events
+        """
+        ladder = self.ladder
+        while True:
+            if ladder:
+                rung = ladder[-1]
+                if not rung.count:
+                    ladder.pop()
+                    continue
+                while not rung.buckets[rung.current]:
+                    rung.current += 1
+                bucket = rung.buckets[rung.current]
+                rung.buckets[rung.current] = []
+                rung.current += 1
+                rung.count -= len(bucket)
+                if self.THRESHOLD < len(bucket) and len(ladder) < self.MAX_RUNGS and self._splittable(bucket):
+                    ladder.append(self._new_rung(bucket))
+                    continue
+                bucket.sort()
+                self.bottom = bucket
+                return
+
+            if not self.top:
+                return
+            # events with infinite event times stay in top
+            top = [event for event in self.top if event.event_time != float('inf')]
+            if top:
+                self.top = [event for event in self.top if event.event_time == float('inf')]
+            else:
+                top = self.top
+                self.top = []
+            if self.THRESHOLD < len(top) and self._splittable(top):
+                ladder.append(self._new_rung(top))
+                continue
+            top.sort()
+            self.bottom = top
+            return
+
+    def pop(self):
+        if not self.bottom:
+            self._refill_bottom()
+            if not self.bottom:
+                raise IndexError('pop from an empty LadderEventQueue')
+        self.size -= 1
+        return self.bottom.pop(0)
+
+    def peek(self):
+        if not self.bottom:
+            self._refill_bottom()
+            if not self.bottom:
+                return None
+        return self.bottom[0]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        rung_events = (event for rung in self.ladder for bucket in rung.buckets[rung.current:] for event in bucket)
+        return itertools.chain(self.bottom, rung_events, self.top)
+
+
+class TwoLevelEventQueue(EventQueueBackend):
+    """ A two-level queue of events: a heap of events for each receiving object, and a global heap
+
+    Each simulation object that receives events has a local heap of its pending events. The global heap holds
+    an entry for the earliest event in each local heap, so it contains about one entry per object, rather than
+    one per event. Since all events received by an object have the same sub-time, the earliest entry in the
+    global heap identifies the earliest event in the queue. And the superposed events for the receiver of the
+    earliest event are at the front of its local heap, where `pop_batch()` drains them together.
+
+    A global heap entry is an (order time, sequence number, receiving object) tuple, which doesn't reference
+    the event. When an event that is scheduled becomes the earliest event in its local heap, an entry for it
+    is pushed onto the global heap, leaving the entry for the object's previous earliest event there as
+    a stale entry. Stale entries are discarded when they reach the front of the global heap. Thus, an entry in
+    the global heap is valid if and only if its order time is the order time of the earliest event
+    in its receiver's local heap.
+
+    Attributes:
+        local_queues (:obj:`dict`): map from each receiving object to a heap of its events
+        global_heap (:obj:`list`): a heap of entries for the earliest event in each local heap, and stale entries
+        size (:obj:`int`): the number of events in the queue
+    """
+
+    def __init__(self):
+        # sequence numbers, which order entries with equal order times
+        self.sequence = itertools.count()
+        self.clear()
+
+    def clear(self):
+        self.local_queues = {}
+        self.global_heap = []
+        self.size = 0
+
+    def schedule(self, event):
+        receiving_object = event.receiving_object
+        local_queue = self.local_queues.get(receiving_object)
+        if local_queue is None:
+            local_queue = self.local_queues[receiving_object] = []
+        heapq.heappush(local_queue, event)
+        if local_queue[0] is event:
+            heapq.heappush(self.global_heap, (event._order_time, next(self.sequence), receiving_object))
+        self.size += 1
+
+    def _valid_local_queue(self):
+        """ Discard stale entries from the front of the global heap
+
+        Returns:
+            :obj:`list`: the local heap that contains the earliest event, or :obj:`None` if the queue is empty
+        """
+        global_heap = self.global_heap
+        local_queues = self.local_queues
+        while global_heap:
+            order_time, _, receiving_object = global_heap[0]
+            local_queue = local_queues[receiving_object]
+            if local_queue and local_queue[0]._order_time == order_time:
+                return local_queue
+            heapq.heappop(global_heap)
+        return None
+
+    def peek(self):
+        local_queue = self._valid_local_queue()
+        if local_queue is None:
+            return None
+        return local_queue[0]
+
+    def pop(self):
+        return self._pop(False)[0]
+
+    def pop_batch(self):
+        return self._pop(True)
+
+    def _pop(self, batch):
+        """ Remove and return the earliest event, and, if `batch` is set, all events that are simultaneous
+        with it at its receiver
+
+        Args:
+            batch (:obj:`bool`): whether to also pop the events that are simultaneous with the earliest
+                event at its receiver
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.event.Event`: the earliest events, in the order they were popped
+
+        Raises:
+            :obj:`IndexError`: if the queue is empty
+        """
+        local_queue = self._valid_local_queue()
+        if local_queue is None:
+            raise IndexError('pop from an empty TwoLevelEventQueue')
+        heappop = heapq.heappop
+        heappop(self.global_heap)
+        event = heappop(local_queue)
+        events = [event]
+        if batch:
+            event_time = event.event_time
+            while local_queue and local_queue[0].event_time == event_time:
+                events.append(heappop(local_queue))
+        if local_queue:
+            heapq.heappush(self.global_heap, (local_queue[0]._order_time, next(self.sequence),
+                                              event.receiving_object))
+        self.size -= len(events)
+        return events
+
+    def events_for(self, receiving_object):
+        return list(self.local_queues.get(receiving_object, ()))
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.local_queues.values())
+
+
+# the available event queue backends, by name
+EVENT_QUEUE_BACKENDS = {
+    'heap': HeapEventQueue,
+    'calendar': CalendarEventQueue,
+    'ladder': LadderEventQueue,
+    'two_level': TwoLevelEventQueue,
+}
@@ -6,11 +6,15 @@
 :License: MIT
 """
 
+import argparse
+import functools
 import random
 import sys
-import argparse
 
 from de_sim.examples.debug_logs import logs
+from de_sim.parallel import ConservativeSimulator
+from de_sim.time_warp import TimeWarpSimulator
+from de_sim.yawns import YawnsSimulator
 import de_sim
 
 
@@ -40,27 +44,41 @@ MESSAGE_TYPES = [MessageSentToSelf, MessageSentToOtherObject, InitMsg]
 
 
 class PholdSimulationObject(de_sim.SimulationObject):
+    # PHOLD models may contain very many objects, so store attributes in slots
+    __slots__ = ('args', 'lookahead', 'rng')
 
-    def __init__(self, name, args):
+    def __init__(self, name, args, simulator=None, rng=random):
+        """ Initialize a PHOLD object
+
+        Args:
+            name (:obj:`str`): the object's name
+            args (:obj:`argparse.Namespace`): command line arguments
+            simulator (:obj:`~de_sim.simulator.Simulator`, optional): the simulator that will run the object
+            rng (:obj:`random.Random`, optional): the object's random number generator; defaults to the
+                :obj:`random` module's shared generator
+        """
         self.args = args
-        super().__init__(name)
+        # the minimum delay of the events sent to other objects
+        self.lookahead = getattr(args, 'lookahead', 0.)
+        self.rng = rng
+        super().__init__(name, simulator=simulator)
 
     def init_before_run(self):
         """ Initialize before a simulation run; called by the simulator """
-        self.send_event(random.expovariate(1.0), self, InitMsg())
+        self.send_event(self.rng.expovariate(1.0), self, InitMsg())
 
     def handle_simulation_event(self, event):
         """ Handle a simulation event """
         del event   # Avoid PyLint warning W0613, unused-argument
         # schedule event
-        if random.random() < self.args.frac_self_events or self.args.num_phold_procs == 1:
+        if self.rng.random() < self.args.frac_self_events or self.args.num_phold_procs == 1:
             receiver = self
             self.log_debug_msg("{:8.3f}: {} sending to self".format(self.time, self.name))
 
         else:
             # send to another randomly selected process
             # pick process index in [0, num_phold-2], and increment if self or greater
-            index = random.randrange(self.args.num_phold_procs - 1)
+            index = self.rng.randrange(self.args.num_phold_procs - 1)
             if obj_index(self.name) <= index:
                 index += 1
             receiver = self.simulator.simulation_objects[obj_name(index)]
@@ -71,7 +89,7 @@ class PholdSimulationObject(de_sim.SimulationObject):
             message = MessageSentToSelf
         else:
             message = MessageSentToOtherObject
-        self.send_event(random.expovariate(1.0), receiver, message())
+        self.send_event(self.lookahead + self.rng.expovariate(1.0), receiver, message())
 
     def log_debug_msg(self, msg):
         log = logs.get_log('de_sim.debug.example.console')
@@ -83,6 +101,36 @@ class PholdSimulationObject(de_sim.SimulationObject):
     # register the message types sent
     messages_sent = MESSAGE_TYPES
 
+    # attributes that event handlers don't modify, which a Time Warp simulation need not save
+    constant_attributes = ('args', 'lookahead')
+
+
+def build_phold(args, simulator):
+    """ Build a PHOLD model whose objects each have a random number generator seeded by `args.seed`
+
+    Because the objects don't share a random number generator, the model can be simulated in parallel.
+
+    Args:
+        args (:obj:`argparse.Namespace`): command line arguments
+        simulator (:obj:`~de_sim.simulator.Simulator`): the simulator that will run the model
+    """
+    for obj_id in range(args.num_phold_procs):
+        name = obj_name(obj_id)
+        PholdSimulationObject(name, args, simulator=simulator, rng=random.Random(f'{args.seed}:{name}'))
+
+
+def phold_partition(num_partitions, sim_obj):
+    """ Assign PHOLD objects to partitions round-robin
+
+    Args:
+        num_partitions (:obj:`int`): the number of partitions
+        sim_obj (:obj:`PholdSimulationObject`): a PHOLD object
+
+    Returns:
+        :obj:`int`: the index of the object's partition
+    """
+    return obj_index(sim_obj.name) % num_partitions
+
 
 class RunPhold(object):
 
@@ -108,6 +156,18 @@ class RunPhold(object):
         parser.add_argument('frac_self_events', type=float, help="Fraction of events sent to self")
         parser.add_argument('max_time', type=float, help="End time for the simulation")
         parser.add_argument('--seed', '-s', type=int, help='Random number seed')
+        parser.add_argument('--lookahead', type=float, default=0.,
+                            help="Minimum delay of events sent to other PHOLD processes")
+        parser.add_argument('--num_partitions', '-p', type=int,
+                            help="Simulate in parallel with a conservative parallel simulator that uses this many "
+                                 "processes; requires a positive lookahead")
+        protocol = parser.add_mutually_exclusive_group()
+        protocol.add_argument('--optimistic', action='store_true',
+                              help="Simulate in parallel with the optimistic Time Warp simulator, which does not "
+                                   "require lookahead")
+        protocol.add_argument('--synchronous', action='store_true',
+                              help="Simulate in parallel with the window-synchronous YAWNS simulator, which "
+                                   "requires a positive lookahead")
         args = parser.parse_args(cli_args)
 
         if args.num_phold_procs < 1:
@@ -116,6 +176,15 @@ class RunPhold(object):
             parser.error("Fraction of events sent to self ({}) should be >= 0.".format(args.frac_self_events))
         if 1 < args.frac_self_events:
             parser.error("Fraction of events sent to self ({}) should be <= 1.".format(args.frac_self_events))
+        if args.lookahead < 0:
+            parser.error("Lookahead ({}) should be >= 0.".format(args.lookahead))
+        if args.num_partitions is not None:
+            if args.num_partitions < 1:
+                parser.error("Must use at least 1 partition.")
+            if args.lookahead <= 0 and not args.optimistic:
+                parser.error("Conservative parallel simulation requires a positive lookahead.")
+        elif args.optimistic or args.synchronous:
+            parser.error("Parallel simulation requires a number of partitions.")
         if args.seed:
             random.seed(args.seed)
         return args
@@ -123,13 +192,15 @@ class RunPhold(object):
     @staticmethod
     def main(args):
 
+        if getattr(args, 'num_partitions', None):
+            return RunPhold.main_parallel(args)
+
         # create a simulator
         simulator = de_sim.Simulator()
 
         # create simulation objects, and send each one an initial event message to self
         for obj_id in range(args.num_phold_procs):
-            phold_obj = PholdSimulationObject(obj_name(obj_id), args)
-            simulator.add_object(phold_obj)
+            PholdSimulationObject(obj_name(obj_id), args, simulator=simulator)
 
         # run the simulation
         simulator.initialize()
@@ -137,6 +208,28 @@ class RunPhold(object):
         sys.stderr.write("Executed {} events.\n".format(event_num))
         return(event_num)
 
+    @staticmethod
+    def main_parallel(args):
+        """ Run PHOLD with a conservative, an optimistic, or a window-synchronous parallel simulator
+
+        Args:
+            args (:obj:`argparse.Namespace`): command line arguments
+
+        Returns:
+            :obj:`int`: the number of events executed
+        """
+        build_model = functools.partial(build_phold, args)
+        partition = functools.partial(phold_partition, args.num_partitions)
+        if getattr(args, 'optimistic', False):
+            simulator = TimeWarpSimulator(build_model, args.num_partitions, partition)
+        elif getattr(args, 'synchronous', False):
+            simulator = YawnsSimulator(build_model, args.num_partitions, partition, args.lookahead)
+        else:
+            simulator = ConservativeSimulator(build_model, args.num_partitions, partition, args.lookahead)
+        event_num = simulator.simulate(args.max_time).num_events
+        sys.stderr.write("Executed {} events in {} partitions.\n".format(event_num, args.num_partitions))
+        return(event_num)
+
 
 if __name__ == '__main__':  # pragma: no cover     # reachable only from command line
     try:
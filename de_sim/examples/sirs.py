@@ -10,6 +10,7 @@ import enum
 import numpy
 
 from de_sim.checkpoint import AccessCheckpoints
+from de_sim.replicates import ReplicateModel
 from de_sim.simulation_checkpoint_object import (AccessStateObjectInterface,
                                                  CheckpointSimulationObject)
 import de_sim
@@ -176,6 +177,86 @@ class SIR2(SIR):
     messages_sent = MESSAGE_TYPES
 
 
+class ReplicatedSIR(ReplicateModel):
+    """ An SIR epidemic model whose replicates are run in lockstep by a :obj:`~de_sim.replicates.ReplicateSimulator`
+
+    Each replicate makes the same transitions as an :obj:`SIR` whose `random_state` is seeded with the
+    replicate's seed.
+
+    Attributes:
+        s_init (:obj:`int`): initial number of susceptible subjects
+        i_init (:obj:`int`): initial number of infectious subjects
+        N (:obj:`int`): total number of susceptible subjects, a constant
+        beta (:obj:`float`): SIR beta parameter
+        gamma (:obj:`float`): SIR gamma parameter
+        s (:obj:`numpy.ndarray`): number of susceptible subjects in each replicate
+        i (:obj:`numpy.ndarray`): number of infectious subjects in each replicate
+    """
+    def __init__(self, s, i, N, beta, gamma):
+        super().__init__()
+        self.s_init = s
+        self.i_init = i
+        self.N = N
+        self.beta = beta
+        self.gamma = gamma
+        self.s = None
+        self.i = None
+
+    def init_before_run(self, replicates):
+        """ Initialize the replicates' state and send their initial events
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): the indices of all replicates
+        """
+        self.s = numpy.full(len(replicates), self.s_init)
+        self.i = numpy.full(len(replicates), self.i_init)
+        self.schedule_next_events(replicates)
+
+    def schedule_next_events(self, replicates):
+        """ Schedule the next SIR event of some replicates
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): replicate indices
+        """
+        s = self.s[replicates]
+        i = self.i[replicates]
+        rate_s_to_i = self.beta * s * i / self.N
+        rate_i_to_r = self.gamma * i
+        lambda_val = rate_s_to_i + rate_i_to_r
+        active = lambda_val != 0
+        replicates = replicates[active]
+        lambda_val = lambda_val[active]
+
+        tau = self.random.exponential(replicates, 1.0/lambda_val)
+        prob_s_to_i = rate_s_to_i[active] / lambda_val
+        s_to_i = self.random.random_sample(replicates) < prob_s_to_i
+        self.schedule_events(replicates[s_to_i], tau[s_to_i], SusceptibleToInfectious)
+        i_to_r = ~s_to_i
+        self.schedule_events(replicates[i_to_r], tau[i_to_r], InfectiousToRecovered)
+
+    def handle_s_to_i(self, replicates):
+        """ Handle susceptible to infectious events
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): the replicates executing the events
+        """
+        self.s[replicates] -= 1
+        self.i[replicates] += 1
+        self.schedule_next_events(replicates)
+
+    def handle_i_to_r(self, replicates):
+        """ Handle infectious to recovered events
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): the replicates executing the events
+        """
+        self.i[replicates] -= 1
+        self.schedule_next_events(replicates)
+
+    event_handlers = [(SusceptibleToInfectious, 'handle_s_to_i'),
+                      (InfectiousToRecovered, 'handle_i_to_r')]
+
+
 class AccessSIRObjectState(AccessStateObjectInterface):
     """ Get the state of an SIR object
 
@@ -0,0 +1,146 @@
+""" Measure the minimum delays of the events sent in a simulation
+
+The minimum delay of the events sent on each route, (sender class, receiver class, message type), bounds the
+lookahead that a parallel simulation of a model can use. :obj:`DelayRecordingEventQueue` records these delays in a
+sequential simulation, and summarizes them as `min_delays` declarations for
+:obj:`~de_sim.simulation_object.SimulationObject` classes, or as a lookahead for the parallel simulators in
+:obj:`~de_sim.parallel`. Delays observed in one run are not guaranteed to bound the delays in other runs,
+so they should be checked against the model before they're declared.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-30
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import math
+
+from de_sim.errors import SimulatorError
+from de_sim.simulator import EventQueue
+
+
+class DelayRecordingEventQueue(EventQueue):
+    """ An event queue that records the minimum delay of the events scheduled on each route
+
+    Attributes:
+        min_delays (:obj:`dict`): map from each (sender class, receiver class, message type) route to the
+            minimum delay of the events scheduled on it
+        num_events (:obj:`dict`): map from each route to the number of events scheduled on it
+    """
+
+    def __init__(self, backend='heap'):
+        """
+        Args:
+            backend (:obj:`str`, optional): the name of the event queue backend
+        """
+        super().__init__(backend=backend)
+        self.min_delays = {}
+        self.num_events = {}
+
+    @classmethod
+    def install(cls, simulator, **kwargs):
+        """ Make a simulator record the delays of the events it schedules
+
+        Args:
+            simulator (:obj:`~de_sim.simulator.Simulator`): a simulator that hasn't been initialized
+            kwargs (:obj:`dict`): arguments for the new event queue's constructor
+
+        Returns:
+            :obj:`DelayRecordingEventQueue`: the simulator's new event queue
+
+        Raises:
+            :obj:`SimulatorError`: if events have already been scheduled
+        """
+        if simulator.event_queue.len() or simulator.event_queue.deferred_events:
+            raise SimulatorError("event delays must be recorded before events are scheduled")
+        simulator.event_queue = cls(**kwargs)
+        return simulator.event_queue
+
+    def record(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Record the delay of an event
+
+        Args:
+            send_time (:obj:`float`): the simulation time at which the event was sent
+            receive_time (:obj:`float`): the simulation time at which the event will be executed
+            sending_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object sending the event
+            receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object receiving the event
+            event_message (:obj:`~de_sim.event_message.EventMessage`): the event's message
+        """
+        route = (sending_object.__class__, receiving_object.__class__, event_message.__class__)
+        delay = receive_time - send_time
+        if delay < self.min_delays.get(route, math.inf):
+            self.min_delays[route] = delay
+        self.num_events[route] = self.num_events.get(route, 0) + 1
+
+    def schedule_event(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Record an event's delay, and schedule it
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_event`.
+        """
+        event = super().schedule_event(send_time, receive_time, sending_object, receiving_object, event_message)
+        self.record(send_time, receive_time, sending_object, receiving_object, event_message)
+        return event
+
+    def schedule_events(self, events_args):
+        """ Record the delays of events, and schedule them
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_events`.
+        """
+        events_args = list(events_args)
+        events = super().schedule_events(events_args)
+        for event_args in events_args:
+            self.record(*event_args)
+        return events
+
+    def schedule_multicast(self, send_time, receive_time, sending_object, receiving_objects, event_message):
+        """ Record the delays of a multicast's events, and schedule them
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_multicast`.
+        """
+        events = super().schedule_multicast(send_time, receive_time, sending_object, receiving_objects,
+                                            event_message)
+        for receiving_object in receiving_objects:
+            self.record(send_time, receive_time, sending_object, receiving_object, event_message)
+        return events
+
+    def get_min_delays(self):
+        """ Summarize the recorded delays as `min_delays` declarations
+
+        Returns:
+            :obj:`dict`: map from each sender class to a :obj:`dict` that maps each message type it sent to the
+            minimum delay of the messages of that type, which can be declared in the class' `min_delays`
+        """
+        declarations = {}
+        for (sender_class, _, message_type), delay in self.min_delays.items():
+            sender_min_delays = declarations.setdefault(sender_class, {})
+            sender_min_delays[message_type] = min(delay, sender_min_delays.get(message_type, math.inf))
+        return declarations
+
+    def get_lookahead(self):
+        """ Summarize the recorded delays as a lookahead for a parallel simulator
+
+        Returns:
+            :obj:`dict`: map from each (sender class, receiver class) link to the minimum delay of the events
+            sent on it, as used by :obj:`~de_sim.parallel.get_lookahead`
+        """
+        lookahead = {}
+        for (sender_class, receiver_class, _), delay in self.min_delays.items():
+            link = (sender_class, receiver_class)
+            lookahead[link] = min(delay, lookahead.get(link, math.inf))
+        return lookahead
+
+    def check_min_delays(self):
+        """ Find the routes whose recorded delays are less than the minimum delays their senders declare
+
+        Sends that aren't trusted are checked as they're made, so this finds violations by trusted senders.
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: (sender class, receiver class, message type, recorded minimum delay,
+            declared minimum delay) for each route that violates its declaration
+        """
+        violations = []
+        for (sender_class, receiver_class, message_type), delay in self.min_delays.items():
+            declared_delay = sender_class.metadata.min_delays.get(message_type)
+            if declared_delay is not None and delay < declared_delay:
+                violations.append((sender_class, receiver_class, message_type, delay, declared_delay))
+        return violations
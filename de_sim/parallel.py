@@ -0,0 +1,630 @@
+""" Parallel discrete-event simulation on a pool of local processes
+
+A parallel simulation divides a model's simulation objects into partitions, and simulates each partition in its
+own process. Every process builds the entire model, by calling the same model-building function, so that each
+object exists in every process, but a process initializes and executes only the objects in its partition.
+Events sent to objects in other partitions are exchanged between processes through
+:obj:`multiprocessing.Queue`\ s.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-27
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+from numbers import Real
+import math
+import multiprocessing
+import numpy
+import pickle
+import queue
+import traceback
+
+from de_sim.errors import SimulatorError
+from de_sim.simulator import EventQueue, Simulator
+
+
+def get_lookahead(lookahead, sender_class, receiver_class):
+    """ Get the minimum delay of the events sent by objects of one class to objects of another class
+
+    Args:
+        lookahead (:obj:`float` or :obj:`dict`): a lookahead for all events, or a :obj:`dict` that maps
+            :obj:`~de_sim.simulation_object.SimulationObject` subclasses to the minimum delay of the events
+            sent by their instances, and maps (sender class, receiver class) pairs to the minimum delay of
+            the events sent on these links; a link's lookahead takes precedence over its sender class' lookahead,
+            which takes precedence over the lookahead declared by the classes' `min_delays`, as provided by
+            :obj:`get_declared_lookahead`
+        sender_class (:obj:`type`): the sending object's class
+        receiver_class (:obj:`type`): the receiving object's class
+
+    Returns:
+        :obj:`float`: the minimum delay of the events sent by objects of `sender_class` to objects of
+        `receiver_class`
+
+    Raises:
+        :obj:`SimulatorError`: if neither `lookahead` nor the classes' declarations provide the lookahead, or the
+            lookahead is not positive
+    """
+    if isinstance(lookahead, Real):
+        value = lookahead
+    elif (sender_class, receiver_class) in lookahead:
+        value = lookahead[(sender_class, receiver_class)]
+    elif sender_class in lookahead:
+        value = lookahead[sender_class]
+    else:
+        value = get_declared_lookahead(sender_class, receiver_class)
+        if value is None:
+            raise SimulatorError(f"no lookahead provided for events sent by '{sender_class.__name__}' objects to "
+                                 f"'{receiver_class.__name__}' objects, and '{sender_class.__name__}' does not "
+                                 f"declare the minimum delays of all the messages it can send them")
+    if not 0 < value:
+        raise SimulatorError(f"lookahead for events sent by '{sender_class.__name__}' objects to "
+                             f"'{receiver_class.__name__}' objects must be positive, but is {value}")
+    return value
+
+
+def get_declared_lookahead(sender_class, receiver_class):
+    """ Get the lookahead of a link from the minimum delays declared by the sender's class
+
+    Args:
+        sender_class (:obj:`type`): a :obj:`~de_sim.simulation_object.SimulationObject` subclass
+        receiver_class (:obj:`type`): a :obj:`~de_sim.simulation_object.SimulationObject` subclass
+
+    Returns:
+        :obj:`float`: the minimum of the delays `sender_class` declares in `min_delays` for the message types
+        that `receiver_class` receives, or `None` if it doesn't declare all of them, or the classes share no
+        message types
+    """
+    min_delays = sender_class.metadata.min_delays
+    receiver_priorities = receiver_class.metadata.event_handler_priorities
+    message_types = [message_type for message_type in sender_class.metadata.message_types_sent
+                     if message_type in receiver_priorities]
+    if not message_types or any(message_type not in min_delays for message_type in message_types):
+        return None
+    return min(min_delays[message_type] for message_type in message_types)
+
+
+def can_send(sender_class, receiver_class):
+    """ Can objects of one class send events to objects of another class?
+
+    Args:
+        sender_class (:obj:`type`): a :obj:`~de_sim.simulation_object.SimulationObject` subclass
+        receiver_class (:obj:`type`): a :obj:`~de_sim.simulation_object.SimulationObject` subclass
+
+    Returns:
+        :obj:`bool`: whether `sender_class` is registered to send a message type which `receiver_class`
+        is registered to receive
+    """
+    receiver_priorities = receiver_class.metadata.event_handler_priorities
+    return any(message_type in receiver_priorities for message_type in sender_class.metadata.message_types_sent)
+
+
+class PartitionEventQueue(EventQueue):
+    """ The event queue of one partition of a parallel simulation
+
+    Events for objects in this partition are scheduled as in an :obj:`~de_sim.simulator.EventQueue`. Events for
+    objects in other partitions are not scheduled; instead, they are stored in an outbox for the receiving
+    partition, from which the parallel simulator sends them. The delay of an event sent to another partition must
+    be at least the lookahead of the link from the sender's class to the receiver's class.
+
+    Attributes:
+        partition (:obj:`int`): the index of this event queue's partition
+        partitions (:obj:`dict`): map from the name of each simulation object to the index of its partition
+        lookahead (:obj:`float` or :obj:`dict`): the lookahead specification, as used by :obj:`get_lookahead`
+        link_lookaheads (:obj:`dict`): map from (sender class, receiver class) to the lookahead of the link
+        outboxes (:obj:`list` of :obj:`list`): for each partition, the events sent to it, as
+            (send time, receive time, sending object name, receiving object name, event message) tuples
+    """
+
+    def __init__(self, partition, partitions, num_partitions, lookahead, backend='heap'):
+        """
+        Args:
+            partition (:obj:`int`): the index of this event queue's partition
+            partitions (:obj:`dict`): map from the name of each simulation object to the index of its partition
+            num_partitions (:obj:`int`): the number of partitions
+            lookahead (:obj:`float` or :obj:`dict`): the lookahead specification
+            backend (:obj:`str`, optional): the name of the event queue backend
+        """
+        super().__init__(backend=backend)
+        self.partition = partition
+        self.partitions = partitions
+        self.lookahead = lookahead
+        self.link_lookaheads = {}
+        self.outboxes = [[] for _ in range(num_partitions)]
+
+    def is_remote(self, simulation_object):
+        """ Is a simulation object in another partition?
+
+        Args:
+            simulation_object (:obj:`~de_sim.simulation_object.SimulationObject`): a simulation object
+
+        Returns:
+            :obj:`bool`: whether `simulation_object` is in another partition
+        """
+        return self.partitions[simulation_object.name] != self.partition
+
+    def link_lookahead(self, sender_class, receiver_class):
+        """ Get the lookahead of the link from one class of objects to another
+
+        Args:
+            sender_class (:obj:`type`): the sending object's class
+            receiver_class (:obj:`type`): the receiving object's class
+
+        Returns:
+            :obj:`float`: the lookahead of the link
+        """
+        link = (sender_class, receiver_class)
+        if link not in self.link_lookaheads:
+            self.link_lookaheads[link] = get_lookahead(self.lookahead, sender_class, receiver_class)
+        return self.link_lookaheads[link]
+
+    def send_remote(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Put an event for an object in another partition in that partition's outbox
+
+        Returns:
+            :obj:`~de_sim.event.Event`: an event that represents the sent event, but is not scheduled
+
+        Raises:
+            :obj:`SimulatorError`: if the event is invalid, or if its delay is less than the lookahead
+                of its link
+        """
+        event = self.make_event(send_time, receive_time, sending_object, receiving_object, event_message)
+        lookahead = self.link_lookahead(sending_object.__class__, receiving_object.__class__)
+        if receive_time - send_time < lookahead:
+            raise SimulatorError(f"delay ({receive_time - send_time}) of event sent by '{sending_object.name}' to "
+                                 f"'{receiving_object.name}' in another partition is less than the lookahead "
+                                 f"({lookahead})")
+        self.outboxes[self.partitions[receiving_object.name]].append(
+            (send_time, receive_time, sending_object.name, receiving_object.name, event_message))
+        return event
+
+    def schedule_event(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Schedule an event, or put it in an outbox if its receiver is in another partition
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_event`.
+        """
+        if self.is_remote(receiving_object):
+            return self.send_remote(send_time, receive_time, sending_object, receiving_object, event_message)
+        return super().schedule_event(send_time, receive_time, sending_object, receiving_object, event_message)
+
+    def schedule_events(self, events_args):
+        """ Schedule events, and put those whose receivers are in other partitions in outboxes
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_events`.
+        """
+        events_args = list(events_args)
+        local = [not self.is_remote(event_args[3]) for event_args in events_args]
+        if all(local):
+            return super().schedule_events(events_args)
+        local_events = iter(super().schedule_events([event_args
+                                                     for event_args, is_local in zip(events_args, local)
+                                                     if is_local]))
+        return [next(local_events) if is_local else self.send_remote(*event_args)
+                for event_args, is_local in zip(events_args, local)]
+
+    def schedule_multicast(self, send_time, receive_time, sending_object, receiving_objects, event_message):
+        """ Schedule a multicast, and put the events whose receivers are in other partitions in outboxes
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_multicast`.
+        """
+        if not any(self.is_remote(receiving_object) for receiving_object in receiving_objects):
+            return super().schedule_multicast(send_time, receive_time, sending_object, receiving_objects,
+                                              event_message)
+        return self.schedule_events([(send_time, receive_time, sending_object, receiving_object, event_message)
+                                     for receiving_object in receiving_objects])
+
+    def cancel_event(self, event):
+        """ Cancel a scheduled event
+
+        Raises:
+            :obj:`SimulatorError`: if `event` was sent to an object in another partition, or if `event` has
+                already been cancelled or executed
+        """
+        if self.is_remote(event.receiving_object):
+            raise SimulatorError(f"cannot cancel event sent to '{event.receiving_object.name}' in another "
+                                 f"partition")
+        super().cancel_event(event)
+
+    def take_outbox(self, partition):
+        """ Remove and provide the events in a partition's outbox
+
+        Args:
+            partition (:obj:`int`): the index of a partition
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: the events sent to `partition`
+        """
+        events = self.outboxes[partition]
+        self.outboxes[partition] = []
+        return events
+
+
+class Partition(object):
+    """ The state of one partition of a parallel simulation, in the process that simulates it
+
+    Attributes:
+        index (:obj:`int`): the partition's index
+        simulator (:obj:`~de_sim.simulator.Simulator`): a simulator that contains all simulation objects
+        event_queue (:obj:`PartitionEventQueue`): the simulator's event queue
+        local_objects (:obj:`list` of :obj:`~de_sim.simulation_object.SimulationObject`): the simulation
+            objects in this partition
+        lookaheads (:obj:`numpy.ndarray`): the lookahead of the links between partitions, with
+            `lookaheads[p, q]` the minimum delay of events sent from partition `p` to partition `q`,
+            and infinity if no object in `p` can send events to an object in `q`; `None` if the parallel
+            simulator does not use lookahead
+        inbox (:obj:`multiprocessing.Queue`): the queue on which this partition receives messages
+        inboxes (:obj:`list` of :obj:`multiprocessing.Queue`): the queue of each partition
+        num_events (:obj:`int`): the number of calls this partition makes to event handlers
+        stats (:obj:`dict`): statistics about the partition's synchronization, which are reported to the
+            parallel simulator
+    """
+
+    def __init__(self, index, parallel_simulator, inboxes):
+        """ Build the model, and prepare to simulate this partition
+
+        Args:
+            index (:obj:`int`): the partition's index
+            parallel_simulator (:obj:`ParallelSimulator`): the parallel simulator
+            inboxes (:obj:`list` of :obj:`multiprocessing.Queue`): the queue of each partition
+
+        Raises:
+            :obj:`SimulatorError`: if a simulation object is not assigned a valid partition
+        """
+        self.index = index
+        num_partitions = parallel_simulator.num_partitions
+        simulator = Simulator()
+        parallel_simulator.build_model(simulator)
+        partitions = {}
+        for simulation_object in simulator.simulation_objects.values():
+            partition = parallel_simulator.get_partition(simulation_object)
+            if not (isinstance(partition, int) and 0 <= partition < num_partitions):
+                raise SimulatorError(f"simulation object '{simulation_object.name}' is assigned to partition "
+                                     f"'{partition}', which is not in [0, {num_partitions})")
+            partitions[simulation_object.name] = partition
+        self.simulator = simulator
+        self.event_queue = parallel_simulator.make_event_queue(index, partitions)
+        simulator.event_queue = self.event_queue
+        self.local_objects = [simulation_object for simulation_object in simulator.simulation_objects.values()
+                              if partitions[simulation_object.name] == index]
+
+        self.inbox = inboxes[index]
+        self.inboxes = inboxes
+        self.num_events = 0
+        self.stats = {}
+        self.lookaheads = None
+        if parallel_simulator.lookahead is None:
+            return
+
+        # the lookahead of a link between partitions is the minimum lookahead of the links between their classes
+        partition_classes = [set() for _ in range(num_partitions)]
+        for simulation_object in simulator.simulation_objects.values():
+            partition_classes[partitions[simulation_object.name]].add(simulation_object.__class__)
+        self.lookaheads = numpy.full((num_partitions, num_partitions), numpy.inf)
+        for sender_partition, sender_classes in enumerate(partition_classes):
+            for receiver_partition, receiver_classes in enumerate(partition_classes):
+                if sender_partition == receiver_partition:
+                    continue
+                for sender_class in sender_classes:
+                    for receiver_class in receiver_classes:
+                        if can_send(sender_class, receiver_class):
+                            self.lookaheads[sender_partition, receiver_partition] = min(
+                                self.lookaheads[sender_partition, receiver_partition],
+                                self.event_queue.link_lookahead(sender_class, receiver_class))
+
+    def initialize(self, time_init):
+        """ Initialize the objects in this partition, which schedule their initial events
+
+        Args:
+            time_init (:obj:`float`): the simulation's initial time
+        """
+        simulator = self.simulator
+        simulator.time = time_init
+        if simulator.integer_event_order_keys:
+            # rank all objects, so that every partition gives an object the same rank
+            simulator.rank_objects()
+        self.event_queue.start_bulk_scheduling()
+        try:
+            for simulation_object in self.local_objects:
+                simulation_object.init_before_run()
+        finally:
+            self.event_queue.end_bulk_scheduling()
+
+    def execute_events(self, end_time):
+        """ Execute this partition's events, in order, until the next event occurs after `end_time`
+
+        Args:
+            end_time (:obj:`float`): the time of the last events that may be executed
+
+        Returns:
+            :obj:`int`: the number of calls made to event handlers
+        """
+        simulator = self.simulator
+        next_event_batch = self.event_queue.next_event_batch
+        num_events = 0
+        while True:
+            next_time, next_sim_obj, next_events = next_event_batch(end_time)
+            if not next_events:
+                break
+            simulator.time = next_time
+            next_sim_obj.time = next_time
+            next_sim_obj._BaseSimulationObject__handle_event_list(next_events)
+            num_events += 1
+        self.num_events += num_events
+        return num_events
+
+    def receive_events(self, events):
+        """ Schedule events received from another partition
+
+        Args:
+            events (:obj:`list` of :obj:`tuple`): (send time, receive time, sending object name,
+                receiving object name, event message) tuples
+        """
+        simulation_objects = self.simulator.simulation_objects
+        EventQueue.schedule_events(self.event_queue,
+                                   [(send_time, receive_time, simulation_objects[sender], simulation_objects[receiver],
+                                     event_message)
+                                    for send_time, receive_time, sender, receiver, event_message in events])
+
+    def send(self, partition, message):
+        """ Send a message to another partition
+
+        Args:
+            partition (:obj:`int`): the index of the receiving partition
+            message (:obj:`tuple`): the message
+        """
+        # pickle here, rather than in the queue's feeder thread, so that errors are raised
+        self.inboxes[partition].put(pickle.dumps(message))
+
+    def receive(self, block=True):
+        """ Receive messages from other partitions
+
+        Args:
+            block (:obj:`bool`, optional): whether to wait for a message if none are available
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: the messages received
+        """
+        messages = []
+        if block:
+            messages.append(pickle.loads(self.inbox.get()))
+        while True:
+            try:
+                messages.append(pickle.loads(self.inbox.get_nowait()))
+            except queue.Empty:
+                return messages
+
+
+class ParallelSimulator(object):
+    """ Base class for parallel simulators, which simulate partitions of a model in separate processes
+
+    `build_model(simulator)` must add all of the model's simulation objects to `simulator`. It is called
+    once in each process, and must build the same model each time. In particular, an object that uses random
+    numbers should have its own random number generator, with a seed that does not depend on the process.
+
+    Because each partition is simulated in its own process, an object can access only the state of objects in
+    its partition. Other objects exist in each process, so that they can receive events, but their state is
+    not updated. Events sent to objects in other partitions cannot be cancelled.
+
+    Subclasses implement a synchronization protocol in `simulate_partition()`.
+
+    Attributes:
+        build_model (:obj:`callable`): a function that builds the model in a :obj:`~de_sim.simulator.Simulator`
+        num_partitions (:obj:`int`): the number of partitions
+        partition (:obj:`dict` or :obj:`callable`): a map from each simulation object's name to the index of
+            its partition, or a function that provides the index of a simulation object's partition
+        lookahead (:obj:`float` or :obj:`dict`): the minimum delay of events sent between partitions, as used
+            by :obj:`get_lookahead`, or `None` if the synchronization protocol does not need lookahead; an
+            empty :obj:`dict` uses the minimum delays declared by the simulation object classes
+        get_results (:obj:`callable`): a function that obtains picklable results from a partition's
+            simulation objects after the simulation ends
+        partition_num_events (:obj:`list` of :obj:`int`): after a simulation, the number of calls to event
+            handlers made by each partition
+        partition_stats (:obj:`list` of :obj:`dict`): after a simulation, the statistics about synchronization
+            reported by each partition
+        results (:obj:`list`): after a simulation, the results obtained by `get_results` from each partition
+    """
+
+    def __init__(self, build_model, num_partitions, partition, lookahead, get_results=None):
+        """
+        Args:
+            build_model (:obj:`callable`): a function that builds the model in a
+                :obj:`~de_sim.simulator.Simulator`
+            num_partitions (:obj:`int`): the number of partitions
+            partition (:obj:`dict` or :obj:`callable`): a map from each simulation object's name to the index of
+                its partition, or a function that provides the index of a simulation object's partition
+            lookahead (:obj:`float` or :obj:`dict`): the minimum delay of events sent between partitions, or
+                `None`
+            get_results (:obj:`callable`, optional): a function that obtains picklable results from a
+                partition's simulation objects
+
+        Raises:
+            :obj:`SimulatorError`: if `num_partitions` is not positive
+        """
+        if num_partitions < 1:
+            raise SimulatorError(f"num_partitions must be positive, but is {num_partitions}")
+        self.build_model = build_model
+        self.num_partitions = num_partitions
+        self.partition = partition
+        self.lookahead = lookahead
+        self.get_results = get_results
+        self.partition_num_events = None
+        self.partition_stats = None
+        self.results = None
+
+    def get_partition(self, simulation_object):
+        """ Get the index of a simulation object's partition
+
+        Args:
+            simulation_object (:obj:`~de_sim.simulation_object.SimulationObject`): a simulation object
+
+        Returns:
+            :obj:`int`: the index of the object's partition
+        """
+        if callable(self.partition):
+            return self.partition(simulation_object)
+        return self.partition.get(simulation_object.name)
+
+    def make_event_queue(self, index, partitions):
+        """ Make the event queue of a partition
+
+        Args:
+            index (:obj:`int`): the partition's index
+            partitions (:obj:`dict`): map from the name of each simulation object to the index of its partition
+
+        Returns:
+            :obj:`PartitionEventQueue`: the partition's event queue
+        """
+        return PartitionEventQueue(index, partitions, self.num_partitions, self.lookahead)
+
+    def simulate(self, max_time, time_init=0.):
+        """ Run a parallel simulation
+
+        Args:
+            max_time (:obj:`float`): the maximum time of the end of the simulation
+            time_init (:obj:`float`, optional): the simulation's initial time
+
+        Returns:
+            :obj:`~de_sim.simulator.Simulator.SimulationReturnValue`: the number of calls to event handlers
+            made by all partitions
+
+        Raises:
+            :obj:`SimulatorError`: if a partition fails
+        """
+        if max_time <= time_init:
+            raise SimulatorError(f"max_time ({max_time}) must be greater than time_init ({time_init})")
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(self.num_partitions)]
+        results_queue = context.Queue()
+        processes = [context.Process(target=self._run_partition,
+                                     args=(index, inboxes, results_queue, max_time, time_init), daemon=True)
+                     for index in range(self.num_partitions)]
+        for process in processes:
+            process.start()
+
+        partition_outcomes = {}
+        try:
+            while len(partition_outcomes) < self.num_partitions:
+                try:
+                    index, error, num_events, stats, results = results_queue.get(timeout=1)
+                except queue.Empty:
+                    for index, process in enumerate(processes):
+                        if index not in partition_outcomes and process.exitcode is not None:
+                            raise SimulatorError(f"partition {index} exited with code {process.exitcode}")
+                    continue
+                if error is not None:
+                    raise SimulatorError(f"partition {index} failed:\n{error}")
+                partition_outcomes[index] = (num_events, stats, results)
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        self.partition_num_events = [partition_outcomes[index][0] for index in range(self.num_partitions)]
+        self.partition_stats = [partition_outcomes[index][1] for index in range(self.num_partitions)]
+        self.results = [partition_outcomes[index][2] for index in range(self.num_partitions)]
+        return Simulator.SimulationReturnValue(sum(self.partition_num_events))
+
+    def _run_partition(self, index, inboxes, results_queue, max_time, time_init):
+        """ Simulate a partition, and report its outcome; runs in the partition's process
+
+        Args:
+            index (:obj:`int`): the partition's index
+            inboxes (:obj:`list` of :obj:`multiprocessing.Queue`): the queue of each partition
+            results_queue (:obj:`multiprocessing.Queue`): the queue on which outcomes are reported
+            max_time (:obj:`float`): the maximum time of the end of the simulation
+            time_init (:obj:`float`): the simulation's initial time
+        """
+        try:
+            partition = Partition(index, self, inboxes)
+            partition.initialize(time_init)
+            self.simulate_partition(partition, max_time, time_init)
+            results = None
+            if self.get_results is not None:
+                results = self.get_results(partition.local_objects)
+            results_queue.put((index, None, partition.num_events, partition.stats, results))
+        except Exception:
+            results_queue.put((index, traceback.format_exc(), None, None, None))
+            # report this failure before the other partitions learn of it, and report their own failures
+            results_queue.close()
+            results_queue.join_thread()
+            self.abort_partitions()
+
+    def abort_partitions(self):
+        """ Release the other partitions after a partition fails; runs in the failed partition's process
+
+        Partitions that wait for each other must not wait for a partition that has failed. By default, the
+        parallel simulator terminates the other partitions when it receives the failure.
+        """
+        pass
+
+    def simulate_partition(self, partition, max_time, time_init):
+        """ Simulate a partition, synchronizing it with the other partitions
+
+        Args:
+            partition (:obj:`Partition`): the partition
+            max_time (:obj:`float`): the maximum time of the end of the simulation
+            time_init (:obj:`float`): the simulation's initial time
+        """
+        raise NotImplementedError    # pragma: no cover     # must be overridden
+
+
+class ConservativeSimulator(ParallelSimulator):
+    """ A conservative parallel simulator, which uses the Chandy-Misra-Bryant null message protocol
+
+    A partition executes an event only when no other partition can send it an earlier or simultaneous event.
+    Each partition tells each other partition a lower bound on the time of the events it may send it in
+    the future: its *earliest output time*, which is the earliest time of its pending events and the events it may
+    receive, plus the lookahead of the link. A message that carries an earliest output time but no
+    events is a *null message*. Because lookaheads are positive, the bounds increase until all events are executed.
+
+    Each partition executes its objects' events in the order used by the sequential
+    :obj:`~de_sim.simulator.Simulator`, (event time, class priority, tiebreaker), and events that occur
+    simultaneously at an object are superposed, so a deterministic model produces the same results. However,
+    superposed events whose messages are equal may be provided in a different order.
+
+    See Chandy, K. M., & Misra, J. (1979). Distributed Simulation: A Case Study in Design and Verification of
+    Distributed Programs. IEEE Transactions on Software Engineering, SE-5(5), 440-452.
+    """
+
+    def simulate_partition(self, partition, max_time, time_init):
+        """ Simulate a partition, synchronizing it with the other partitions by the null message protocol
+
+        Messages between partitions are (sending partition, events, earliest output time) tuples.
+
+        Args:
+            partition (:obj:`Partition`): the partition
+            max_time (:obj:`float`): the maximum time of the end of the simulation
+            time_init (:obj:`float`): the simulation's initial time
+        """
+        index = partition.index
+        event_queue = partition.event_queue
+        others = [other for other in range(self.num_partitions) if other != index]
+        # the earliest time of the events each other partition may send; initially, events sent at time_init
+        input_clocks = {other: time_init + partition.lookaheads[other, index] for other in others}
+        output_clocks = {other: time_init + partition.lookaheads[index, other] for other in others}
+        block = False
+        while True:
+            for sender, events, clock in partition.receive(block=block):
+                partition.receive_events(events)
+                input_clocks[sender] = clock
+            safe_time = min(input_clocks.values(), default=math.inf)
+
+            # execute the events that occur before any events that may be received
+            partition.execute_events(min(max_time, float(numpy.nextafter(safe_time, -math.inf))))
+
+            # send events and earliest output times to partitions that may still receive events before max_time
+            lower_bound = min(event_queue.next_event_time(), safe_time)
+            finished = max_time < lower_bound
+            for other in others:
+                events = [event for event in event_queue.take_outbox(other) if event[1] <= max_time]
+                if max_time < output_clocks[other]:
+                    continue
+                clock = math.inf if finished else lower_bound + partition.lookaheads[index, other]
+                if events or output_clocks[other] < clock:
+                    partition.send(other, (index, events, clock))
+                    output_clocks[other] = clock
+            if finished:
+                return
+            block = True
@@ -0,0 +1,317 @@
+""" Profile the communication between simulation objects, and partition them for parallel simulation
+
+:obj:`CommunicationRecordingEventQueue` records a :obj:`CommunicationGraph` of a sequential simulation: the
+number, pickled size, and delay of the events sent by each object to each other object. The graph partitions the
+objects into balanced groups that exchange few events, as a map from each object's name to its partition, which
+the parallel simulators in :obj:`~de_sim.parallel` accept, and estimates the speedup of a partition.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-30
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+from array import array
+import heapq
+import math
+import numpy
+import pickle
+
+from de_sim.errors import SimulatorError
+from de_sim.lookahead import DelayRecordingEventQueue
+
+
+class CommunicationGraph(object):
+    """ A weighted, directed graph of the events sent between simulation objects
+
+    The work of an object is the number of events sent to it.
+
+    Attributes:
+        work (:obj:`dict`): map from the name of each object to the number of events sent to it
+        edges (:obj:`dict`): map from each (sender name, receiver name) pair to a :obj:`list` that contains
+            the number of events sent, their total pickled size in bytes, their minimum delay, and the sum of
+            their delays
+        delays (:obj:`array.array`): the delay of each event
+    """
+    # indices of the statistics in an edge's list
+    NUM_EVENTS, VOLUME, MIN_DELAY, TOTAL_DELAY = range(4)
+
+    def __init__(self):
+        self.work = {}
+        self.edges = {}
+        self.delays = array('d')
+
+    def add_object(self, name):
+        """ Add an object, which may not send or receive events
+
+        Args:
+            name (:obj:`str`): the object's name
+        """
+        self.work.setdefault(name, 0)
+
+    def add_event(self, sender, receiver, delay, volume=0):
+        """ Add an event
+
+        Args:
+            sender (:obj:`str`): the name of the sending object
+            receiver (:obj:`str`): the name of the receiving object
+            delay (:obj:`float`): the event's delay
+            volume (:obj:`int`, optional): the size of the event's message, in bytes
+        """
+        self.add_object(sender)
+        self.work[receiver] = self.work.get(receiver, 0) + 1
+        edge = self.edges.get((sender, receiver))
+        if edge is None:
+            self.edges[(sender, receiver)] = [1, volume, delay, delay]
+        else:
+            edge[0] += 1
+            edge[1] += volume
+            if delay < edge[2]:
+                edge[2] = delay
+            edge[3] += delay
+        self.delays.append(delay)
+
+    def get_neighbors(self):
+        """ Get the undirected graph of the events exchanged by each pair of different objects
+
+        Returns:
+            :obj:`dict`: map from each object's name to a :obj:`dict` that maps the name of each other object with
+            which it exchanges events to the number of events they exchange
+        """
+        neighbors = {name: {} for name in self.work}
+        for (sender, receiver), edge in self.edges.items():
+            if sender != receiver:
+                num_events = edge[self.NUM_EVENTS]
+                neighbors[sender][receiver] = neighbors[sender].get(receiver, 0) + num_events
+                neighbors[receiver][sender] = neighbors[receiver].get(sender, 0) + num_events
+        return neighbors
+
+    def get_delay_quantiles(self, quantiles=(0., 0.01, 0.1, 0.5, 0.9, 1.)):
+        """ Get quantiles of the distribution of the events' delays
+
+        Args:
+            quantiles (:obj:`tuple` of :obj:`float`, optional): the quantiles
+
+        Returns:
+            :obj:`dict`: map from each quantile to the delay at the quantile
+        """
+        if not self.delays:
+            return {quantile: math.nan for quantile in quantiles}
+        values = numpy.quantile(numpy.frombuffer(self.delays, dtype=numpy.float64), quantiles)
+        return dict(zip(quantiles, values.tolist()))
+
+    def partition(self, num_partitions, imbalance=0.05, max_passes=10):
+        """ Partition the objects into groups with balanced work that exchange few events
+
+        The partitions are grown one at a time from the object with the most work, by repeatedly adding the
+        object that exchanges the most events with the partition, until the partition holds its share of the
+        remaining work. Then objects are moved between partitions while a move reduces the number of events
+        exchanged between partitions, or improves the balance without increasing it, and keeps each partition's
+        work below the limit set by `imbalance`.
+
+        Args:
+            num_partitions (:obj:`int`): the number of partitions
+            imbalance (:obj:`float`, optional): the fraction by which the work of a partition may exceed the
+                mean work of the partitions
+            max_passes (:obj:`int`, optional): the maximum number of passes over the objects that move them
+
+        Returns:
+            :obj:`dict`: map from each object's name to the index of its partition
+
+        Raises:
+            :obj:`SimulatorError`: if `num_partitions` is not positive or `imbalance` is negative
+        """
+        if num_partitions < 1:
+            raise SimulatorError(f"num_partitions must be positive, but is {num_partitions}")
+        if imbalance < 0:
+            raise SimulatorError(f"imbalance must be non-negative, but is {imbalance}")
+        neighbors = self.get_neighbors()
+        work = self.work
+        # sort names, so that partitions don't depend on the order in which objects are added
+        names = sorted(work)
+        assignment = {}
+
+        # grow the partitions
+        remaining_work = sum(work.values())
+        unassigned = set(names)
+        for partition in range(num_partitions):
+            if not unassigned:
+                break
+            target = remaining_work / (num_partitions - partition)
+            partition_work = 0
+            connections = {}
+            candidates = []
+            while unassigned and (partition_work < target or partition == num_partitions - 1):
+                name = None
+                while candidates:
+                    negative_connection, candidate = heapq.heappop(candidates)
+                    if candidate in unassigned and -negative_connection == connections[candidate]:
+                        name = candidate
+                        break
+                if name is None:
+                    # start a new region from the unassigned object with the most work
+                    name = min(unassigned, key=lambda name: (-work[name], name))
+                if partition_work and target < partition_work + work[name] / 2 and \
+                        partition < num_partitions - 1:
+                    break
+                unassigned.remove(name)
+                assignment[name] = partition
+                partition_work += work[name]
+                for neighbor, num_events in neighbors[name].items():
+                    if neighbor in unassigned:
+                        connections[neighbor] = connections.get(neighbor, 0) + num_events
+                        heapq.heappush(candidates, (-connections[neighbor], neighbor))
+            remaining_work -= partition_work
+
+        # move objects between partitions
+        loads = [0] * num_partitions
+        for name, partition in assignment.items():
+            loads[partition] += work[name]
+        max_load = (1 + imbalance) * sum(loads) / num_partitions
+        for _ in range(max_passes):
+            moved = False
+            for name in names:
+                source = assignment[name]
+                connections = [0] * num_partitions
+                for neighbor, num_events in neighbors[name].items():
+                    connections[assignment[neighbor]] += num_events
+                best = None
+                for destination in range(num_partitions):
+                    if destination == source or max_load < loads[destination] + work[name]:
+                        continue
+                    gain = connections[destination] - connections[source]
+                    balanced = loads[destination] + work[name] < loads[source]
+                    if 0 < gain or (gain == 0 and balanced and work[name]):
+                        key = (gain, -loads[destination])
+                        if best is None or best[0] < key:
+                            best = (key, destination)
+                if best is not None:
+                    destination = best[1]
+                    assignment[name] = destination
+                    loads[source] -= work[name]
+                    loads[destination] += work[name]
+                    moved = True
+            if not moved:
+                break
+        return assignment
+
+    def evaluate(self, assignment, remote_cost=1.):
+        """ Evaluate a partition of the objects, and estimate the speedup of a parallel simulation that uses it
+
+        The estimate assumes that each partition has its own core, that executing an event costs one unit of
+        time, and that sending or receiving an event from another partition costs `remote_cost` units. It ignores
+        the time partitions spend waiting for each other, so it's an upper bound.
+
+        Args:
+            assignment (:obj:`dict`): map from the name of each object to the index of its partition
+            remote_cost (:obj:`float`, optional): the cost of sending or receiving an event from another
+                partition, relative to the cost of executing an event
+
+        Returns:
+            :obj:`dict`: the `num_partitions`, the `work` of each partition, the `imbalance`, which is the ratio
+            of the maximum to the mean work, `num_events`, the number of events exchanged between partitions,
+            `num_cut_events` and `cut_volume`, their number and size, `min_cut_delay`, the minimum delay of the
+            events exchanged between partitions, which bounds the lookahead, and `estimated_speedup`
+
+        Raises:
+            :obj:`SimulatorError`: if an object isn't assigned a partition
+        """
+        unassigned = [name for name in self.work if name not in assignment]
+        if unassigned:
+            raise SimulatorError(f"objects are not assigned partitions: {', '.join(sorted(unassigned))}")
+        num_partitions = max(assignment.values(), default=-1) + 1
+        work = [0] * num_partitions
+        costs = [0.] * num_partitions
+        for name, num_events in self.work.items():
+            work[assignment[name]] += num_events
+            costs[assignment[name]] += num_events
+        num_cut_events = cut_volume = 0
+        min_cut_delay = math.inf
+        for (sender, receiver), edge in self.edges.items():
+            sender_partition = assignment[sender]
+            receiver_partition = assignment[receiver]
+            if sender_partition != receiver_partition:
+                num_events = edge[self.NUM_EVENTS]
+                num_cut_events += num_events
+                cut_volume += edge[self.VOLUME]
+                min_cut_delay = min(min_cut_delay, edge[self.MIN_DELAY])
+                costs[sender_partition] += remote_cost * num_events
+                costs[receiver_partition] += remote_cost * num_events
+        total_work = sum(work)
+        max_cost = max(costs, default=0)
+        return dict(num_partitions=num_partitions,
+                    work=work,
+                    imbalance=max(work) * num_partitions / total_work if total_work else math.nan,
+                    num_events=total_work,
+                    num_cut_events=num_cut_events,
+                    cut_volume=cut_volume,
+                    min_cut_delay=min_cut_delay,
+                    estimated_speedup=total_work / max_cost if max_cost else math.nan)
+
+    def report(self, assignment, remote_cost=1.):
+        """ Describe a partition of the objects, and the events' delays
+
+        Args:
+            assignment (:obj:`dict`): map from the name of each object to the index of its partition
+            remote_cost (:obj:`float`, optional): the cost of sending or receiving an event from another
+                partition, relative to the cost of executing an event
+
+        Returns:
+            :obj:`str`: a report of the partition's evaluation by :obj:`evaluate`, and the quantiles of the
+            events' delays
+        """
+        evaluation = self.evaluate(assignment, remote_cost=remote_cost)
+        num_events = evaluation['num_events']
+        cut_fraction = evaluation['num_cut_events'] / num_events if num_events else math.nan
+        lines = [f"{len(self.work)} objects, {num_events} events, in {evaluation['num_partitions']} partitions",
+                 f"work per partition: {evaluation['work']}",
+                 f"imbalance (max / mean work): {evaluation['imbalance']:.3f}",
+                 f"events between partitions: {evaluation['num_cut_events']} ({cut_fraction:.1%}), "
+                 f"{evaluation['cut_volume']} bytes",
+                 f"minimum delay of events between partitions: {evaluation['min_cut_delay']:.6g}",
+                 f"estimated speedup, with remote cost {remote_cost}: {evaluation['estimated_speedup']:.2f}",
+                 "delay quantiles: " + ', '.join(f"{quantile:g}: {delay:.6g}"
+                                                 for quantile, delay in self.get_delay_quantiles().items())]
+        return '\n'.join(lines)
+
+
+class CommunicationRecordingEventQueue(DelayRecordingEventQueue):
+    """ An event queue that records the :obj:`CommunicationGraph` of the events it schedules
+
+    Use :obj:`~de_sim.lookahead.DelayRecordingEventQueue.install` to install it in a simulator after the model
+    is built, so that the graph contains objects that don't communicate.
+
+    Attributes:
+        graph (:obj:`CommunicationGraph`): the communication graph
+        measure_volume (:obj:`bool`): whether to measure the size of each event's message, by pickling it
+    """
+
+    def __init__(self, backend='heap', measure_volume=True):
+        """
+        Args:
+            backend (:obj:`str`, optional): the name of the event queue backend
+            measure_volume (:obj:`bool`, optional): whether to measure the size of each event's message
+        """
+        super().__init__(backend=backend)
+        self.graph = CommunicationGraph()
+        self.measure_volume = measure_volume
+
+    @classmethod
+    def install(cls, simulator, **kwargs):
+        """ Make a simulator record the communication graph of the events it schedules
+
+        See :obj:`~de_sim.lookahead.DelayRecordingEventQueue.install`.
+        """
+        event_queue = super().install(simulator, **kwargs)
+        for name in simulator.simulation_objects:
+            event_queue.graph.add_object(name)
+        return event_queue
+
+    def record(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Record an event in the communication graph, and record its delay
+
+        See :obj:`~de_sim.lookahead.DelayRecordingEventQueue.record`.
+        """
+        super().record(send_time, receive_time, sending_object, receiving_object, event_message)
+        volume = len(pickle.dumps(event_message)) if self.measure_volume else 0
+        self.graph.add_event(sending_object.name, receiving_object.name, receive_time - send_time, volume)
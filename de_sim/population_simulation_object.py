@@ -0,0 +1,191 @@
+""" A simulation object that represents a population of agents with vectorized state
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-20
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import numpy
+
+from de_sim.errors import SimulatorError
+import de_sim
+
+
+class AgentEventsDue(de_sim.EventMessage, frozen=True):
+    "Events are due for agents in a population"
+
+
+class PopulationSimulationObject(de_sim.SimulationObject):
+    """ A :obj:`~de_sim.simulation_object.SimulationObject` that represents a population of identical agents
+
+    Rather than representing each agent by a :obj:`~de_sim.simulation_object.SimulationObject`, a population
+    stores its agents' state in NumPy arrays, which subclasses define. Each agent has at most one pending
+    event, whose time is stored in the array `next_event_times`. The population schedules one event in the
+    simulator's event queue, at the earliest pending agent event time. When it executes, all agents whose
+    events are due at that time are passed together to `handle_agent_events()`, as an array of agent indices,
+    so that their events can be executed with vectorized operations.
+
+    Finding the agents whose events are due scans `next_event_times`, which costs `O(size)` in vectorized
+    operations for each distinct agent event time. A population is therefore most efficient when many agents'
+    events occur at the same times, as in models that advance in discrete time steps.
+
+    To other simulation objects, a population is an ordinary :obj:`~de_sim.simulation_object.SimulationObject`,
+    which can send and receive events. A subclass that receives event messages from other objects should
+    register their types with the handler :obj:`PopulationSimulationObject.handle_population_events`, and
+    handle them in `handle_message()`.
+    These messages may then be superposed with agent events that occur at the same time. For example::
+
+        class Infect(EventMessage):
+            "Infect an agent"
+            agent: int
+
+        class Epidemic(PopulationSimulationObject):
+            event_handlers = PopulationSimulationObject.event_handlers + \
+                [(Infect, PopulationSimulationObject.handle_population_events)]
+            messages_sent = PopulationSimulationObject.messages_sent
+
+    Attributes:
+        size (:obj:`int`): the number of agents in the population
+        next_event_times (:obj:`numpy.ndarray`): the time of each agent's pending event, or `inf` if
+            the agent has no pending event
+        num_agent_events (:obj:`int`): the number of agent events executed
+        agent_events_due_event (:obj:`~de_sim.event.Event`): the population's pending
+            :obj:`AgentEventsDue` event, if any
+    """
+    __slots__ = ('size', 'next_event_times', 'num_agent_events', 'agent_events_due_event')
+
+    def __init__(self, name, size, **kwargs):
+        """ Initialize a :obj:`PopulationSimulationObject`
+
+        Args:
+            name (:obj:`str`): the population's name
+            size (:obj:`int`): the number of agents in the population
+            kwargs (:obj:`dict`): keyword arguments for :obj:`~de_sim.simulation_object.BaseSimulationObject`
+
+        Raises:
+            :obj:`SimulatorError`: if `size` is negative
+        """
+        if size < 0:
+            raise SimulatorError(f"population size must be non-negative, but is {size}")
+        self.size = size
+        self.next_event_times = numpy.full(size, numpy.inf)
+        self.num_agent_events = 0
+        self.agent_events_due_event = None
+        super().__init__(name, **kwargs)
+
+    def schedule_agent_events(self, agents, delays):
+        """ Schedule events for agents, replacing any events that they have pending
+
+        Args:
+            agents (:obj:`numpy.ndarray`): indices of the agents, or a boolean mask over the population
+            delays (:obj:`numpy.ndarray` or :obj:`float`): the delay of each agent's event, or one delay
+                for all of them
+
+        Raises:
+            :obj:`SimulatorError`: if `delays` is neither one delay nor a delay for each agent, or if any delay is
+                negative or NaN
+        """
+        agents = numpy.asarray(agents)
+        if agents.dtype == bool:
+            agents = numpy.flatnonzero(agents)
+        delays = numpy.asarray(delays, dtype=float)
+        if delays.ndim and delays.shape != agents.shape:
+            raise SimulatorError(f"delays must be one delay or a delay for each of the {agents.size} agents, "
+                                 f"but have shape {delays.shape}")
+        if not agents.size or not delays.size:
+            return
+        min_delay = delays.min()
+        if numpy.isnan(min_delay):
+            raise SimulatorError("delay is 'NaN'")
+        if min_delay < 0:
+            raise SimulatorError(f"delay < 0 in schedule_agent_events(): {min_delay}")
+        event_times = self.time + delays
+        self.next_event_times[agents] = event_times
+        self._schedule_agent_events_due(self.time + min_delay)
+
+    def cancel_agent_events(self, agents):
+        """ Cancel the pending events of agents
+
+        Args:
+            agents (:obj:`numpy.ndarray`): indices of the agents, or a boolean mask over the population
+        """
+        self.next_event_times[agents] = numpy.inf
+
+    def _schedule_agent_events_due(self, event_time):
+        """ Ensure that an :obj:`AgentEventsDue` event is scheduled at or before `event_time`
+
+        Args:
+            event_time (:obj:`float`): the time of the earliest agent event that must be executed
+        """
+        pending_event = self.agent_events_due_event
+        if pending_event is not None:
+            if pending_event.event_time <= event_time:
+                return
+            self.cancel_event(pending_event)
+        self.agent_events_due_event = self.send_event_absolute(event_time, self, AgentEventsDue())
+
+    def handle_population_events(self, event_or_events):
+        """ Handle the events received by this population
+
+        Messages sent by other objects are passed to `handle_message()`, and then the agents whose events
+        are due are passed to `handle_agent_events()`.
+
+        Args:
+            event_or_events (:obj:`~de_sim.event.Event` or :obj:`list` of :obj:`~de_sim.event.Event`): an event,
+                or superposed events
+        """
+        if isinstance(event_or_events, list):
+            events = event_or_events
+        else:
+            events = [event_or_events]
+        agent_events_due = False
+        for event in events:
+            if event.message.__class__ is AgentEventsDue:
+                agent_events_due = True
+            else:
+                self.handle_message(event)
+        if not agent_events_due:
+            return
+
+        self.agent_events_due_event = None
+        due_agents = numpy.flatnonzero(self.next_event_times <= self.time)
+        if due_agents.size:
+            self.next_event_times[due_agents] = numpy.inf
+            self.num_agent_events += due_agents.size
+            self.handle_agent_events(due_agents)
+        if self.size:
+            next_event_time = self.next_event_times.min()
+            if next_event_time < numpy.inf:
+                self._schedule_agent_events_due(next_event_time)
+
+    def handle_agent_events(self, agents):
+        """ Execute the events of agents whose events are due at the current time
+
+        Derived classes must override this method. The agents' events have been removed from
+        `next_event_times` before it is called, so it can schedule their next events.
+
+        Args:
+            agents (:obj:`numpy.ndarray`): the indices of the agents, in increasing order
+        """
+        pass    # pragma: no cover     # must be overridden
+
+    def handle_message(self, event):
+        """ Handle an event message sent to this population by another simulation object
+
+        Derived classes that register other message types with `handle_population_events` must override
+        this method.
+
+        Args:
+            event (:obj:`~de_sim.event.Event`): the event
+
+        Raises:
+            :obj:`SimulatorError`: if it is not overridden
+        """
+        raise SimulatorError(f"'{self.__class__.__name__}' does not handle '{event.message.__class__.__name__}' "
+                             f"messages; it must override handle_message()")
+
+    event_handlers = [(AgentEventsDue, handle_population_events)]
+
+    # register the message types sent
+    messages_sent = [AgentEventsDue]
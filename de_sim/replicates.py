@@ -0,0 +1,289 @@
+""" Run many independent stochastic replicates of a model in lockstep
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-24
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import numpy
+
+from de_sim.errors import SimulatorError
+from de_sim.event_message import EventMessage
+
+
+class ReplicateRandomStreams(object):
+    """ Independent random number streams for replicates, which are drawn from in vectorized operations
+
+    Each replicate has its own :obj:`numpy.random.RandomState`. Its random numbers are generated in blocks, so that
+    the numbers drawn for many replicates can be gathered into an array without a Python call per replicate.
+    A replicate's sequence of draws from `random_sample()` and `exponential()` equals the sequence produced by
+    the same calls to its :obj:`numpy.random.RandomState`, one at a time, as a sequential simulation makes them.
+
+    Attributes:
+        random_states (:obj:`list` of :obj:`numpy.random.RandomState`): each replicate's random state
+        block_size (:obj:`int`): the number of random numbers generated at once for a replicate
+        uniforms (:obj:`numpy.ndarray`): a block of uniform random numbers for each replicate
+        standard_exponentials (:obj:`numpy.ndarray`): the standard exponential random numbers that correspond to
+            `uniforms`
+        positions (:obj:`numpy.ndarray`): the position of each replicate's next random number in its block
+    """
+    # default number of random numbers generated at once for a replicate
+    BLOCK_SIZE = 256
+
+    def __init__(self, seeds, block_size=BLOCK_SIZE):
+        """
+        Args:
+            seeds (:obj:`list` of :obj:`int`): a seed for each replicate's random state
+            block_size (:obj:`int`, optional): the number of random numbers generated at once for a replicate
+        """
+        self.random_states = [numpy.random.RandomState(seed) for seed in seeds]
+        self.block_size = block_size
+        self.uniforms = numpy.empty((len(seeds), block_size))
+        self.standard_exponentials = numpy.empty((len(seeds), block_size))
+        # all blocks start exhausted
+        self.positions = numpy.full(len(seeds), block_size)
+
+    def _refill(self, replicate):
+        """ Generate a new block of random numbers for a replicate
+
+        Each random double in the replicate's stream is stored both as a uniform and as the standard exponential
+        that :obj:`numpy.random.RandomState` derives from it, so draws of either type consume the stream as a
+        :obj:`numpy.random.RandomState` does.
+
+        Args:
+            replicate (:obj:`int`): the replicate's index
+        """
+        random_state = self.random_states[replicate]
+        state = random_state.get_state()
+        self.uniforms[replicate] = random_state.random_sample(self.block_size)
+        random_state.set_state(state)
+        self.standard_exponentials[replicate] = random_state.standard_exponential(self.block_size)
+        self.positions[replicate] = 0
+
+    def _next_positions(self, replicates):
+        """ Get the positions of the next random numbers of replicates, and advance them
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): distinct replicate indices
+
+        Returns:
+            :obj:`numpy.ndarray`: the position of each replicate's next random number in its block
+        """
+        positions = self.positions[replicates]
+        exhausted = positions == self.block_size
+        if exhausted.any():
+            for replicate in replicates[exhausted]:
+                self._refill(replicate)
+            positions[exhausted] = 0
+        self.positions[replicates] = positions + 1
+        return positions
+
+    def random_sample(self, replicates):
+        """ Draw a uniform random number in [0, 1) for each of some replicates
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): distinct replicate indices
+
+        Returns:
+            :obj:`numpy.ndarray`: a random number for each replicate
+        """
+        return self.uniforms[replicates, self._next_positions(replicates)]
+
+    def exponential(self, replicates, scale):
+        """ Draw an exponentially distributed random number for each of some replicates
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): distinct replicate indices
+            scale (:obj:`numpy.ndarray` or :obj:`float`): the scale, i.e., the mean, of each replicate's
+                distribution
+
+        Returns:
+            :obj:`numpy.ndarray`: a random number for each replicate
+        """
+        return scale * self.standard_exponentials[replicates, self._next_positions(replicates)]
+
+
+class ReplicateModel(object):
+    """ A model whose independent replicates are executed in lockstep by a :obj:`ReplicateSimulator`
+
+    A :obj:`ReplicateModel` describes one simulation object, and stores the state of all of its replicates in
+    arrays indexed by replicate. Each replicate has at most one pending event, which it schedules for itself.
+    Like a :obj:`~de_sim.simulation_object.SimulationObject`, a :obj:`ReplicateModel` registers a handler for
+    each message type in `event_handlers`. A handler receives an array of the indices of the replicates that
+    are executing an event with the handler's message type. Messages carry no data, and are identified by
+    their type.
+
+    Attributes:
+        simulator (:obj:`ReplicateSimulator`): the simulator that runs this model
+    """
+    # a list of (message type, name of handler method) pairs
+    event_handlers = []
+
+    def __init__(self):
+        self.simulator = None
+
+    def init_before_run(self, replicates):
+        """ Initialize the state of all replicates, and schedule their initial events
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): the indices of all replicates
+        """
+        pass    # pragma: no cover     # must be overridden
+
+    @property
+    def time(self):
+        """ Get the simulation time of each replicate
+
+        Returns:
+            :obj:`numpy.ndarray`: the time of each replicate
+        """
+        return self.simulator.time
+
+    @property
+    def random(self):
+        """ Get the replicates' random number streams
+
+        Returns:
+            :obj:`ReplicateRandomStreams`: the replicates' random number streams
+        """
+        return self.simulator.random_streams
+
+    def schedule_events(self, replicates, delays, message_type):
+        """ Schedule an event for each of some replicates
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): distinct indices of replicates which have no pending event
+            delays (:obj:`numpy.ndarray` or :obj:`float`): the delay of each replicate's event
+            message_type (:obj:`type`): the message type of the events
+
+        Raises:
+            :obj:`SimulatorError`: see :obj:`ReplicateSimulator.schedule_events`
+        """
+        self.simulator.schedule_events(replicates, delays, message_type)
+
+
+class ReplicateSimulator(object):
+    """ Run independent stochastic replicates of a :obj:`ReplicateModel` in lockstep
+
+    Because replicates are independent, each can execute its events without regard to the times of the others.
+    Each step of a :obj:`ReplicateSimulator` executes the pending event of every replicate whose event occurs
+    before the end time, by calling each handler once with the array of replicates whose event has its message
+    type. Thus the interpreter overhead of an event is amortized over all replicates. A replicate with random
+    streams seeded by `seed` produces the same events and state as a sequential simulation whose object uses a
+    :obj:`numpy.random.RandomState` seeded by `seed` and draws the same random numbers.
+
+    Attributes:
+        model (:obj:`ReplicateModel`): the model being simulated
+        num_replicates (:obj:`int`): the number of replicates
+        seeds (:obj:`numpy.ndarray`): the seed of each replicate's random number stream
+        random_streams (:obj:`ReplicateRandomStreams`): each replicate's random number stream
+        time (:obj:`numpy.ndarray`): the time of each replicate's last event
+        next_event_times (:obj:`numpy.ndarray`): the time of each replicate's pending event, or `inf`
+        next_message_types (:obj:`numpy.ndarray`): the index in `handlers` of each replicate's pending event, or -1
+        num_events (:obj:`numpy.ndarray`): the number of events executed by each replicate
+        message_types (:obj:`dict`): map from each message type handled by the model to its index in `handlers`
+        handlers (:obj:`list` of :obj:`method`): the model's bound handler methods
+    """
+
+    def __init__(self, model, num_replicates, seeds=None):
+        """
+        Args:
+            model (:obj:`ReplicateModel`): the model to simulate
+            num_replicates (:obj:`int`): the number of replicates
+            seeds (:obj:`list` of :obj:`int`, optional): the seed of each replicate's random number stream;
+                random seeds are used if not provided
+
+        Raises:
+            :obj:`SimulatorError`: if `num_replicates` is not positive, or `seeds` has the wrong length, or
+                a message type in the model's `event_handlers` is not an
+                :obj:`~de_sim.event_message.EventMessage` or its handler is not a method of the model
+        """
+        if num_replicates < 1:
+            raise SimulatorError(f"num_replicates must be positive, but is {num_replicates}")
+        if seeds is None:
+            seeds = numpy.random.randint(2**32, size=num_replicates, dtype=numpy.int64)
+        if len(seeds) != num_replicates:
+            raise SimulatorError(f"{len(seeds)} seeds provided for {num_replicates} replicates")
+        self.model = model
+        self.num_replicates = num_replicates
+        self.seeds = numpy.asarray(seeds)
+        self.message_types = {}
+        self.handlers = []
+        for message_type, handler_name in model.event_handlers:
+            if not (isinstance(message_type, type) and issubclass(message_type, EventMessage)):
+                raise SimulatorError(f"'{message_type}' is not a subclass of EventMessage")
+            if not callable(getattr(model, handler_name, None)):
+                raise SimulatorError(f"'{model.__class__.__name__}' does not have handler '{handler_name}'")
+            self.message_types[message_type] = len(self.handlers)
+            self.handlers.append(getattr(model, handler_name))
+        model.simulator = self
+        self.random_streams = None
+        self.time = None
+        self.next_event_times = None
+        self.next_message_types = None
+        self.num_events = None
+
+    def schedule_events(self, replicates, delays, message_type):
+        """ Schedule an event for each of some replicates
+
+        Args:
+            replicates (:obj:`numpy.ndarray`): distinct indices of replicates which have no pending event
+            delays (:obj:`numpy.ndarray` or :obj:`float`): the delay of each replicate's event
+            message_type (:obj:`type`): the message type of the events
+
+        Raises:
+            :obj:`SimulatorError`: if `message_type` is not handled by the model, or a delay is negative or NaN,
+                or a replicate already has a pending event
+        """
+        if message_type not in self.message_types:
+            raise SimulatorError(f"'{self.model.__class__.__name__}' does not handle '{message_type.__name__}' "
+                                 f"messages")
+        replicates = numpy.asarray(replicates)
+        if not replicates.size:
+            return
+        delays = numpy.asarray(delays, dtype=float)
+        if numpy.isnan(delays).any():
+            raise SimulatorError("delay is 'NaN'")
+        if (delays < 0).any():
+            raise SimulatorError(f"delay < 0 in schedule_events(): {delays.min()}")
+        if (0 <= self.next_message_types[replicates]).any():
+            raise SimulatorError("a replicate can have only one pending event")
+        self.next_event_times[replicates] = self.time[replicates] + delays
+        self.next_message_types[replicates] = self.message_types[message_type]
+
+    def simulate(self, max_time, time_init=0.):
+        """ Run all replicates
+
+        Args:
+            max_time (:obj:`float`): the time at which the replicates end; events at `max_time` are executed
+            time_init (:obj:`float`, optional): the replicates' initial time
+
+        Returns:
+            :obj:`numpy.ndarray`: the number of events executed by each replicate
+        """
+        num_replicates = self.num_replicates
+        self.random_streams = ReplicateRandomStreams(self.seeds)
+        self.time = numpy.full(num_replicates, float(time_init))
+        self.next_event_times = numpy.full(num_replicates, numpy.inf)
+        self.next_message_types = numpy.full(num_replicates, -1)
+        self.num_events = numpy.zeros(num_replicates, dtype=int)
+        self.model.init_before_run(numpy.arange(num_replicates))
+
+        while True:
+            stepping = numpy.flatnonzero(self.next_event_times <= max_time)
+            if not stepping.size:
+                break
+            self.time[stepping] = self.next_event_times[stepping]
+            message_types = self.next_message_types[stepping]
+            self.next_event_times[stepping] = numpy.inf
+            self.next_message_types[stepping] = -1
+            self.num_events[stepping] += 1
+            if len(self.handlers) == 1:
+                self.handlers[0](stepping)
+            else:
+                for index, handler in enumerate(self.handlers):
+                    replicates = stepping[message_types == index]
+                    if replicates.size:
+                        handler(replicates)
+        return self.num_events
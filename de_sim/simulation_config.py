@@ -12,6 +12,7 @@ import os
 
 from de_sim.checkpoint import AccessCheckpoints
 from de_sim.errors import SimulatorError
+from de_sim.event_queue_backends import EVENT_QUEUE_BACKENDS
 from wc_utils.util.misc import EnhancedDataClass
 
 
@@ -26,6 +27,10 @@ class SimulationConfig(EnhancedDataClass):
     - Progress bar switch
     - Performance profiling switch
     - Configure profiling of heap memory use
+    - Event queue backend
+    - Event recycling switches
+    - Event count sampling
+    - Event trace file
 
     Attributes:
         max_time (:obj:`float`): maximum simulation time
@@ -42,6 +47,18 @@ class SimulationConfig(EnhancedDataClass):
         object_memory_change_interval (:obj:`int`, optional): number of simulation events between reporting
             changes in heap object count and memory use; if 0 do not report; defaults to do not report;
             cannot be used with `profile` as they run much too slowly
+        event_queue_backend (:obj:`str`, optional): the name of the priority queue that stores the
+            simulation's events, a key in :obj:`~de_sim.event_queue_backends.EVENT_QUEUE_BACKENDS`;
+            defaults to `'heap'`
+        recycle_events (:obj:`bool`, optional): if `True`, reuse executed events that are no longer referenced,
+            to reduce memory allocation
+        strict_event_recycling (:obj:`bool`, optional): if `True`, raise an exception when an executed event
+            cannot be recycled because it's still referenced
+        event_count_interval (:obj:`int`, optional): count the events in every `event_count_interval`-th
+            dispatch of events to a simulation object; if 0 do not count events; defaults to 1, which
+            counts all events
+        trace_file (:obj:`str`, optional): if provided, a file to which a binary trace of the executed events
+            is written, which :obj:`~de_sim.trace.EventTrace` reads; its directory must exist
     """
 
     max_time: float
@@ -51,6 +68,11 @@ class SimulationConfig(EnhancedDataClass):
     progress: bool = False
     profile: bool = False
     object_memory_change_interval: int = 0
+    event_queue_backend: str = 'heap'
+    recycle_events: bool = False
+    strict_event_recycling: bool = False
+    event_count_interval: int = 1
+    trace_file: str = None
     DO_NOT_PICKLE = ['stop_condition']
 
     def __setattr__(self, name, value):
@@ -101,6 +123,22 @@ class SimulationConfig(EnhancedDataClass):
             raise SimulatorError(f"object_memory_change_interval ('{self.object_memory_change_interval}') "
                                  "must be non-negative")
 
+        # make sure event_count_interval is non-negative
+        if self.event_count_interval < 0:
+            raise SimulatorError(f"event_count_interval ('{self.event_count_interval}') must be non-negative")
+
+        # validate trace_file and convert to absolute path
+        if self.trace_file is not None:
+            absolute_trace_file = os.path.abspath(os.path.expanduser(self.trace_file))
+            if not os.path.isdir(os.path.dirname(absolute_trace_file)):
+                raise SimulatorError(f"directory of trace_file '{absolute_trace_file}' does not exist")
+            self.trace_file = absolute_trace_file
+
+        # make sure event_queue_backend names a backend
+        if self.event_queue_backend not in EVENT_QUEUE_BACKENDS:
+            raise SimulatorError(f"event_queue_backend ('{self.event_queue_backend}') must be one of "
+                                 f"{', '.join(EVENT_QUEUE_BACKENDS)}")
+
     def validate(self):
         """ Validate a `SimulationConfig` instance
 
@@ -119,6 +157,9 @@ class SimulationConfig(EnhancedDataClass):
         if self.max_time <= self.time_init:
             raise SimulatorError(f'max_time ({self.max_time}) must be greater than time_init ({self.time_init})')
 
+        if self.strict_event_recycling and not self.recycle_events:
+            raise SimulatorError('strict_event_recycling requires recycle_events')
+
         if self.profile and 0 < self.object_memory_change_interval:
             raise SimulatorError('profile and object_memory_change_interval cannot both be active, '
                                  'as the combination slows DE Sim dramatically')
@@ -9,6 +9,7 @@
 from abc import ABCMeta
 from copy import deepcopy
 from enum import IntEnum
+from numbers import Real
 import abc
 import math
 import warnings
@@ -28,6 +29,10 @@ class BaseSimulationObject(object):
     which includes
     the object's `name` (which must be unique), its simulation time, and a `send_event()` method.
 
+    Its attributes are stored in `__slots__`, so a subclass which also defines `__slots__` has no per-instance
+    `__dict__`. Objects constructed with a `simulator` share its configuration and loggers rather than loading
+    their own. Together, these make models with very many objects faster to build and smaller.
+
     Attributes:
         name (:obj:`str`): this simulation object's name, which must be unique across all simulation objects
             handled by a :obj:`~de_sim.simulator.Simulator`
@@ -38,15 +43,29 @@ class BaseSimulationObject(object):
         num_events (:obj:`int`): number of events processed
         simulator (:obj:`~de_sim.simulator.Simulator`): the :obj:`~de_sim.simulator.Simulator` that uses
             this :class:`BaseSimulationObject`
+        event_rank (:obj:`int`): this object's rank in the (class priority, tiebreaker) order of all objects
+            in its simulation, assigned when the simulation is initialized; :obj:`None` if not assigned
+        trusted_sends (:obj:`bool`): whether to skip checking the events this object sends; initialized from the
+            `trusted_sends` configuration option
+        copy_event_bodies (:obj:`bool`): whether to copy the messages this object sends by default; initialized
+            from the `copy_event_bodies` configuration option
         debug_logs (:obj:`wc_utils.debug_logs.core.DebugLogsManager`): the debug logs
+        checked_routes (:obj:`set`): class attribute containing the (sender class, receiver class, message class)
+            routes whose message types have been checked by `send_event_absolute()`
     """
+    __slots__ = ('name', 'time', 'num_events', 'simulator', 'event_rank', 'event_time_tiebreaker', 'log_events',
+                 'trusted_sends', 'copy_event_bodies', 'debug_logs', 'fast_debug_file_logger',
+                 'fast_plot_file_logger')
+    checked_routes = set()
 
-    def __init__(self, name, start_time=0, **kwargs):
+    def __init__(self, name, start_time=0, simulator=None, **kwargs):
         """ Initialize a :class:`BaseSimulationObject`.
 
         Args:
             name (:obj:`str`): the object's unique name, used as a key in the dict of objects
             start_time (:obj:`float`, optional): the earliest time at which this object can execute an event
+            simulator (:obj:`~de_sim.simulator.Simulator`, optional): if provided, take the configuration and
+                loggers from `simulator`, and add this object to it; otherwise, load the configuration and loggers
             kwargs (:obj:`dict`): which can contain:
             event_time_tiebreaker (:obj:`str`, optional): used to break ties among simultaneous
                 events; must be unique across all instances of a :obj:`SimulationObject`
@@ -56,15 +75,26 @@ class BaseSimulationObject(object):
         self.time = start_time
         self.num_events = 0
         self.simulator = None
+        self.event_rank = None
         if 'event_time_tiebreaker' in kwargs and kwargs['event_time_tiebreaker']:
             self.event_time_tiebreaker = kwargs['event_time_tiebreaker']
         else:
             self.event_time_tiebreaker = name
-        config = core.get_config()
-        self.log_events = config['de_sim']['log_events']
-        self.debug_logs = core.get_debug_logs()
-        self.fast_debug_file_logger = FastLogger(self.debug_logs.get_log('de_sim.debug.file'), 'debug')
-        self.fast_plot_file_logger = FastLogger(self.debug_logs.get_log('de_sim.plot.file'), 'debug')
+        if simulator is None:
+            config = core.get_config()['de_sim']
+            self.debug_logs = core.get_debug_logs()
+            self.fast_debug_file_logger = FastLogger(self.debug_logs.get_log('de_sim.debug.file'), 'debug')
+            self.fast_plot_file_logger = FastLogger(self.debug_logs.get_log('de_sim.plot.file'), 'debug')
+        else:
+            config = simulator.de_sim_config
+            self.debug_logs = simulator.debug_logs
+            self.fast_debug_file_logger = simulator.fast_debug_file_logger
+            self.fast_plot_file_logger = simulator.fast_plotting_logger
+        self.log_events = config['log_events']
+        self.trusted_sends = config['trusted_sends']
+        self.copy_event_bodies = config['copy_event_bodies']
+        if simulator is not None:
+            simulator.add_object(self)
 
     def set_simulator(self, simulator):
         """ Set this object's simulator reference
@@ -82,11 +112,12 @@ class BaseSimulationObject(object):
         raise SimulatorError("SimulationObject '{}' is already part of a simulator".format(self.name))
 
     def del_simulator(self):
-        """ Delete this object's simulator reference
+        """ Delete this object's simulator reference, and its rank in the simulator
         """
         self.simulator = None
+        self.event_rank = None
 
-    def send_event_absolute(self, event_time, receiving_object, message, copy=False):
+    def send_event_absolute(self, event_time, receiving_object, message, copy=None):
         """ Schedule an event containing an event message with an absolute event time.
 
         Args:
@@ -94,9 +125,12 @@ class BaseSimulationObject(object):
             receiving_object (:obj:`SimulationObject`): the simulation object that will receive and
                 execute the event
             message (:obj:`~de_sim.event_message.EventMessage`): the event message which will be carried by the event
-            copy (:obj:`bool`, optional): if :obj:`True`, copy the message before adding it to the event;
-                set :obj:`False` by default to optimize performance; set :obj:`True` as a safety measure to avoid
-                unexpected changes to shared objects
+            copy (:obj:`bool`, optional): if :obj:`True`, deepcopy the message before adding it to the event,
+                as a safety measure to avoid unexpected changes to shared objects; frozen messages are never
+                copied; defaults to `copy_event_bodies`
+
+        Returns:
+            :obj:`~de_sim.event.Event`: the scheduled event, a handle that can be passed to `cancel_event()`
 
         Raises:
             :obj:`SimulatorError`: if `event_time < 0`, or
@@ -104,11 +138,54 @@ class BaseSimulationObject(object):
                 if the receiving simulation object type is not registered to receive
                 messages with the type of `message`
         """
+        if not self.trusted_sends:
+            self._check_send(event_time, receiving_object, message)
+
+        if copy is None:
+            copy = self.copy_event_bodies
+        if copy and not message._frozen:
+            message = deepcopy(message)
+
+        event = self.simulator.event_queue.schedule_event(self.time, event_time, self,
+                                                          receiving_object, message)
+        if self.fast_debug_file_logger.active:
+            self.log_with_time("Send: ({}, {:6.2f}) -> ({}, {:6.2f}): {}", self.name, self.time,
+                               receiving_object.name, event_time, message.__class__.__name__)
+        return event
+
+    def _check_send(self, event_time, receiving_object, message):
+        """ Check that this object can send an event
+
+        The message type checks depend only on the route, (sender class, receiver class, message class),
+        so each route is checked once and then cached in `checked_routes`.
+
+        Args:
+            event_time (:obj:`float`): the absolute simulation time at which `receiving_object` will execute the event
+            receiving_object (:obj:`SimulationObject`): the simulation object that will receive the event
+            message (:obj:`~de_sim.event_message.EventMessage`): the event message carried by the event
+
+        Raises:
+            :obj:`SimulatorError`: if `event_time` is NaN or earlier than the current time, or
+                if the event's delay is less than the minimum delay its sender's class declares for `message`'s
+                type, or
+                if the sending object type is not registered to send messages with the type of `message`, or
+                if the receiving simulation object type is not registered to receive
+                messages with the type of `message`
+        """
         if math.isnan(event_time):
             raise SimulatorError("event_time is 'NaN'")
         if event_time < self.time:
             raise SimulatorError("event_time ({}) < current time ({}) in send_event_absolute()".format(
                 round_direct(event_time, precision=3), round_direct(self.time, precision=3)))
+        min_delay = self.__class__.metadata.min_delays.get(message.__class__)
+        if min_delay is not None and event_time < self.time + min_delay:
+            raise SimulatorError(f"delay ({event_time - self.time}) of '{message.__class__.__name__}' message sent "
+                                 f"by '{self.name}' is less than the minimum delay ({min_delay}) declared by "
+                                 f"'{self.__class__.__name__}'")
+
+        route = (self.__class__, receiving_object.__class__, message.__class__)
+        if route in BaseSimulationObject.checked_routes:
+            return
 
         # Do not put a class reference in a message, as the message might not be received in the
         # same address space.
@@ -130,17 +207,9 @@ class BaseSimulationObject(object):
         if message.__class__ not in receiver_priorities:
             raise SimulatorError("'{}' simulation objects not registered to receive '{}' messages".format(
                 most_qual_cls_name(receiving_object), event_type_name))
+        BaseSimulationObject.checked_routes.add(route)
 
-        if copy:
-            message = deepcopy(message)
-
-        self.simulator.event_queue.schedule_event(self.time, event_time, self,
-                                                  receiving_object, message)
-        self.log_with_time("Send: ({}, {:6.2f}) -> ({}, {:6.2f}): {}".format(self.name, self.time,
-                                                                             receiving_object.name, event_time,
-                                                                             message.__class__.__name__))
-
-    def send_event(self, delay, receiving_object, event_message, copy=False):
+    def send_event(self, delay, receiving_object, event_message, copy=None):
         """ Schedule an event containing an event message, specifying the event time as a delay.
 
         Simulation object `X` sends an event to simulation object `Y` by invoking
@@ -153,12 +222,17 @@ class BaseSimulationObject(object):
                 execute the event
             event_message (:obj:`~de_sim.event_message.EventMessage`): the event message which will be
                 carried by the event
-            copy (:obj:`bool`, optional): if :obj:`True`, copy the message before adding it to the event;
-                set :obj:`False` by default to optimize performance; set :obj:`True` as a safety measure to avoid
-                unexpected changes to shared objects
+            copy (:obj:`bool`, optional): if :obj:`True`, deepcopy the message before adding it to the event,
+                as a safety measure to avoid unexpected changes to shared objects; frozen messages are never
+                copied; defaults to `copy_event_bodies`
+
+        Returns:
+            :obj:`~de_sim.event.Event`: the scheduled event, a handle that can be passed to `cancel_event()`
 
         Raises:
             :obj:`SimulatorError`: if `delay` < 0 or `delay` is NaN, or
+                if `delay` is less than the minimum delay declared for the type of `event_message` in the
+                sending object type's `min_delays`, or
                 if the sending object type is not registered to send messages with the type of `event_message`, or
                 if the receiving simulation object type is not registered to receive messages with
                 the type of `event_message`
@@ -167,7 +241,110 @@ class BaseSimulationObject(object):
             raise SimulatorError("delay is 'NaN'")
         if delay < 0:
             raise SimulatorError("delay < 0 in send_event(): {}".format(str(delay)))
-        self.send_event_absolute(delay + self.time, receiving_object, event_message, copy=copy)
+        return self.send_event_absolute(delay + self.time, receiving_object, event_message, copy=copy)
+
+    def send_events(self, events, copy=None):
+        """ Schedule many events in one bulk operation, specifying their event times as delays
+
+        All events are checked before any are scheduled.
+
+        Args:
+            events (:obj:`iterable` of :obj:`tuple`): for each event, a tuple containing (delay,
+                receiving object, event message), as in `send_event()`
+            copy (:obj:`bool`, optional): if :obj:`True`, deepcopy the messages that aren't frozen before adding
+                them to the events; defaults to `copy_event_bodies`
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.event.Event`: the scheduled events, in the order of `events`
+
+        Raises:
+            :obj:`SimulatorError`: if any event could not be sent by `send_event()`
+        """
+        if copy is None:
+            copy = self.copy_event_bodies
+        events_args = []
+        for delay, receiving_object, event_message in events:
+            if math.isnan(delay):
+                raise SimulatorError("delay is 'NaN'")
+            if delay < 0:
+                raise SimulatorError("delay < 0 in send_events(): {}".format(str(delay)))
+            event_time = delay + self.time
+            if not self.trusted_sends:
+                self._check_send(event_time, receiving_object, event_message)
+            if copy and not event_message._frozen:
+                event_message = deepcopy(event_message)
+            events_args.append((self.time, event_time, self, receiving_object, event_message))
+        scheduled_events = self.simulator.event_queue.schedule_events(events_args)
+        self.log_with_time("Send: ({}, {:6.2f}) -> {} events", self.name, self.time, len(scheduled_events))
+        return scheduled_events
+
+    def send_event_multicast(self, delay, receiving_objects, event_message, copy=None):
+        """ Schedule events that deliver one event message to many receivers, specifying the event time as a delay
+
+        The message is checked once for each class of receiver, and the events are scheduled in one bulk
+        operation. Unless the message is copied, all the events share it, so it should be frozen or not
+        modified by its receivers.
+
+        Args:
+            delay (:obj:`float`): the simulation delay at which the receivers should execute the events
+            receiving_objects (:obj:`iterable` of :obj:`SimulationObject`): the simulation objects that will
+                receive and execute the events
+            event_message (:obj:`~de_sim.event_message.EventMessage`): the event message which will be
+                carried by the events
+            copy (:obj:`bool`, optional): if :obj:`True` and the message isn't frozen, give each event a deepcopy
+                of the message; defaults to `copy_event_bodies`
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.event.Event`: the scheduled events, in the order of `receiving_objects`
+
+        Raises:
+            :obj:`SimulatorError`: if `delay` < 0 or `delay` is NaN, or
+                if the sending object type is not registered to send messages with the type of `event_message`, or
+                if the type of any receiving simulation object is not registered to receive messages with
+                the type of `event_message`
+        """
+        if math.isnan(delay):
+            raise SimulatorError("delay is 'NaN'")
+        if delay < 0:
+            raise SimulatorError("delay < 0 in send_event_multicast(): {}".format(str(delay)))
+        event_time = delay + self.time
+        receiving_objects = list(receiving_objects)
+        if not self.trusted_sends:
+            checked_receiver_classes = set()
+            for receiving_object in receiving_objects:
+                if receiving_object.__class__ not in checked_receiver_classes:
+                    self._check_send(event_time, receiving_object, event_message)
+                    checked_receiver_classes.add(receiving_object.__class__)
+
+        if copy is None:
+            copy = self.copy_event_bodies
+        if copy and not event_message._frozen:
+            scheduled_events = self.simulator.event_queue.schedule_events(
+                [(self.time, event_time, self, receiving_object, deepcopy(event_message))
+                 for receiving_object in receiving_objects])
+        else:
+            scheduled_events = self.simulator.event_queue.schedule_multicast(self.time, event_time, self,
+                                                                             receiving_objects, event_message)
+        self.log_with_time("Send: ({}, {:6.2f}) -> {} receivers: {}", self.name, self.time,
+                           len(scheduled_events), event_message.__class__.__name__)
+        return scheduled_events
+
+    def cancel_event(self, event):
+        """ Cancel an event that this simulation object scheduled, so that it will not be executed
+
+        For example, an object that schedules a timeout can cancel it if the awaited event arrives first.
+
+        Args:
+            event (:obj:`~de_sim.event.Event`): an event returned by `send_event()` or `send_event_absolute()`
+
+        Raises:
+            :obj:`SimulatorError`: if this object did not send `event`, or
+                if `event` has already been cancelled or executed
+        """
+        if event.sending_object is not self:
+            raise SimulatorError("'{}' cannot cancel an event sent by '{}'".format(self.name,
+                                                                                   event.sending_object.name))
+        self.simulator.event_queue.cancel_event(event)
 
     @staticmethod
     def register_handlers(subclass, handlers):
@@ -203,6 +380,13 @@ class BaseSimulationObject(object):
         for index, (message_type, _) in enumerate(handlers):
             subclass.metadata.event_handler_priorities[message_type] = index
 
+        # message types that share a handler can be superposed
+        message_types_by_handler = {}
+        for message_type, handler in subclass.metadata.event_handlers_dict.items():
+            message_types_by_handler.setdefault(handler, set()).add(message_type)
+        for message_type, handler in subclass.metadata.event_handlers_dict.items():
+            subclass.metadata.superposition_groups[message_type] = frozenset(message_types_by_handler[handler])
+
     @staticmethod
     def register_sent_messages(subclass, sent_messages):
         """ Register the messages sent by a :class:`BaseSimulationObject` subclass
@@ -271,28 +455,30 @@ class BaseSimulationObject(object):
         if 1 == len(event_list):
             event = event_list[0]
             try:
-                handler = self.__class__.metadata.event_handlers_dict[event.message.__class__]
-                handler(self, event)
+                handler = self._dispatch_table[event.message.__class__]
             except KeyError:  # pragma: no cover
                 # unreachable because of check that receiving sim
                 # obj type is registered to receive the message type
                 raise SimulatorError("No handler registered for event message type: '{}'".format(
                     event.message.__class__.__name__))
+            handler(self, event)
 
         # if multiple event messages are being handled, pass them as a list to an event handler,
         # which is known as "superposition"
         else:
+            message_type = event_list[0].message.__class__
             try:
-                handler = self.__class__.metadata.event_handlers_dict[event_list[0].message.__class__]
-                for event in event_list[1:]:
-                    if handler != self.__class__.metadata.event_handlers_dict[event.message.__class__]:
-                        message_types = set([type(event.message).__name__ for event in event_list])
-                        raise SimulatorError(f"Superposition requires message types {message_types} have same handler")
-                handler(self, event_list)
+                handler = self._dispatch_table[message_type]
             except KeyError:  # pragma: no cover
                 # unreachable because of check that receiving sim obj type is registered to receive the message type
                 raise SimulatorError("No handler registered for event message type: '{}'".format(
-                    event.message.__class__.__name__))
+                    message_type.__name__))
+            superposition_group = self._superposition_groups[message_type]
+            for event in event_list:
+                if event.message.__class__ not in superposition_group:
+                    message_types = set([type(event.message).__name__ for event in event_list])
+                    raise SimulatorError(f"Superposition requires message types {message_types} have same handler")
+            handler(self, event_list)
 
     @property
     def class_event_priority(self):
@@ -303,13 +489,18 @@ class BaseSimulationObject(object):
         """
         return self.__class__.metadata.class_priority
 
-    def log_with_time(self, msg):
+    def log_with_time(self, msg, *args):
         """ Write a debug log message with the simulation time.
+
+        Args:
+            msg (:obj:`str`): the log message, or a format string if `args` are provided
+            args (:obj:`tuple`): values formatted into `msg`, only if the log is active
         """
-        self.fast_debug_file_logger.fast_log(msg, sim_time=self.time)
+        self.fast_debug_file_logger.fast_log(msg, *args, sim_time=self.time)
 
 
 class SimulationObjectInterface(object, metaclass=ABCMeta):  # pragma: no cover
+    __slots__ = ()
 
     @abc.abstractmethod
     def init_before_run(self):
@@ -365,12 +556,18 @@ class SimulationObjectMetadata(object):
             priority is 0, and priority decreases with increasing priority values.
         message_types_sent (:obj:`set`): the types of messages a subclass of :class:`BaseSimulationObject` has
             registered to send
+        superposition_groups (:obj:`dict`): maps message_type -> the :obj:`frozenset` of message types that
+            have the same event handler, and therefore can be superposed with it
+        min_delays (:obj:`dict`): maps message_type -> the minimum delay of the messages of that type sent by
+            a subclass of :class:`BaseSimulationObject`, for the message types whose minimum delays it declares
     """
 
     def __init__(self):
         self.event_handlers_dict = {}
         self.event_handler_priorities = {}
+        self.superposition_groups = {}
         self.message_types_sent = set()
+        self.min_delays = {}
         self.class_priority = SimObjClassPriority.LOW
 
 
@@ -379,6 +576,8 @@ class SimulationObjMeta(type):
     EVENT_HANDLERS = 'event_handlers'
     # messages sent list keyword
     MESSAGES_SENT = 'messages_sent'
+    # keyword for a map from message types sent to their minimum delays
+    MIN_DELAYS = 'min_delays'
     # keyword for a class' 'subtime' priority, used to order concurrent events among classes
     CLASS_PRIORITY = 'class_priority'
 
@@ -400,7 +599,8 @@ class SimulationObjMeta(type):
                     :obj:`SimulationObject`,
                 or if `event_handlers` isn't an iterator over pairs,
                 or if a message type sent isn't a subclass of :obj:`~de_sim.event_message.EventMessage`,
-                or if `messages_sent` isn't an iterator over pairs.
+                or if `messages_sent` isn't an iterator over pairs,
+                or if `min_delays` isn't a :obj:`dict` that maps message types sent to non-negative numbers.
         """
         # Short circuit when SimulationObject is defined
         if clsname == 'SimulationObject':
@@ -408,10 +608,17 @@ class SimulationObjMeta(type):
 
         EVENT_HANDLERS = cls.EVENT_HANDLERS
         MESSAGES_SENT = cls.MESSAGES_SENT
+        MIN_DELAYS = cls.MIN_DELAYS
         CLASS_PRIORITY = cls.CLASS_PRIORITY
 
         new_application_simulation_obj_subclass = super().__new__(cls, clsname, superclasses, namespace)
         new_application_simulation_obj_subclass.metadata = SimulationObjectMetadata()
+        # class attributes that reference the dispatch tables in metadata, so that dispatching an event
+        # costs one attribute lookup and one dict lookup
+        new_application_simulation_obj_subclass._dispatch_table = \
+            new_application_simulation_obj_subclass.metadata.event_handlers_dict
+        new_application_simulation_obj_subclass._superposition_groups = \
+            new_application_simulation_obj_subclass.metadata.superposition_groups
 
         # use 'abstract' to indicate that an SimulationObject should not be instantiated
         if 'abstract' in namespace and namespace['abstract'] is True:
@@ -510,6 +717,32 @@ class SimulationObjMeta(type):
                 raise SimulatorError("SimulationObject '{}': '{}' must iterate over "
                                      "EventMessages".format(clsname, MESSAGES_SENT))
 
+        message_types_sent = new_application_simulation_obj_subclass.metadata.message_types_sent
+        if MIN_DELAYS in namespace:
+            min_delays = namespace[MIN_DELAYS]
+            if not isinstance(min_delays, dict):
+                raise SimulatorError(f"SimulationObject '{clsname}': '{MIN_DELAYS}' must be a dict that maps "
+                                     f"message types to delays")
+            errors = []
+            for msg_type, min_delay in min_delays.items():
+                if msg_type not in message_types_sent:
+                    errors.append(f"'{getattr(msg_type, '__name__', msg_type)}' in '{MIN_DELAYS}' must be in "
+                                  f"'{MESSAGES_SENT}'")
+                elif not (isinstance(min_delay, Real) and 0 <= min_delay):
+                    errors.append(f"minimum delay of '{msg_type.__name__}' messages in '{MIN_DELAYS}' must be a "
+                                  f"non-negative number, but is '{min_delay}'")
+            if errors:
+                raise SimulatorError("\n".join(errors))
+        else:
+            # inherit the minimum delays of the message types that are still sent
+            min_delays = {}
+            for superclass in reversed(superclasses):
+                if hasattr(superclass, 'metadata') and hasattr(superclass.metadata, MIN_DELAYS):
+                    min_delays.update(getattr(superclass.metadata, MIN_DELAYS))
+            min_delays = {msg_type: min_delay for msg_type, min_delay in min_delays.items()
+                          if msg_type in message_types_sent}
+        new_application_simulation_obj_subclass.metadata.min_delays.update(min_delays)
+
         # return the class to instantiate it
         return new_application_simulation_obj_subclass
 
@@ -523,10 +756,30 @@ class SimulationObjectAndABCMeta(SimulationObjMeta, ConcreteABCMeta):
 class SimulationObject(BaseSimulationObject, SimulationObjectInterface, metaclass=SimulationObjectAndABCMeta):
     """ Base class for all simulation objects in a simulation
 
+    A subclass for a model with very many objects can declare its instance attributes in `__slots__`, and
+    pass the :obj:`~de_sim.simulator.Simulator` to the constructor::
+
+        class Agent(SimulationObject):
+            __slots__ = ('state',)
+
+            def __init__(self, name, state, simulator):
+                super().__init__(name, simulator=simulator)
+                self.state = state
+
+    A subclass can declare the minimum delay of the messages of each type it sends, in a `min_delays`
+    :obj:`dict` next to `messages_sent`. Sending a message with a shorter delay raises an exception, unless
+    sends are trusted, and parallel simulators can use the declarations as lookaheads::
+
+        class Server(SimulationObject):
+            event_handlers = [(Request, 'handle_request')]
+            messages_sent = [Response]
+            min_delays = {Response: 0.5}
+
     Attributes:
         metadata (:obj:`SimulationObjectMetadata`): metadata for event message sending and handling,
             initialized by :obj:`SimulationObjectAndABCMeta`
     """
+    __slots__ = ()
 
     def init_before_run(self):
         """ Perform initialization before a simulation run
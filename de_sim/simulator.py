@@ -9,18 +9,19 @@
 from collections import Counter, namedtuple
 from datetime import datetime
 import cProfile
-import heapq
 import math
 import os
 import pstats
 import tempfile
 
 from de_sim.config import core
-from de_sim.event import Event
+from de_sim.event import Event, EventPool
 from de_sim.event_message import EventMessage
+from de_sim.event_queue_backends import EVENT_QUEUE_BACKENDS
 from de_sim.simulation_metadata import SimulationMetadata, RunMetadata, AuthorMetadata
 from de_sim.errors import SimulatorError
 from de_sim.simulation_config import SimulationConfig
+from de_sim.trace import TraceWriter
 from de_sim.utilities import SimulationProgressBar, FastLogger
 from wc_utils.util.git import get_repo_metadata, RepoMetadataCollectionType
 from wc_utils.util.list import elements_to_str
@@ -29,56 +30,133 @@ from wc_utils.util.list import elements_to_str
 class EventQueue(object):
     """ A simulation's event queue
 
-    Stores a :obj:`Simulator`'s events in a heap (also known as a priority queue).
-    The heap is a 'min heap', which keeps the event with the smallest sort order at the root in `heap[0]`.
+    Stores a :obj:`Simulator`'s events in a priority queue backend, which by default is a heap.
+    The backend keeps the event with the smallest sort order at its front.
     :obj:`~de_sim.event.Event`\ s are sorted on their `_get_order_time`, which provides a pair, (event time, event 'sub-time'),
     and is implemented via comparison operations in :obj:`~de_sim.event.Event`.
-    All entries with equal `(event time, event 'sub-time')` values are popped from the heap by `next_events()`.
-    `schedule_event()` costs `O(log(n))`, where `n` is the size of the heap,
+    All entries with equal `(event time, event 'sub-time')` values are popped from the queue by `next_events()`.
+    With a heap backend, `schedule_event()` costs `O(log(n))`, where `n` is the size of the heap,
     while `next_events()`, costs `O(mlog(n))`, where `m` is the number of events returned.
+    The calendar queue and ladder queue backends in :obj:`~de_sim.event_queue_backends` have expected
+    `O(1)` costs for scheduling and popping an event. The two-level backend keeps a heap of events for each
+    receiving object, so its global operations cost `O(log(k))`, where `k` is the number of objects,
+    and it pops superposed events, and finds the events received by one object, without scanning other events.
+
+    Scheduled events can be cancelled by `cancel_event()` in `O(1)` time. Cancelled events are not
+    removed from the backend immediately; they remain as tombstones, which are discarded when they reach
+    the front of the queue, or all at once when they comprise more than `COMPACTION_RATIO` of the backend.
 
     Attributes:
-        event_heap (:obj:`list`): a :obj:`Simulator`'s heap of events
+        backend (:obj:`~de_sim.event_queue_backends.EventQueueBackend`): the priority queue that stores
+            a :obj:`Simulator`'s events
+        ranked_receivers (:obj:`bool`): whether the receiving objects of all events must have an `event_rank`
+        num_cancelled (:obj:`int`): the number of cancelled events that remain in the backend
+        deferred_events (:obj:`list`): events whose insertion is deferred by `start_bulk_scheduling()`;
+            :obj:`None` when insertion is not deferred
+        event_pool (:obj:`~de_sim.event.EventPool`): if provided, a pool that supplies new events
         debug_logs (:obj:`wc_utils.debug_logs.core.DebugLogsManager`): a `DebugLogsManager`
     """
+    # compact the backend when more than this fraction of its events have been cancelled
+    COMPACTION_RATIO = 0.5
+    # but don't compact small backends, in which tombstones are cheap
+    MIN_COMPACTION_SIZE = 64
 
-    def __init__(self):
-        self.event_heap = []
+    def __init__(self, backend='heap'):
+        """
+        Args:
+            backend (:obj:`str`, optional): the name of the event queue backend, a key in
+                :obj:`~de_sim.event_queue_backends.EVENT_QUEUE_BACKENDS`; defaults to `'heap'`
+
+        Raises:
+            :obj:`SimulatorError`: if `backend` is not the name of an event queue backend
+        """
+        self.backend = self.make_backend(backend)
+        self.ranked_receivers = False
+        self.num_cancelled = 0
+        self.deferred_events = None
+        self.event_pool = None
         self.debug_logs = core.get_debug_logs()
         self.fast_debug_file_logger = FastLogger(self.debug_logs.get_log('de_sim.debug.file'), 'debug')
 
+    @staticmethod
+    def make_backend(backend):
+        """ Make an event queue backend
+
+        Args:
+            backend (:obj:`str`): the name of an event queue backend
+
+        Returns:
+            :obj:`~de_sim.event_queue_backends.EventQueueBackend`: a new, empty event queue backend
+
+        Raises:
+            :obj:`SimulatorError`: if `backend` is not the name of an event queue backend
+        """
+        if backend not in EVENT_QUEUE_BACKENDS:
+            raise SimulatorError(f"unknown event queue backend '{backend}'; "
+                                 f"available backends: {', '.join(EVENT_QUEUE_BACKENDS)}")
+        return EVENT_QUEUE_BACKENDS[backend]()
+
+    def set_backend(self, backend):
+        """ Change this event queue's backend, moving any scheduled events into the new backend
+
+        Args:
+            backend (:obj:`str`): the name of an event queue backend
+
+        Raises:
+            :obj:`SimulatorError`: if `backend` is not the name of an event queue backend
+        """
+        if isinstance(self.backend, EVENT_QUEUE_BACKENDS.get(backend, ())):
+            return
+        new_backend = self.make_backend(backend)
+        for event in self.backend:
+            if event.live:
+                new_backend.schedule(event)
+        self.backend = new_backend
+        self.num_cancelled = 0
+
     def reset(self):
         """ Empty the event queue
         """
-        self.event_heap = []
+        self.backend.clear()
+        self.ranked_receivers = False
+        self.num_cancelled = 0
+        self.deferred_events = None
+
+    def update_order_times(self):
+        """ Recompute the order times of all events in this queue
+
+        Needed after the sub-time of a receiving object changes, as happens when it is given an `event_rank`.
+        Subsequently, all events must be received by objects that have an `event_rank`.
+        """
+        self.ranked_receivers = True
+        events = [event for event in self.backend if event.live]
+        self.backend.clear()
+        self.num_cancelled = 0
+        for event in events:
+            event._order_time = event._get_order_time()
+            self.backend.schedule(event)
 
     def len(self):
         """ Size of the event queue
 
         Returns:
-            :obj:`int`: number of events in the event queue
+            :obj:`int`: number of live events in the event queue
         """
-        return len(self.event_heap)
+        return len(self.backend) - self.num_cancelled
 
-    def schedule_event(self, send_time, receive_time, sending_object, receiving_object, event_message):
-        """ Create an event scheduled to execute at `receive_time` and insert in this event queue
+    @staticmethod
+    def validate_event(send_time, receive_time, event_message):
+        """ Validate the times and message of an event
 
         Args:
             send_time (:obj:`float`): the simulation time at which the event was generated (sent)
-            receive_time (:obj:`float`): the simulation time at which the `receiving_object` will
-                execute the event
-            sending_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object sending the event
-            receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object that will receive the
-                event; when the simulation is parallelized `sending_object` and `receiving_object` will need
-                to be global identifiers.
-            event_message (:obj:`~de_sim.event_message.EventMessage`): an event message carried by the event; its type
-                provides the simulation application's type for an :obj:`~de_sim.event.Event`; it may also carry a
-                payload for the :obj:`~de_sim.event.Event` in its attributes.
+            receive_time (:obj:`float`): the simulation time at which the event will be executed
+            event_message (:obj:`~de_sim.event_message.EventMessage`): the event message carried by the event
 
         Raises:
-            :obj:`SimulatorError`: if `receive_time` < `send_time`, or `receive_time` or `send_time` is NaN
+            :obj:`SimulatorError`: if `receive_time` < `send_time`, or `receive_time` or `send_time` is NaN,
+                or if `event_message` isn't an :obj:`~de_sim.event_message.EventMessage`
         """
-
         if math.isnan(send_time) or math.isnan(receive_time):
             raise SimulatorError("send_time ({}) and/or receive_time ({}) is NaN".format(
                 receive_time, send_time))
@@ -94,20 +172,204 @@ class EventQueue(object):
             raise SimulatorError("event_message should be an instance of {} but is a '{}'".format(
                 EventMessage.__name__, type(event_message).__name__))
 
-        event = Event(send_time, receive_time, sending_object, receiving_object, event_message)
+    @staticmethod
+    def raise_unranked_receiver(receiving_object):
+        """ Report an event sent to an object without a rank, when events are ordered by object rank
+
+        Args:
+            receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): the receiving object
+
+        Raises:
+            :obj:`SimulatorError`: always
+        """
+        raise SimulatorError(f"receiving object '{receiving_object.name}' has no event_rank; with "
+                             f"integer_event_order_keys, events must be sent to objects in the simulation")
+
+    def make_event(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Validate and create an event scheduled to execute at `receive_time`
+
+        Args:
+            send_time (:obj:`float`): the simulation time at which the event was generated (sent)
+            receive_time (:obj:`float`): the simulation time at which the `receiving_object` will
+                execute the event
+            sending_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object sending the event
+            receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object that will receive the
+                event; in a parallel simulation, events sent between partitions identify `sending_object` and
+                `receiving_object` by their names.
+            event_message (:obj:`~de_sim.event_message.EventMessage`): an event message carried by the event; its type
+                provides the simulation application's type for an :obj:`~de_sim.event.Event`; it may also carry a
+                payload for the :obj:`~de_sim.event.Event` in its attributes.
+
+        Returns:
+            :obj:`~de_sim.event.Event`: a new event
+
+        Raises:
+            :obj:`SimulatorError`: if `receive_time` < `send_time`, or `receive_time` or `send_time` is NaN,
+                or if events are ordered by object rank and `receiving_object` does not have a rank
+        """
+
+        self.validate_event(send_time, receive_time, event_message)
+        if self.ranked_receivers and receiving_object.event_rank is None:
+            self.raise_unranked_receiver(receiving_object)
+
         # As per David Jefferson's thinking, the event queue is ordered by data provided by the
         # simulation application, in particular the tuple (event time, receiving object name).
         # See the comparison operators for Event. This achieves deterministic and reproducible
         # simulations.
-        heapq.heappush(self.event_heap, event)
+        if self.event_pool is None:
+            return Event(send_time, receive_time, sending_object, receiving_object, event_message)
+        return self.event_pool.get(send_time, receive_time, sending_object, receiving_object, event_message)
+
+    def schedule_event(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Create an event scheduled to execute at `receive_time` and insert in this event queue
+
+        Args:
+            send_time (:obj:`float`): the simulation time at which the event was generated (sent)
+            receive_time (:obj:`float`): the simulation time at which the `receiving_object` will
+                execute the event
+            sending_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object sending the event
+            receiving_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object that will receive the
+                event
+            event_message (:obj:`~de_sim.event_message.EventMessage`): an event message carried by the event
+
+        Returns:
+            :obj:`~de_sim.event.Event`: the scheduled event, which can be passed to `cancel_event()`
+
+        Raises:
+            :obj:`SimulatorError`: if the event is invalid, as determined by `make_event()`
+        """
+        event = self.make_event(send_time, receive_time, sending_object, receiving_object, event_message)
+        if self.deferred_events is None:
+            self.backend.schedule(event)
+        else:
+            self.deferred_events.append(event)
+        return event
+
+    def schedule_events(self, events_args):
+        """ Create many events and insert them in this event queue in one bulk operation
+
+        All events are validated before any are scheduled. A heap backend inserts a batch that is large relative
+        to the queue by heapifying the combined events, which costs `O(n + k)` rather than `O(k log(n + k))`
+        for `k` events.
+
+        Args:
+            events_args (:obj:`iterable` of :obj:`tuple`): for each event, a tuple containing the
+                arguments to `schedule_event()`: (send time, receive time, sending object, receiving object,
+                event message)
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.event.Event`: the scheduled events, in the order of `events_args`
+
+        Raises:
+            :obj:`SimulatorError`: if any event is invalid, as determined by `make_event()`
+        """
+        events = [self.make_event(*event_args) for event_args in events_args]
+        if self.deferred_events is None:
+            self.backend.schedule_many(events)
+        else:
+            self.deferred_events.extend(events)
+        return events
+
+    def schedule_multicast(self, send_time, receive_time, sending_object, receiving_objects, event_message):
+        """ Create events that deliver one event message to many receivers, and insert them in one bulk operation
+
+        The times and the message are validated once, rather than once per receiver.
+
+        Args:
+            send_time (:obj:`float`): the simulation time at which the events were generated (sent)
+            receive_time (:obj:`float`): the simulation time at which the receivers will execute the events
+            sending_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object sending the events
+            receiving_objects (:obj:`list` of :obj:`~de_sim.simulation_object.SimulationObject`): the objects
+                that will receive the events
+            event_message (:obj:`~de_sim.event_message.EventMessage`): the event message carried by all the events
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.event.Event`: the scheduled events, in the order of `receiving_objects`
+
+        Raises:
+            :obj:`SimulatorError`: if the times or the message are invalid, as determined by `validate_event()`,
+                or if events are ordered by object rank and a receiving object does not have a rank
+        """
+        if not receiving_objects:
+            return []
+        self.validate_event(send_time, receive_time, event_message)
+        if self.ranked_receivers:
+            for receiving_object in receiving_objects:
+                if receiving_object.event_rank is None:
+                    self.raise_unranked_receiver(receiving_object)
+
+        new_event = Event if self.event_pool is None else self.event_pool.get
+        events = [new_event(send_time, receive_time, sending_object, receiving_object, event_message)
+                  for receiving_object in receiving_objects]
+        if self.deferred_events is None:
+            self.backend.schedule_many(events)
+        else:
+            self.deferred_events.extend(events)
+        return events
+
+    def start_bulk_scheduling(self):
+        """ Defer the insertion of scheduled events until `end_bulk_scheduling()` is called
+
+        Deferred events are not visible in the event queue until they're inserted.
+        """
+        if self.deferred_events is None:
+            self.deferred_events = []
+
+    def end_bulk_scheduling(self):
+        """ Insert all deferred events that haven't been cancelled in one bulk operation, and stop deferring
+        """
+        if self.deferred_events is not None:
+            deferred_events = [event for event in self.deferred_events if event.live]
+            self.deferred_events = None
+            self.backend.schedule_many(deferred_events)
+
+    def cancel_event(self, event):
+        """ Cancel a scheduled event
+
+        The event is marked as cancelled and left in the backend as a tombstone, which costs `O(1)`.
+        If tombstones comprise too much of the backend, they're all removed. A cancelled event whose
+        insertion is deferred is not counted as a tombstone, as it's dropped by `end_bulk_scheduling()`.
+
+        Args:
+            event (:obj:`~de_sim.event.Event`): an event scheduled in this event queue
+
+        Raises:
+            :obj:`SimulatorError`: if `event` has already been cancelled or executed
+        """
+        if not event.live:
+            raise SimulatorError(f"cannot cancel event at time {event.event_time} to '{event.receiving_object.name}': "
+                                 f"it has already been cancelled or executed")
+        event.live = False
+        if self.deferred_events and any(deferred_event is event for deferred_event in self.deferred_events):
+            return
+        self.num_cancelled += 1
+        num_events = len(self.backend)
+        if self.MIN_COMPACTION_SIZE <= num_events and self.COMPACTION_RATIO * num_events < self.num_cancelled:
+            self.compact()
+
+    def compact(self):
+        """ Remove all cancelled events from the backend
+        """
+        self.backend.retain(lambda event: event.live)
+        self.num_cancelled = 0
+
+    def discard_cancelled_head(self):
+        """ Remove cancelled events from the front of the backend, so that its earliest event is live
+        """
+        backend = self.backend
+        next_event = backend.peek()
+        while next_event is not None and not next_event.live:
+            backend.pop()
+            self.num_cancelled -= 1
+            next_event = backend.peek()
 
     def empty(self):
         """ Is the event queue empty?
 
         Returns:
-            :obj:`bool`: return `True` if the event queue is empty
+            :obj:`bool`: return `True` if the event queue contains no live events
         """
-        return not self.event_heap
+        return not self.len()
 
     def next_event_time(self):
         """ Get the time of the next event
@@ -115,12 +377,12 @@ class EventQueue(object):
         Returns:
             :obj:`float`: the time of the next event; return infinity if no event is scheduled
         """
-        if not self.event_heap:
+        if self.num_cancelled:
+            self.discard_cancelled_head()
+        next_event = self.backend.peek()
+        if next_event is None:
             return float('inf')
-
-        next_event = self.event_heap[0]
-        next_event_time = next_event.event_time
-        return next_event_time
+        return next_event.event_time
 
     def next_event_obj(self):
         """ Get the simulation object that receives the next event
@@ -129,10 +391,11 @@ class EventQueue(object):
             :obj:`~de_sim.simulation_object.SimulationObject`: the simulation object that will execute the next event,
             or `None` if no event is scheduled
         """
-        if not self.event_heap:
+        if self.num_cancelled:
+            self.discard_cancelled_head()
+        next_event = self.backend.peek()
+        if next_event is None:
             return None
-
-        next_event = self.event_heap[0]
         return next_event.receiving_object
 
     def next_events(self):
@@ -154,32 +417,54 @@ class EventQueue(object):
         Returns:
             :obj:`list` of :obj:`~de_sim.event.Event`: the earliest event(s); if no events are available the list is empty
         """
-        if not self.event_heap:
-            return []
+        return self.next_event_batch()[2]
+
+    def next_event_batch(self, max_time=float('inf')):
+        """ Pop the next events, and provide their time and receiving object, in one pass
+
+        Pops the same events as `next_events()`, but avoids separate calls to `next_event_time()`
+        and `next_event_obj()`.
+
+        Args:
+            max_time (:obj:`float`, optional): if the next events occur after `max_time`, they are not popped
 
-        events = []
-        next_event = heapq.heappop(self.event_heap)
+        Returns:
+            :obj:`tuple`: (event time, receiving object, :obj:`list` of :obj:`~de_sim.event.Event`) of the
+            earliest event(s); the list is empty if no events are available or if they occur after `max_time`;
+            if no events are available the event time is infinity and the receiving object is :obj:`None`
+        """
+        if self.num_cancelled:
+            self.discard_cancelled_head()
+        next_event = self.backend.peek()
+        if next_event is None:
+            return (float('inf'), None, [])
         now = next_event.event_time
         receiving_obj = next_event.receiving_object
-        events.append(next_event)
+        if max_time < now:
+            return (now, receiving_obj, [])
 
         # gather all events with the same event_time and receiving_object
-        while (self.event_heap and now == self.next_event_time() and
-               receiving_obj == self.next_event_obj()):
-            events.append(heapq.heappop(self.event_heap))
+        events = self.backend.pop_batch()
+        if self.num_cancelled:
+            # the batch may contain tombstones, but its first event is live
+            num_events = len(events)
+            events = [event for event in events if event.live]
+            self.num_cancelled -= num_events - len(events)
 
         if 1 < len(events):
             # sort events by message type priority, and within priority by message content
             # thus, a sim object handles simultaneous messages in priority order;
             # this costs O(n log(n)) in the number of event messages in events
             receiver_priority_dict = receiving_obj.get_receiving_priorities_dict()
-            events = sorted(events,
-                            key=lambda event: (receiver_priority_dict[event.message.__class__], event.message))
+            events.sort(key=lambda event: (receiver_priority_dict[event.message.__class__], event.message))
 
         for event in events:
-            self.log_event(event)
+            event.live = False
+        if self.fast_debug_file_logger.active:
+            for event in events:
+                self.log_event(event)
 
-        return events
+        return (now, receiving_obj, events)
 
     def log_event(self, event):
         """ Log an event with its simulation time to the `fast_debug_file_logger`
@@ -187,12 +472,11 @@ class EventQueue(object):
         Args:
             event (:obj:`~de_sim.event.Event`): the Event to log
         """
-        msg = "Execute: {} {}:{} {} ({})".format(event.event_time,
-                                                 type(event.receiving_object).__name__,
-                                                 event.receiving_object.name,
-                                                 event.message.__class__.__name__,
-                                                 str(event.message))
-        self.fast_debug_file_logger.fast_log(msg, sim_time=event.event_time)
+        self.fast_debug_file_logger.fast_log("Execute: {} {}:{} {} ({})", event.event_time,
+                                             type(event.receiving_object).__name__,
+                                             event.receiving_object.name,
+                                             event.message.__class__.__name__,
+                                             event.message, sim_time=event.event_time)
 
     def render(self, sim_obj=None, as_list=False, separator='\t'):
         """ Return the content of an :obj:`EventQueue`
@@ -214,19 +498,20 @@ class EventQueue(object):
             :obj:`str`: String representation of the values of an :obj:`EventQueue`, or a :obj:`list`
             representation if `as_list` is set
         """
-        event_heap = self.event_heap
-        if sim_obj is not None:
-            event_heap = list(filter(lambda event: event.receiving_object == sim_obj, event_heap))
+        if sim_obj is None:
+            events = [event for event in self.backend if event.live]
+        else:
+            events = [event for event in self.backend.events_for(sim_obj) if event.live]
 
-        if not event_heap:
+        if not events:
             return None
 
         # Sort the events by the event order tuple, provided by `Event._get_order_time`
-        sorted_events = sorted(event_heap)
+        sorted_events = sorted(events)
 
         # Does the queue contain multiple message types?
         message_types = set()
-        for event in event_heap:
+        for event in events:
             message_types.add(event.message.__class__)
             if 1 < len(message_types):
                 break
@@ -268,7 +553,7 @@ class Simulator(object):
     """ A discrete-event simulator
 
     A general-purpose discrete-event simulation mechanism, including the simulation scheduler.
-    Architected as an object-oriented simulation that could be parallelized.
+    Architected as an object-oriented simulation that can be parallelized; see :obj:`~de_sim.parallel`.
 
     :obj:`Simulator` contains and manipulates global simulation data.
     :obj:`Simulator` registers all simulation objects classes and all simulation objects.
@@ -285,7 +570,16 @@ class Simulator(object):
             plotting
         event_queue (:obj:`EventQueue`): the queue of events that will be executed
         event_counts (:obj:`Counter`): a count of executed events, categorized by the tuple
-            (receiving object class, receiving object name, event message class)
+            (receiving object, event message class); `provide_event_counts()` names the categories
+        event_pool (:obj:`~de_sim.event.EventPool`): a pool that recycles executed events, if the simulation
+            run's configuration sets `recycle_events`
+        trace_writer (:obj:`~de_sim.trace.TraceWriter`): the writer of a binary trace of the executed events, if
+            the simulation run's configuration sets `trace_file`
+        de_sim_config (:obj:`configobj.Section`): the `de_sim` configuration, which is shared by simulation
+            objects constructed with this simulator
+        integer_event_order_keys (:obj:`bool`): whether to rank simulation objects when the simulation
+            is initialized, so that events are ordered by integer sub-times; initialized from the
+            `integer_event_order_keys` configuration option
         num_handlers_called (:obj:`int`): the number of calls a simulation makes to an event handler in a
             simulation object
         sim_config (:obj:`~de_sim.simulation_config.SimulationConfig`): a simulation run's configuration
@@ -312,6 +606,10 @@ class Simulator(object):
         self.simulation_objects = {}
         self.event_queue = EventQueue()
         self.event_counts = Counter()
+        self.event_pool = None
+        self.trace_writer = None
+        self.de_sim_config = core.get_config()['de_sim']
+        self.integer_event_order_keys = self.de_sim_config['integer_event_order_keys']
         self.__initialized = False
 
     def add_object(self, simulation_object):
@@ -402,11 +700,38 @@ class Simulator(object):
         """
         if self.__initialized:
             raise SimulatorError('Simulation has already been initialized')
-        for sim_obj in self.simulation_objects.values():
-            sim_obj.init_before_run()
+        if self.integer_event_order_keys:
+            self.rank_objects()
+        # insert the initial events in bulk
+        self.event_queue.start_bulk_scheduling()
+        try:
+            for sim_obj in self.simulation_objects.values():
+                sim_obj.init_before_run()
+        finally:
+            self.event_queue.end_bulk_scheduling()
         self.event_counts.clear()
         self.__initialized = True
 
+    def rank_objects(self):
+        """ Give each simulation object a dense integer rank in the (class priority, tiebreaker) order
+
+        Objects with equal (class priority, tiebreaker) pairs receive equal ranks. Events whose
+        receiving objects have ranks are ordered by (event time, rank), which orders them identically
+        to (event time, class priority, tiebreaker) but compares faster.
+        Any events that have already been scheduled are re-keyed.
+        """
+        def sub_time(sim_obj):
+            return (sim_obj.class_event_priority, sim_obj.event_time_tiebreaker)
+
+        rank = -1
+        prev_sub_time = None
+        for sim_obj in sorted(self.simulation_objects.values(), key=sub_time):
+            if sub_time(sim_obj) != prev_sub_time:
+                rank += 1
+                prev_sub_time = sub_time(sim_obj)
+            sim_obj.event_rank = rank
+        self.event_queue.update_order_times()
+
     def init_metadata_collection(self, sim_config):
         """ Initialize this simulation's metadata object
 
@@ -529,6 +854,8 @@ class Simulator(object):
 
     SimulationReturnValue = namedtuple('SimulationReturnValue', 'num_events profile_stats',
                                        defaults=(None, None))
+    # enable pickling, e.g., to return a SimulationReturnValue from another process
+    SimulationReturnValue.__qualname__ = 'Simulator.SimulationReturnValue'
     SimulationReturnValue.__doc__ += ': the value(s) returned by a simulation run'
     SimulationReturnValue.num_events.__doc__ += (": the number of times a simulation object handles an event, "
                                                  "which may be smaller than the number of events sent, because simultaneous "
@@ -561,25 +888,39 @@ class Simulator(object):
         self.sim_config = self.get_sim_config(max_time=max_time, sim_config=sim_config,
                                                config_dict=config_dict)
         self.author_metadata = author_metadata
+        self.event_queue.set_backend(self.sim_config.event_queue_backend)
+        if self.sim_config.recycle_events:
+            self.event_pool = EventPool(strict=self.sim_config.strict_event_recycling)
+        else:
+            self.event_pool = None
+        self.event_queue.event_pool = self.event_pool
         if self.sim_config.output_dir:
             measurements_file = core.get_config()['de_sim']['measurements_file']
             self.measurements_fh = open(os.path.join(self.sim_config.output_dir, measurements_file), 'w')
             print(f"de_sim measurements: {datetime.now().isoformat(' ')}", file=self.measurements_fh)
 
+        self.trace_writer = None
+        if self.sim_config.trace_file:
+            self.trace_writer = TraceWriter(self.sim_config.trace_file)
+
         profile = None
-        if self.sim_config.profile:
-            # profile the simulation and return the profile object
-            with tempfile.NamedTemporaryFile() as file_like_obj:
-                out_file = file_like_obj.name
-                locals = {'self': self}
-                cProfile.runctx('self._simulate()', {}, locals, filename=out_file)
-                if self.sim_config.output_dir:
-                    profile = pstats.Stats(out_file, stream=self.measurements_fh)
-                else:
-                    profile = pstats.Stats(out_file)
-                profile.sort_stats('tottime').print_stats(self.NUM_PROFILE_ROWS)
-        else:
-            self._simulate()
+        try:
+            if self.sim_config.profile:
+                # profile the simulation and return the profile object
+                with tempfile.NamedTemporaryFile() as file_like_obj:
+                    out_file = file_like_obj.name
+                    locals = {'self': self}
+                    cProfile.runctx('self._simulate()', {}, locals, filename=out_file)
+                    if self.sim_config.output_dir:
+                        profile = pstats.Stats(out_file, stream=self.measurements_fh)
+                    else:
+                        profile = pstats.Stats(out_file)
+                    profile.sort_stats('tottime').print_stats(self.NUM_PROFILE_ROWS)
+            else:
+                self._simulate()
+        finally:
+            if self.trace_writer is not None:
+                self.trace_writer.close()
         if self.sim_config.output_dir:
             self.measurements_fh.close()
         return self.SimulationReturnValue(self.num_handlers_called, profile)
@@ -636,6 +977,8 @@ class Simulator(object):
         self.fast_plotting_logger.fast_log('# {:%Y-%m-%d %H:%M:%S}'.format(datetime.now()), sim_time=0)
 
         self.num_handlers_called = 0
+        event_count_interval = self.sim_config.event_count_interval
+        trace_writer = self.trace_writer
         self.log_with_time(f"Simulation to {self.sim_config.max_time} starting")
 
         # check the stop condition
@@ -658,17 +1001,15 @@ class Simulator(object):
                 if _object_mem_tracking:
                     self.track_obj_mem()
 
-                # get the earliest next event in the simulation
-                # get parameters of next event from self.event_queue
-                next_time = self.event_queue.next_event_time()
-                next_sim_obj = self.event_queue.next_event_obj()
+                # get the earliest next event(s) in the simulation, and their time and receiving object
+                next_time, next_sim_obj, next_events = self.event_queue.next_event_batch(self.sim_config.max_time)
 
                 if float('inf') == next_time:
                     self.log_with_time(self.NO_EVENTS_REMAIN)
                     self.progress.end()
                     break
 
-                if self.sim_config.max_time < next_time:
+                if not next_events:
                     self.log_with_time(self.END_TIME_EXCEEDED)
                     self.progress.end()
                     break
@@ -683,12 +1024,16 @@ class Simulator(object):
                 # dispatch object that's ready to execute next event
                 next_sim_obj.time = next_time
 
-                self.log_with_time(" Running '{}' at {}".format(next_sim_obj.name, next_sim_obj.time))
-                next_events = self.event_queue.next_events()
-                for e in next_events:
-                    e_name = ' - '.join([next_sim_obj.__class__.__name__, next_sim_obj.name, e.message.__class__.__name__])
-                    self.event_counts[e_name] += 1
+                if self.fast_debug_file_logger.active:
+                    self.log_with_time(" Running '{}' at {}", next_sim_obj.name, next_sim_obj.time)
+                if event_count_interval and not self.num_handlers_called % event_count_interval:
+                    # count events in a generator expression, which doesn't leave a reference to an event
+                    self.event_counts.update((next_sim_obj, e.message.__class__) for e in next_events)
+                if trace_writer is not None:
+                    trace_writer.write_events(next_events)
                 next_sim_obj._BaseSimulationObject__handle_event_list(next_events)
+                if self.event_pool is not None:
+                    self.event_pool.release(next_events)
                 self.num_handlers_called += 1
                 self.progress.progress(next_time)
 
@@ -721,18 +1066,26 @@ class Simulator(object):
                 print(heading)
                 self.mem_tracker.print_diff()
 
-    def log_with_time(self, msg):
+    def log_with_time(self, msg, *args):
         """ Write a debug log message with the simulation time.
+
+        Args:
+            msg (:obj:`str`): the log message, or a format string if `args` are provided
+            args (:obj:`tuple`): values formatted into `msg`, only if the log is active
         """
-        self.fast_debug_file_logger.fast_log(msg, sim_time=self.time)
+        self.fast_debug_file_logger.fast_log(msg, *args, sim_time=self.time)
 
     def provide_event_counts(self):
         """ Provide the simulation's event counts, categorized by object type, object name, event type
 
+        If the simulation run's configuration sets `event_count_interval` greater than 1 then the counts
+        are a sample of the events.
+
         Returns:
             :obj:`str`: the simulation's categorized event counts, in a tab-separated table
         """
         rv = ['\t'.join(['Count', 'Event type (Object type - object name - event type)'])]
-        for event_type, count in self.event_counts.most_common():
+        for (sim_obj, message_class), count in self.event_counts.most_common():
+            event_type = ' - '.join([sim_obj.__class__.__name__, sim_obj.name, message_class.__name__])
             rv.append("{}\t{}".format(count, event_type))
         return '\n'.join(rv)
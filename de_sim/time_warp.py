@@ -0,0 +1,735 @@
+""" An optimistic parallel simulator, which uses Jefferson's Time Warp protocol
+
+Each partition executes its events speculatively, without waiting to learn whether other partitions will send it
+earlier events. When a partition receives an event that should have executed before events it has already executed,
+a *straggler*, it rolls back: it restores the state its objects had before those events, and cancels the
+events they sent, with *anti-messages* for events sent to other partitions. Global virtual time (GVT), a lower bound
+on the time of any future rollback, is computed periodically, and the saved state and events that precede it are
+discarded, which is called *fossil collection*.
+
+See Jefferson, D. R. (1985). Virtual Time. ACM Transactions on Programming Languages and Systems, 7(3), 404-425.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-28
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+from collections import deque
+import copy
+import math
+import numpy
+import random
+import types
+
+from de_sim.errors import SimulatorError
+from de_sim.event import Event
+from de_sim.parallel import ParallelSimulator, PartitionEventQueue
+from de_sim.simulation_object import BaseSimulationObject
+from de_sim.simulator import EventQueue
+
+# attributes of simulation objects that are managed by de_sim, and are not part of their state
+UNSAVED_ATTRIBUTES = (frozenset(BaseSimulationObject.__slots__) - {'time', 'num_events'}) | {'__dict__',
+                                                                                             '__weakref__'}
+
+
+class _SharedMemo(dict):
+    """ A :obj:`copy.deepcopy` memo that also provides a shared map from the ids of objects to themselves,
+    so that references to these objects are kept rather than copied
+
+    Attributes:
+        shared (:obj:`dict`): map from the id of each object that's not copied to the object
+    """
+
+    def __init__(self, shared):
+        self.shared = shared
+
+    def get(self, key, default=None):
+        if key in self.shared:
+            return self.shared[key]
+        return dict.get(self, key, default)
+
+
+class StateSaver(object):
+    """ Save and restore the state of simulation objects by copying it
+
+    An object's state consists of its instance attributes, except those managed by de_sim and those named in its
+    class' `constant_attributes`, and its `time` and `num_events`. A class can list attributes that event handlers
+    never modify in `constant_attributes`, so that they aren't saved. State is copied with :obj:`copy.deepcopy`,
+    except that references to simulation objects, the simulator and its event queue are kept, and events are not
+    copied: the events that the state references, directly or through containers and other objects' attributes,
+    are found before the state is copied, and added to the copy's memo. The state of a random number generator that's an attribute of an object is saved by the generator's
+    own methods, which is much faster than copying it, and the generator is restored in place.
+
+    Attributes:
+        shared (:obj:`dict`): map from the id of each object that's referenced rather than copied to the object
+        state_slots (:obj:`dict`): map from each simulation object class to the names of its slots that
+            hold state
+    """
+    # types whose values are immutable, and need not be copied
+    ATOMIC_TYPES = frozenset([int, float, str, bool, type(None)])
+
+    # types whose values are not copied by :obj:`copy.deepcopy`, and are not searched for events
+    UNSEARCHED_TYPES = (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.ModuleType,
+                        numpy.ndarray)
+
+    # map from each type of random number generator to functions that get and set a generator's state
+    GENERATOR_STATE_ACCESSORS = {
+        random.Random: (random.Random.getstate, random.Random.setstate),
+        numpy.random.RandomState: (numpy.random.RandomState.get_state, numpy.random.RandomState.set_state),
+        numpy.random.Generator: (lambda generator: generator.bit_generator.state,
+                                 lambda generator, state: setattr(generator.bit_generator, 'state', state)),
+    }
+
+    def __init__(self, simulator):
+        """
+        Args:
+            simulator (:obj:`~de_sim.simulator.Simulator`): a simulator that contains all simulation objects
+        """
+        shared = [simulator, simulator.event_queue, *simulator.simulation_objects.values()]
+        self.shared = {id(obj): obj for obj in shared}
+        self.state_slots = {}
+
+    def get_state_slots(self, cls):
+        """ Get the names of the slots that hold the state of a simulation object class' instances
+
+        Args:
+            cls (:obj:`type`): a simulation object class
+
+        Returns:
+            :obj:`list` of :obj:`str`: the names of the slots, with private names mangled
+        """
+        if cls not in self.state_slots:
+            constant_attributes = getattr(cls, 'constant_attributes', ())
+            state_slots = []
+            for base in cls.__mro__:
+                slots = base.__dict__.get('__slots__', ())
+                if isinstance(slots, str):
+                    slots = (slots,)
+                for slot in slots:
+                    if slot in UNSAVED_ATTRIBUTES or slot in constant_attributes:
+                        continue
+                    if slot.startswith('__') and not slot.endswith('__'):
+                        slot = f"_{base.__name__.lstrip('_')}{slot}"
+                    if slot not in state_slots:
+                        state_slots.append(slot)
+            self.state_slots[cls] = state_slots
+        return self.state_slots[cls]
+
+    def save(self, simulation_object):
+        """ Save a copy of a simulation object's state
+
+        Args:
+            simulation_object (:obj:`~de_sim.simulation_object.SimulationObject`): a simulation object
+
+        Returns:
+            :obj:`tuple`: a :obj:`dict` that maps the names of the object's attributes to copies of their values,
+            and a list of (attribute name, generator, generator state) triples for its random number generators
+        """
+        cls = simulation_object.__class__
+        attributes = {}
+        generators = []
+        mutable_attributes = {}
+
+        def save_attribute(name, value):
+            value_type = value.__class__
+            if value_type in self.ATOMIC_TYPES:
+                attributes[name] = value
+            elif value_type in self.GENERATOR_STATE_ACCESSORS:
+                get_state, _ = self.GENERATOR_STATE_ACCESSORS[value_type]
+                generators.append((name, value, get_state(value)))
+            else:
+                mutable_attributes[name] = value
+
+        if hasattr(simulation_object, '__dict__'):
+            constant_attributes = getattr(cls, 'constant_attributes', ())
+            for name, value in simulation_object.__dict__.items():
+                if name not in constant_attributes:
+                    save_attribute(name, value)
+        for slot in self.get_state_slots(cls):
+            try:
+                save_attribute(slot, getattr(simulation_object, slot))
+            except AttributeError:
+                pass
+        if mutable_attributes:
+            memo = _SharedMemo(self.shared)
+            memo.update(self.find_events(mutable_attributes.values()))
+            attributes.update(copy.deepcopy(mutable_attributes, memo))
+        return (attributes, generators)
+
+    def find_events(self, values):
+        """ Find the events that values reference, so that they can be referenced, rather than copied, by a copy
+
+        Containers and the attributes of other objects are searched, except for objects that are shared.
+
+        Args:
+            values (:obj:`iterable`): values
+
+        Returns:
+            :obj:`dict`: map from the id of each event found to the event
+        """
+        events = {}
+        searched = set(self.shared)
+        pending = list(values)
+        while pending:
+            value = pending.pop()
+            value_type = value.__class__
+            if value_type in self.ATOMIC_TYPES or id(value) in searched or isinstance(value, self.UNSEARCHED_TYPES):
+                continue
+            searched.add(id(value))
+            if value_type is Event:
+                events[id(value)] = value
+            elif isinstance(value, dict):
+                pending.extend(value.keys())
+                pending.extend(value.values())
+            elif isinstance(value, (list, tuple, set, frozenset, deque)):
+                pending.extend(value)
+            else:
+                pending.extend(getattr(value, '__dict__', {}).values())
+                for base in value_type.__mro__:
+                    slots = base.__dict__.get('__slots__', ())
+                    for slot in ((slots,) if isinstance(slots, str) else slots):
+                        if slot not in ('__dict__', '__weakref__'):
+                            if slot.startswith('__') and not slot.endswith('__'):
+                                slot = f"_{base.__name__.lstrip('_')}{slot}"
+                            pending.append(getattr(value, slot, None))
+        return events
+
+    def restore(self, simulation_object, state):
+        """ Restore a simulation object's state
+
+        `state` is used, rather than copied, so it must not be restored again.
+
+        Args:
+            simulation_object (:obj:`~de_sim.simulation_object.SimulationObject`): a simulation object
+            state (:obj:`tuple`): state provided by :obj:`save`
+        """
+        cls = simulation_object.__class__
+        attributes, generators = state
+        for name, generator, generator_state in generators:
+            _, set_state = self.GENERATOR_STATE_ACCESSORS[generator.__class__]
+            set_state(generator, generator_state)
+            attributes[name] = generator
+        for slot in self.get_state_slots(cls):
+            if slot in attributes:
+                setattr(simulation_object, slot, attributes.pop(slot))
+            elif hasattr(simulation_object, slot):
+                delattr(simulation_object, slot)
+        if hasattr(simulation_object, '__dict__'):
+            instance_dict = simulation_object.__dict__
+            constant_attributes = getattr(cls, 'constant_attributes', ())
+            for name in [name for name in instance_dict
+                         if name not in attributes and name not in constant_attributes]:
+                del instance_dict[name]
+            instance_dict.update(attributes)
+
+
+class ExecutedBatch(object):
+    """ A record of a call to an event handler that has not been committed, which is used to roll it back
+
+    Attributes:
+        order_time (:obj:`tuple`): the order time of the batch's events
+        simulation_object (:obj:`~de_sim.simulation_object.SimulationObject`): the object that executed the batch
+        state (:obj:`tuple`): the object's state before it executed the batch, as saved by a :obj:`StateSaver`
+        events (:obj:`list` of :obj:`~de_sim.event.Event`): the events executed
+        sent (:obj:`list` of :obj:`~de_sim.event.Event`): the events sent by the handler; events sent to other
+            partitions are represented by events that are not live
+        sent_remote (:obj:`list` of :obj:`tuple`): (partition, event id, receive time) of each event sent to another
+            partition
+        cancelled (:obj:`list` of :obj:`~de_sim.event.Event`): the events cancelled by the handler
+    """
+    __slots__ = ('order_time', 'simulation_object', 'state', 'events', 'sent', 'sent_remote', 'cancelled')
+
+    def __init__(self, order_time, simulation_object, state, events):
+        self.order_time = order_time
+        self.simulation_object = simulation_object
+        self.state = state
+        self.events = events
+        self.sent = []
+        self.sent_remote = []
+        self.cancelled = []
+
+
+class TimeWarpEventQueue(PartitionEventQueue):
+    """ The event queue of one partition of a Time Warp simulation
+
+    While an event handler executes, the events it sends and cancels are recorded in the :obj:`ExecutedBatch`
+    that's executing, so that they can be cancelled and restored if it's rolled back. Events sent to other
+    partitions need no lookahead. Each is identified by an event id, which an anti-message uses to annihilate it.
+    Events that occur after the end of the simulation are not sent to other partitions.
+
+    Items in an outbox are (sign, event id, receive time, event) tuples, with sign `'+'` for an event, which is
+    a (send time, receive time, sending object name, receiving object name, event message) tuple, and `'-'` for an
+    anti-message, whose event is `None`.
+
+    Attributes:
+        max_time (:obj:`float`): the maximum time of the end of the simulation
+        batch (:obj:`ExecutedBatch`): the batch being executed, or `None`
+        num_sent_remote (:obj:`int`): the number of events sent to other partitions
+    """
+
+    def __init__(self, partition, partitions, num_partitions, backend='heap'):
+        """
+        Args:
+            partition (:obj:`int`): the index of this event queue's partition
+            partitions (:obj:`dict`): map from the name of each simulation object to the index of its partition
+            num_partitions (:obj:`int`): the number of partitions
+            backend (:obj:`str`, optional): the name of the event queue backend
+        """
+        super().__init__(partition, partitions, num_partitions, None, backend=backend)
+        self.max_time = math.inf
+        self.batch = None
+        self.num_sent_remote = 0
+
+    def check_order(self, events):
+        """ Ensure that events sent by the executing handler do not precede its events
+
+        Raises:
+            :obj:`SimulatorError`: if an event would execute before the handler's events
+        """
+        batch = self.batch
+        for event in events:
+            if event._order_time < batch.order_time:
+                raise SimulatorError(f"event sent by '{batch.simulation_object.name}' to "
+                                     f"'{event.receiving_object.name}' at time {event.event_time} would execute "
+                                     f"before the sender's events at that time, which Time Warp does not support")
+
+    def send_remote(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Put an event for an object in another partition in that partition's outbox
+
+        Returns:
+            :obj:`~de_sim.event.Event`: an event that represents the sent event, but is not scheduled
+
+        Raises:
+            :obj:`SimulatorError`: if the event is invalid
+        """
+        event = self.make_event(send_time, receive_time, sending_object, receiving_object, event_message)
+        event.live = False
+        if receive_time <= self.max_time:
+            partition = self.partitions[receiving_object.name]
+            event_id = (self.partition, self.num_sent_remote)
+            self.num_sent_remote += 1
+            self.outboxes[partition].append(('+', event_id, receive_time,
+                                             (send_time, receive_time, sending_object.name, receiving_object.name,
+                                              event_message)))
+            if self.batch is not None:
+                self.batch.sent_remote.append((partition, event_id, receive_time))
+        return event
+
+    def schedule_event(self, send_time, receive_time, sending_object, receiving_object, event_message):
+        """ Schedule an event, or put it in an outbox, and record it in the executing batch
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_event`.
+        """
+        event = super().schedule_event(send_time, receive_time, sending_object, receiving_object, event_message)
+        if self.batch is not None:
+            self.check_order((event,))
+            self.batch.sent.append(event)
+        return event
+
+    def schedule_events(self, events_args):
+        """ Schedule events, or put them in outboxes, and record them in the executing batch
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_events`.
+        """
+        events = super().schedule_events(events_args)
+        if self.batch is not None:
+            self.check_order(events)
+            self.batch.sent.extend(events)
+        return events
+
+    def schedule_multicast(self, send_time, receive_time, sending_object, receiving_objects, event_message):
+        """ Schedule a multicast, and record its events in the executing batch
+
+        See :obj:`~de_sim.simulator.EventQueue.schedule_multicast`.
+        """
+        if any(self.is_remote(receiving_object) for receiving_object in receiving_objects):
+            return self.schedule_events([(send_time, receive_time, sending_object, receiving_object, event_message)
+                                         for receiving_object in receiving_objects])
+        events = EventQueue.schedule_multicast(self, send_time, receive_time, sending_object, receiving_objects,
+                                               event_message)
+        if self.batch is not None:
+            self.check_order(events)
+            self.batch.sent.extend(events)
+        return events
+
+    def cancel_event(self, event):
+        """ Cancel a scheduled event
+
+        An event cancelled by an event handler is removed from the backend, rather than left as a tombstone,
+        so that it can be rescheduled if the handler is rolled back. This costs `O(n)`.
+
+        Raises:
+            :obj:`SimulatorError`: if `event` was sent to an object in another partition, or if `event` has
+                already been cancelled or executed
+        """
+        if self.batch is None or not event.live or self.is_remote(event.receiving_object):
+            super().cancel_event(event)
+            return
+        event.live = False
+        self.backend.retain(lambda scheduled_event: scheduled_event is not event)
+        self.batch.cancelled.append(event)
+
+
+class TimeWarpProcess(object):
+    """ The Time Warp logical process that simulates a partition
+
+    Events received from other partitions, and sent to them, are exchanged in messages of the form
+    `('items', sending partition, items)`, where items are outbox items of a :obj:`TimeWarpEventQueue`.
+
+    GVT is computed by Chandy and Lamport's snapshot algorithm, which relies on messages between two processes
+    being received in the order they're sent. Partition 0 coordinates. It starts a round by taking a snapshot.
+    A process takes a snapshot, when it starts a round or first receives a marker of the round, by recording
+    the time of its next event, and sending `('marker', partition, round)` to all other processes. Until it
+    receives their markers, it records the earliest time of the events and anti-messages they send it, which were
+    in transit when the snapshot was taken. Then it reports the minimum of these times to the coordinator in
+    `('report', partition, round, time)`. The minimum of all reports is the GVT, which the coordinator sends
+    in `('gvt', round, time)`. No rollback can undo an event that occurs before the GVT.
+
+    Attributes:
+        partition (:obj:`~de_sim.parallel.Partition`): the partition
+        event_queue (:obj:`TimeWarpEventQueue`): the partition's event queue
+        state_saver (:obj:`StateSaver`): the saver of the partition's objects' state
+        others (:obj:`list` of :obj:`int`): the indices of the other partitions
+        max_time (:obj:`float`): the maximum time of the end of the simulation
+        processed (:obj:`collections.deque` of :obj:`ExecutedBatch`): the executed batches that have not been
+            committed, in execution order
+        received (:obj:`dict`): map from the id of each event received from another partition that has not been
+            committed to the event
+        gvt (:obj:`float`): the latest global virtual time
+        round (:obj:`int`): the latest round of GVT computation in which this process took a snapshot
+        snapshot_time (:obj:`float`): the earliest time of the events pending at the snapshot, and in
+            transit to this process
+        awaited_markers (:obj:`set`): the partitions whose markers for `round` have not been received, or
+            `None` if this process has reported on `round`
+        reports (:obj:`list` of :obj:`float`): in the coordinator, the reports received for the current round
+        round_in_progress (:obj:`bool`): in the coordinator, whether a GVT computation is in progress
+        num_executed_since_round (:obj:`int`): the number of batches executed since the last round started
+        finished (:obj:`bool`): whether the GVT exceeds `max_time`, so the simulation is over
+    """
+    COORDINATOR = 0
+
+    def __init__(self, partition, num_partitions, max_time, time_init):
+        """
+        Args:
+            partition (:obj:`~de_sim.parallel.Partition`): the partition
+            num_partitions (:obj:`int`): the number of partitions
+            max_time (:obj:`float`): the maximum time of the end of the simulation
+            time_init (:obj:`float`): the simulation's initial time
+        """
+        self.partition = partition
+        self.event_queue = partition.event_queue
+        self.state_saver = StateSaver(partition.simulator)
+        self.others = [other for other in range(num_partitions) if other != partition.index]
+        self.max_time = max_time
+        self.processed = deque()
+        self.received = {}
+        self.gvt = time_init
+        self.round = 0
+        self.snapshot_time = math.inf
+        self.awaited_markers = None
+        self.reports = []
+        self.round_in_progress = False
+        self.num_executed_since_round = 0
+        self.finished = False
+        partition.stats.update(num_rollbacks=0, num_rolled_back=0, num_gvt_rounds=0)
+
+    def execute(self, end_time, max_batches):
+        """ Execute events optimistically, saving the state needed to roll them back
+
+        Args:
+            end_time (:obj:`float`): the time of the last events that may be executed
+            max_batches (:obj:`int`): the maximum number of calls to event handlers
+
+        Returns:
+            :obj:`int`: the number of calls made to event handlers
+        """
+        simulator = self.partition.simulator
+        event_queue = self.event_queue
+        save = self.state_saver.save
+        for num_batches in range(max_batches):
+            next_time, next_sim_obj, next_events = event_queue.next_event_batch(end_time)
+            if not next_events:
+                break
+            batch = ExecutedBatch(next_events[0]._order_time, next_sim_obj, save(next_sim_obj), next_events)
+            event_queue.batch = batch
+            simulator.time = next_time
+            next_sim_obj.time = next_time
+            next_sim_obj._BaseSimulationObject__handle_event_list(next_events)
+            event_queue.batch = None
+            self.processed.append(batch)
+        else:
+            num_batches = max_batches
+        self.partition.num_events += num_batches
+        self.num_executed_since_round += num_batches
+        return num_batches
+
+    def rollback(self, order_time):
+        """ Roll back the executed batches whose events occur at or after an order time
+
+        Batches are undone in the reverse of their execution order. Undoing a batch restores its object's state,
+        reschedules the events it executed and cancelled, cancels the local events it sent, and sends
+        anti-messages for the events it sent to other partitions.
+
+        Args:
+            order_time (:obj:`tuple`): the order time of a straggler
+        """
+        event_queue = self.event_queue
+        backend = event_queue.backend
+        num_rolled_back = 0
+        while self.processed and order_time <= self.processed[-1].order_time:
+            batch = self.processed.pop()
+            self.state_saver.restore(batch.simulation_object, batch.state)
+            for event in batch.cancelled:
+                event.live = True
+                backend.schedule(event)
+            for event in batch.sent:
+                # events sent to other partitions are not live
+                if event.live:
+                    EventQueue.cancel_event(event_queue, event)
+            for partition, event_id, receive_time in batch.sent_remote:
+                event_queue.outboxes[partition].append(('-', event_id, receive_time, None))
+            for event in batch.events:
+                event.live = True
+            backend.schedule_many(batch.events)
+            num_rolled_back += 1
+        self.partition.num_events -= num_rolled_back
+        self.partition.stats['num_rollbacks'] += 1
+        self.partition.stats['num_rolled_back'] += num_rolled_back
+
+    def receive_items(self, sender, items):
+        """ Receive events and anti-messages from another partition, rolling back if they are stragglers
+
+        Args:
+            sender (:obj:`int`): the sending partition
+            items (:obj:`list` of :obj:`tuple`): the items sent, from the sender's outbox
+        """
+        if self.awaited_markers is not None and sender in self.awaited_markers:
+            # the items were in transit when this process took its snapshot
+            self.snapshot_time = min(self.snapshot_time, min(item[2] for item in items))
+        event_queue = self.event_queue
+        simulation_objects = self.partition.simulator.simulation_objects
+        # roll back once, to the earliest straggler or executed event that's annihilated
+        rollback_time = None
+        annihilated = []
+        for sign, event_id, _, event_args in items:
+            if sign == '+':
+                send_time, receive_time, sender_name, receiver_name, event_message = event_args
+                event = EventQueue.schedule_event(event_queue, send_time, receive_time,
+                                                  simulation_objects[sender_name],
+                                                  simulation_objects[receiver_name], event_message)
+                self.received[event_id] = event
+            else:
+                event = self.received.pop(event_id)
+                if event.live:
+                    event_queue.cancel_event(event)
+                    continue
+                annihilated.append(event)
+            if self.processed and event._order_time <= self.processed[-1].order_time and \
+                    (rollback_time is None or event._order_time < rollback_time):
+                rollback_time = event._order_time
+        if rollback_time is not None:
+            # rolling back reschedules the executed events that are annihilated, and those superposed with
+            # stragglers
+            self.rollback(rollback_time)
+        for event in annihilated:
+            event_queue.cancel_event(event)
+
+    def flush(self):
+        """ Send the items in the outboxes to the other partitions
+        """
+        for other in self.others:
+            items = self.event_queue.take_outbox(other)
+            if items:
+                self.partition.send(other, ('items', self.partition.index, items))
+
+    def start_round(self):
+        """ Start a round of GVT computation; called by the coordinator
+        """
+        self.round_in_progress = True
+        self.num_executed_since_round = 0
+        self.take_snapshot(self.round + 1)
+
+    def take_snapshot(self, round):
+        """ Take this process' snapshot for a round of GVT computation
+
+        Args:
+            round (:obj:`int`): the round
+        """
+        self.flush()
+        self.round = round
+        self.snapshot_time = self.event_queue.next_event_time()
+        self.awaited_markers = set(self.others)
+        for other in self.others:
+            self.partition.send(other, ('marker', self.partition.index, round))
+        self.report_if_ready()
+
+    def receive_marker(self, sender, round):
+        """ Receive another process' marker for a round of GVT computation
+
+        Args:
+            sender (:obj:`int`): the sending partition
+            round (:obj:`int`): the round
+        """
+        if self.round < round:
+            self.take_snapshot(round)
+        self.awaited_markers.discard(sender)
+        self.report_if_ready()
+
+    def report_if_ready(self):
+        """ Report this process' snapshot time to the coordinator once all markers have been received
+        """
+        if self.awaited_markers is None or self.awaited_markers:
+            return
+        self.awaited_markers = None
+        if self.partition.index == self.COORDINATOR:
+            self.receive_report(self.snapshot_time)
+        else:
+            self.partition.send(self.COORDINATOR, ('report', self.partition.index, self.round, self.snapshot_time))
+
+    def receive_report(self, time):
+        """ Receive a process' report, and send the GVT once all processes have reported; called by the coordinator
+
+        Args:
+            time (:obj:`float`): the earliest time of the events pending in the process, or in transit to it,
+                at its snapshot
+        """
+        self.reports.append(time)
+        if len(self.reports) == len(self.others) + 1:
+            gvt = min(self.reports)
+            self.reports = []
+            self.round_in_progress = False
+            for other in self.others:
+                self.partition.send(other, ('gvt', self.round, gvt))
+            self.receive_gvt(gvt)
+
+    def receive_gvt(self, gvt):
+        """ Commit the batches that precede a new GVT, and discard their saved state
+
+        Args:
+            gvt (:obj:`float`): the GVT
+        """
+        self.gvt = gvt
+        self.partition.stats['num_gvt_rounds'] += 1
+        processed = self.processed
+        while processed and processed[0].order_time[0] < gvt:
+            processed.popleft()
+        self.received = {event_id: event for event_id, event in self.received.items()
+                         if event.live or gvt <= event.event_time}
+        if self.max_time < gvt:
+            self.finished = True
+
+    def handle(self, message):
+        """ Handle a message from another process
+
+        Args:
+            message (:obj:`tuple`): the message
+        """
+        kind = message[0]
+        if kind == 'items':
+            self.receive_items(*message[1:])
+        elif kind == 'marker':
+            self.receive_marker(*message[1:])
+        elif kind == 'report':
+            self.receive_report(message[3])
+        else:
+            self.receive_gvt(message[2])
+
+
+class TimeWarpSimulator(ParallelSimulator):
+    """ An optimistic parallel simulator, which uses the Time Warp protocol
+
+    Partitions need no lookahead, so a :obj:`TimeWarpSimulator` suits models whose objects send events to objects
+    in other partitions with short or zero delays. Each partition executes its objects' events in the order used
+    by the sequential :obj:`~de_sim.simulator.Simulator`, (event time, class priority, tiebreaker), rolling back
+    when it receives a straggler, so a deterministic model produces the same results. Simultaneous events at an
+    object are superposed, but superposed events whose messages are equal may be provided in a different order.
+    However, an event handler may not send an event that occurs at the current time to an object whose events
+    at that time execute before the handler's, which a sequential simulation executes out of time order.
+
+    Before an object executes an event, its state is saved by a :obj:`StateSaver`, which copies it, so objects
+    with large state are expensive to simulate. A class can avoid saving attributes that its event handlers never
+    modify by naming them in `constant_attributes`. An object's state must be held in its instance attributes,
+    and an object cannot use the state of other objects, or of global variables that it modifies. Random number
+    generators, in particular, must be attributes of the objects that use them. Because events are executed
+    speculatively, they may encounter states that a sequential simulation never reaches, so handlers should not
+    perform irreversible actions, like writing files, or raise exceptions in states that can be rolled back.
+
+    Each partition reports the statistics `num_rollbacks`, the number of rollbacks, `num_rolled_back`, the number of
+    calls to event handlers that were rolled back, and `num_gvt_rounds`, the number of GVT computations.
+
+    Attributes:
+        gvt_interval (:obj:`int`): the number of calls to event handlers made by the coordinator of GVT computation
+            between computations
+        time_window (:obj:`float`): the maximum amount of time by which a partition may execute events after GVT
+    """
+    # the number of calls to event handlers a partition makes between checks for messages
+    POLL_INTERVAL = 32
+
+    def __init__(self, build_model, num_partitions, partition, get_results=None, gvt_interval=1000,
+                 time_window=math.inf):
+        """
+        Args:
+            build_model (:obj:`callable`): a function that builds the model in a
+                :obj:`~de_sim.simulator.Simulator`
+            num_partitions (:obj:`int`): the number of partitions
+            partition (:obj:`dict` or :obj:`callable`): a map from each simulation object's name to the index of
+                its partition, or a function that provides the index of a simulation object's partition
+            get_results (:obj:`callable`, optional): a function that obtains picklable results from a
+                partition's simulation objects
+            gvt_interval (:obj:`int`, optional): the number of calls to event handlers made by the coordinator of
+                GVT computation between computations; smaller intervals reduce the memory used by saved state
+            time_window (:obj:`float`, optional): the maximum amount of time by which a partition may execute
+                events after GVT; smaller windows limit the events that can be rolled back
+
+        Raises:
+            :obj:`SimulatorError`: if `num_partitions`, `gvt_interval` or `time_window` is not positive
+        """
+        super().__init__(build_model, num_partitions, partition, None, get_results=get_results)
+        if gvt_interval < 1:
+            raise SimulatorError(f"gvt_interval must be positive, but is {gvt_interval}")
+        if not 0 < time_window:
+            raise SimulatorError(f"time_window must be positive, but is {time_window}")
+        self.gvt_interval = gvt_interval
+        self.time_window = time_window
+
+    def make_event_queue(self, index, partitions):
+        """ Make the event queue of a partition
+
+        Args:
+            index (:obj:`int`): the partition's index
+            partitions (:obj:`dict`): map from the name of each simulation object to the index of its partition
+
+        Returns:
+            :obj:`TimeWarpEventQueue`: the partition's event queue
+        """
+        return TimeWarpEventQueue(index, partitions, self.num_partitions)
+
+    def simulate_partition(self, partition, max_time, time_init):
+        """ Simulate a partition with the Time Warp protocol
+
+        Args:
+            partition (:obj:`~de_sim.parallel.Partition`): the partition
+            max_time (:obj:`float`): the maximum time of the end of the simulation
+            time_init (:obj:`float`): the simulation's initial time
+        """
+        partition.event_queue.max_time = max_time
+        process = TimeWarpProcess(partition, self.num_partitions, max_time, time_init)
+        is_coordinator = partition.index == TimeWarpProcess.COORDINATOR
+        # events sent by init_before_run() are in the outboxes
+        process.flush()
+        block = False
+        while True:
+            for message in partition.receive(block=block):
+                process.handle(message)
+            if process.finished:
+                return
+            num_executed = process.execute(min(max_time, process.gvt + self.time_window), self.POLL_INTERVAL)
+            process.flush()
+            if is_coordinator and not process.round_in_progress and \
+                    (not num_executed or self.gvt_interval <= process.num_executed_since_round):
+                process.start_round()
+                if process.finished:
+                    return
+            # wait for messages if this process is idle, and is not about to start a round
+            block = not num_executed and (not is_coordinator or process.round_in_progress)
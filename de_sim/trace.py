@@ -0,0 +1,208 @@
+""" A compact binary trace of the events executed by a simulation
+
+A trace file contains a header, a fixed-width record for each event, in the order the events were executed, and
+a footer that holds the names of the objects and message types, which records identify by integer ids.
+:obj:`TraceWriter` buffers records and writes them in large blocks. :obj:`EventTrace` memory-maps a trace file
+into NumPy arrays. A simulation writes a trace if its :obj:`~de_sim.simulation_config.SimulationConfig` sets
+`trace_file`, which costs much less than logging events to the text plot log.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-12-01
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import json
+import numpy
+import struct
+
+from de_sim.errors import SimulatorError
+
+# the header: magic number, format version, record size, number of records, and offset of the footer
+HEADER = struct.Struct('<8sIIQQ')
+MAGIC = b'DESIMTRC'
+VERSION = 1
+# a record: send time, receive time, sender id, receiver id, and message type id
+RECORD = struct.Struct('<ddIII')
+RECORD_DTYPE = numpy.dtype([('send_time', '<f8'), ('receive_time', '<f8'), ('sender', '<u4'),
+                            ('receiver', '<u4'), ('message_type', '<u4')])
+
+
+class TraceWriter(object):
+    """ Write a binary trace of events
+
+    Attributes:
+        filename (:obj:`str`): the trace file
+        block_size (:obj:`int`): the number of records buffered before they're written
+        num_records (:obj:`int`): the number of records written, or buffered
+        object_ids (:obj:`dict`): map from the name of each object in the trace to its id
+        message_type_ids (:obj:`dict`): map from each message type in the trace to its id
+    """
+
+    def __init__(self, filename, block_size=2**16):
+        """
+        Args:
+            filename (:obj:`str`): the trace file, which is overwritten
+            block_size (:obj:`int`, optional): the number of records buffered before they're written
+
+        Raises:
+            :obj:`SimulatorError`: if `block_size` is not positive
+        """
+        if block_size < 1:
+            raise SimulatorError(f"block_size must be positive, but is {block_size}")
+        self.filename = filename
+        self.block_size = block_size
+        self.num_records = 0
+        self.object_ids = {}
+        self.message_type_ids = {}
+        self._buffer = bytearray(block_size * RECORD.size)
+        self._num_buffered = 0
+        self._file = open(filename, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_events(self, events):
+        """ Write events
+
+        Args:
+            events (:obj:`iterable` of :obj:`~de_sim.event.Event`): events, in the order they're executed
+        """
+        object_ids = self.object_ids
+        message_type_ids = self.message_type_ids
+        pack_into = RECORD.pack_into
+        record_size = RECORD.size
+        buffer = self._buffer
+        num_buffered = self._num_buffered
+        for event in events:
+            sender = event.sending_object.name
+            sender_id = object_ids.get(sender)
+            if sender_id is None:
+                sender_id = object_ids[sender] = len(object_ids)
+            receiver = event.receiving_object.name
+            receiver_id = object_ids.get(receiver)
+            if receiver_id is None:
+                receiver_id = object_ids[receiver] = len(object_ids)
+            message_type = event.message.__class__
+            message_type_id = message_type_ids.get(message_type)
+            if message_type_id is None:
+                message_type_id = message_type_ids[message_type] = len(message_type_ids)
+            pack_into(buffer, num_buffered * record_size, event.creation_time, event.event_time,
+                      sender_id, receiver_id, message_type_id)
+            num_buffered += 1
+            if num_buffered == self.block_size:
+                self._num_buffered = num_buffered
+                self.flush()
+                num_buffered = 0
+        self._num_buffered = num_buffered
+
+    def flush(self):
+        """ Write the buffered records to the trace file
+        """
+        if self._num_buffered:
+            self._file.write(memoryview(self._buffer)[:self._num_buffered * RECORD.size])
+            self._file.flush()
+            self.num_records += self._num_buffered
+            self._num_buffered = 0
+
+    def close(self):
+        """ Write the buffered records and the footer, and close the trace file
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        footer_offset = self._file.tell()
+        footer = dict(objects=list(self.object_ids),
+                      message_types=[message_type.__name__ for message_type in self.message_type_ids])
+        self._file.write(json.dumps(footer).encode())
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.num_records, footer_offset))
+        self._file.close()
+
+
+class EventTrace(object):
+    """ A trace file, memory-mapped into NumPy arrays
+
+    Attributes:
+        filename (:obj:`str`): the trace file
+        records (:obj:`numpy.ndarray`): the records, a structured array whose fields are the columns
+        send_times (:obj:`numpy.ndarray`): the send time of each event
+        receive_times (:obj:`numpy.ndarray`): the receive time of each event
+        senders (:obj:`numpy.ndarray`): the id of each event's sender
+        receivers (:obj:`numpy.ndarray`): the id of each event's receiver
+        message_types (:obj:`numpy.ndarray`): the id of each event's message type
+        object_names (:obj:`list` of :obj:`str`): the name of each object, indexed by id
+        message_type_names (:obj:`list` of :obj:`str`): the class name of each message type, indexed by id
+    """
+
+    def __init__(self, filename):
+        """
+        Args:
+            filename (:obj:`str`): the trace file
+
+        Raises:
+            :obj:`SimulatorError`: if `filename` isn't a trace file, or its writer wasn't closed
+        """
+        self.filename = filename
+        with open(filename, 'rb') as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+                raise SimulatorError(f"'{filename}' is not an event trace")
+            _, version, record_size, num_records, footer_offset = HEADER.unpack(header)
+            if version != VERSION or record_size != RECORD.size:
+                raise SimulatorError(f"event trace '{filename}' has version {version}, but version {VERSION} "
+                                     "is supported")
+            if not footer_offset:
+                raise SimulatorError(f"event trace '{filename}' is incomplete, as its writer wasn't closed")
+            file.seek(footer_offset)
+            footer = json.loads(file.read().decode())
+        self.object_names = footer['objects']
+        self.message_type_names = footer['message_types']
+        if num_records:
+            self.records = numpy.memmap(filename, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size,
+                                        shape=(num_records,))
+        else:
+            # numpy cannot map an empty array
+            self.records = numpy.empty(0, dtype=RECORD_DTYPE)
+        self.send_times = self.records['send_time']
+        self.receive_times = self.records['receive_time']
+        self.senders = self.records['sender']
+        self.receivers = self.records['receiver']
+        self.message_types = self.records['message_type']
+
+    @staticmethod
+    def is_event_trace(filename):
+        """ Determine whether a file is a trace file
+
+        Args:
+            filename (:obj:`str`): a file
+
+        Returns:
+            :obj:`bool`: whether `filename` starts like a trace file
+        """
+        with open(filename, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_event_messages(self):
+        """ Get the events in the trace as :obj:`~de_sim.visualize.SimulationEventMessage` records
+
+        Returns:
+            :obj:`list` of :obj:`~de_sim.visualize.SimulationEventMessage`: the events, in the order they were
+            executed
+        """
+        from de_sim.visualize import EventCoordinates, SimulationEventMessage
+        object_names = self.object_names
+        message_type_names = self.message_type_names
+        return [SimulationEventMessage(message_type_names[message_type],
+                                       EventCoordinates(object_names[sender], send_time),
+                                       EventCoordinates(object_names[receiver], receive_time))
+                for send_time, receive_time, sender, receiver, message_type in
+                zip(self.send_times.tolist(), self.receive_times.tolist(), self.senders.tolist(),
+                    self.receivers.tolist(), self.message_types.tolist())]
@@ -140,12 +140,19 @@ class FastLogger(object):
                 min_of_min = handler.min_level
         return min_of_min
 
-    def fast_log(self, msg, **kwargs):
+    def fast_log(self, msg, *args, **kwargs):
         """ Log, and do it quickly if nothing is being written
 
+        To avoid the cost of formatting a message that won't be written, provide `msg` as a format string
+        and its values in `args`. The message is formatted only if this logger is active.
+        On hot paths, callers can avoid even the call by testing `active` first.
+
         Args:
-            msg (:obj:`str`): the log message
+            msg (:obj:`str`): the log message, or a format string if `args` are provided
+            args (:obj:`tuple`): values formatted into `msg` by :obj:`str.format`
             kwargs (:obj:`dict`): other logging arguments
         """
         if self.active:
+            if args:
+                msg = msg.format(*args)
             self.method(msg, **kwargs)
@@ -13,6 +13,8 @@ from collections import namedtuple
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 
+from de_sim.trace import EventTrace
+
 
 EventCoordinates = namedtuple('EventCoordinates', 'sim_obj_id time',)
 EventCoordinates.__doc__ += ': the coordinates of an event: (simulation object id, simulation time)'
@@ -197,11 +199,16 @@ class SpaceTime(object):
         """ Extract event message data from plot file
 
         Args:
-            plot_file (:obj:`str`): filename of log with event data
+            plot_file (:obj:`str`): filename of log with event data, or of a binary event trace written by
+                :obj:`~de_sim.trace.TraceWriter`
 
         Returns:
             :obj:`list` of :obj:`SimulationEventMessage`: list of all event messages in simulation run
         """
+        if EventTrace.is_event_trace(plot_file):
+            self.data = EventTrace(plot_file).get_event_messages()
+            return self.data
+
         # 1. open file
         event_messages = []
         with open(plot_file, 'r') as file:
@@ -0,0 +1,311 @@
+""" A window-synchronous parallel simulator, which uses the YAWNS protocol
+
+The partitions of a YAWNS simulation advance together, in steps. Each step begins at a barrier, where the partitions
+learn each other's next event times. A partition then executes all of its events that occur before any event that
+another partition may send it in the step: the window of partition `q` is `[t, min_{p != q} (T_p + L_pq))`, where
+`T_p` is the next event time of partition `p` and `L_pq` is the lookahead of the link from `p` to `q`. When the
+lookahead is uniform, the windows of all partitions contain `[t, t + lookahead)`, where `t` is the earliest next
+event time of all partitions. The events sent in a step occur after every partition's window, so they are exchanged
+at the next barrier. Unlike the null message protocol, a partition that doesn't send events to another partition
+doesn't send it any messages.
+
+Partitions exchange events through mailboxes in shared memory, rather than through pipes. Python 3.8 or later is
+required.
+
+See Nicol, D. M. (1993). The Cost of Conservative Synchronization in Parallel Discrete Event Simulations. Journal
+of the ACM, 40(2), 304-333.
+
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-29
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+from multiprocessing import shared_memory
+import math
+import multiprocessing
+import numpy
+import os
+import pickle
+import struct
+
+from de_sim.errors import SimulatorError
+from de_sim.parallel import ParallelSimulator
+
+
+class SharedMailboxes(object):
+    """ Mailboxes in shared memory, through which the partitions of a parallel simulation exchange events
+
+    Each partition has two mailboxes, which it writes in alternate steps, so that a partition can write the events
+    of a step while other partitions read the events of the previous step. A mailbox holds the offsets of the
+    events for each partition, followed by the pickled events. A partition whose events don't fit in a mailbox
+    replaces it with a larger mailbox of the next *generation*, and the other partitions attach to the new
+    mailbox when they next read it. Mailboxes are named by their parity, partition, and generation.
+
+    Besides the mailboxes, a control block holds the generation of each mailbox, and for each step, the next
+    event time of each partition and the earliest time of the events it sent to each other partition.
+
+    Attributes:
+        prefix (:obj:`str`): the prefix of the names of the shared memory blocks
+        num_partitions (:obj:`int`): the number of partitions
+        mailbox_size (:obj:`int`): the initial size of a mailbox, in bytes
+        control (:obj:`multiprocessing.shared_memory.SharedMemory`): the control block
+        generations (:obj:`numpy.ndarray`): `generations[parity, p]` is the generation of partition `p`'s
+            mailbox with `parity`
+        next_times (:obj:`numpy.ndarray`): `next_times[parity, p]` is the next event time of partition `p`,
+            before receiving events, in steps with `parity`
+        sent_times (:obj:`numpy.ndarray`): `sent_times[parity, p, q]` is the earliest time of the events sent by
+            partition `p` to partition `q`, in steps with `parity`
+        mailboxes (:obj:`dict`): map from (parity, partition) to the (generation, shared memory block) of the
+            mailboxes attached in this process
+    """
+
+    def __init__(self, num_partitions, mailbox_size, prefix=None):
+        """ Create the control block and the first generation of mailboxes, or attach to them if `prefix` is set
+
+        Args:
+            num_partitions (:obj:`int`): the number of partitions
+            mailbox_size (:obj:`int`): the initial size of a mailbox, in bytes
+            prefix (:obj:`str`, optional): the prefix of the names of existing mailboxes to attach to
+        """
+        create = prefix is None
+        if create:
+            prefix = f'de_sim_{os.getpid()}_{os.urandom(4).hex()}'
+        self.prefix = prefix
+        self.num_partitions = num_partitions
+        self.mailbox_size = mailbox_size
+        num_values = 2 * num_partitions * (2 + num_partitions)
+        self.control = shared_memory.SharedMemory(name=f'{prefix}_control', create=create, size=8 * num_values)
+        values = numpy.ndarray((num_values,), dtype=numpy.float64, buffer=self.control.buf)
+        self.generations = values[:2 * num_partitions].view(numpy.int64).reshape(2, num_partitions)
+        self.next_times = values[2 * num_partitions:4 * num_partitions].reshape(2, num_partitions)
+        self.sent_times = values[4 * num_partitions:].reshape(2, num_partitions, num_partitions)
+        self.mailboxes = {}
+        if create:
+            self.generations[:] = 0
+            for parity in range(2):
+                for partition in range(num_partitions):
+                    self.mailboxes[(parity, partition)] = \
+                        (0, shared_memory.SharedMemory(name=self.name(parity, partition, 0), create=True,
+                                                       size=mailbox_size))
+
+    def __getstate__(self):
+        return (self.num_partitions, self.mailbox_size, self.prefix)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def name(self, parity, partition, generation):
+        """ Get the name of a mailbox
+
+        Args:
+            parity (:obj:`int`): the parity of the steps in which the mailbox is written
+            partition (:obj:`int`): the index of the partition that writes the mailbox
+            generation (:obj:`int`): the mailbox's generation
+
+        Returns:
+            :obj:`str`: the name of the mailbox's shared memory block
+        """
+        return f'{self.prefix}_{parity}_{partition}_{generation}'
+
+    def get_mailbox(self, parity, partition):
+        """ Get the current generation of a mailbox, attaching to it if necessary
+
+        Args:
+            parity (:obj:`int`): the parity of the steps in which the mailbox is written
+            partition (:obj:`int`): the index of the partition that writes the mailbox
+
+        Returns:
+            :obj:`multiprocessing.shared_memory.SharedMemory`: the mailbox
+        """
+        generation = int(self.generations[parity, partition])
+        attached_generation, mailbox = self.mailboxes.get((parity, partition), (None, None))
+        if attached_generation != generation:
+            if mailbox is not None:
+                mailbox.close()
+            mailbox = shared_memory.SharedMemory(name=self.name(parity, partition, generation))
+            self.mailboxes[(parity, partition)] = (generation, mailbox)
+        return mailbox
+
+    def post(self, parity, partition, outboxes, next_time):
+        """ Write the events a partition sends in a step, and its next event time
+
+        Args:
+            parity (:obj:`int`): the parity of the step
+            partition (:obj:`int`): the index of the sending partition
+            outboxes (:obj:`list` of :obj:`list`): for each partition, the events sent to it, as
+                (send time, receive time, sending object name, receiving object name, event message) tuples
+            next_time (:obj:`float`): the time of the sending partition's next event
+        """
+        num_partitions = self.num_partitions
+        blobs = [pickle.dumps(events) if events else b'' for events in outboxes]
+        offsets = [8 * (num_partitions + 1)]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        mailbox = self.get_mailbox(parity, partition)
+        if mailbox.size < offsets[-1]:
+            # replace the mailbox with a larger one, which the other partitions attach to when they read it
+            generation = int(self.generations[parity, partition]) + 1
+            size = max(offsets[-1], 2 * mailbox.size)
+            mailbox.close()
+            mailbox = shared_memory.SharedMemory(name=self.name(parity, partition, generation), create=True,
+                                                 size=size)
+            self.mailboxes[(parity, partition)] = (generation, mailbox)
+            self.generations[parity, partition] = generation
+        buffer = mailbox.buf
+        struct.pack_into(f'{num_partitions + 1}q', buffer, 0, *offsets)
+        for blob, start, end in zip(blobs, offsets, offsets[1:]):
+            buffer[start:end] = blob
+        self.next_times[parity, partition] = next_time
+        self.sent_times[parity, partition] = [min(event[1] for event in events) if events else math.inf
+                                              for events in outboxes]
+
+    def get_next_times(self, parity):
+        """ Get the next event time of each partition in a step, including the events sent to it in the step
+
+        Args:
+            parity (:obj:`int`): the parity of the step
+
+        Returns:
+            :obj:`numpy.ndarray`: the next event time of each partition
+        """
+        return numpy.minimum(self.next_times[parity], self.sent_times[parity].min(axis=0))
+
+    def read(self, parity, sender, receiver):
+        """ Read the events one partition sent another in a step
+
+        Args:
+            parity (:obj:`int`): the parity of the step
+            sender (:obj:`int`): the index of the sending partition
+            receiver (:obj:`int`): the index of the receiving partition
+
+        Returns:
+            :obj:`list` of :obj:`tuple`: the events sent by `sender` to `receiver`
+        """
+        mailbox = self.get_mailbox(parity, sender)
+        start, end = struct.unpack_from('2q', mailbox.buf, 8 * receiver)
+        if start == end:
+            return []
+        return pickle.loads(mailbox.buf[start:end])
+
+    def close(self):
+        """ Detach from the mailboxes and the control block in this process """
+        for _, mailbox in self.mailboxes.values():
+            mailbox.close()
+        self.mailboxes = {}
+        # views of the control block must be released before it's closed
+        self.generations = self.next_times = self.sent_times = None
+        self.control.close()
+
+    def unlink(self):
+        """ Destroy all mailboxes and the control block, including the mailboxes created by other processes """
+        generations = self.generations.copy()
+        self.close()
+        for parity in range(2):
+            for partition in range(self.num_partitions):
+                for generation in range(generations[parity, partition] + 1):
+                    try:
+                        mailbox = shared_memory.SharedMemory(name=self.name(parity, partition, generation))
+                    except FileNotFoundError:    # pragma: no cover
+                        continue
+                    mailbox.close()
+                    mailbox.unlink()
+        self.control.unlink()
+
+
+class YawnsSimulator(ParallelSimulator):
+    """ A window-synchronous parallel simulator, which advances the partitions in steps separated by barriers
+
+    Each partition executes its objects' events in the order used by the sequential
+    :obj:`~de_sim.simulator.Simulator`, (event time, class priority, tiebreaker), and events that occur
+    simultaneously at an object are superposed, so a deterministic model produces the same results. However,
+    superposed events whose messages are equal may be provided in a different order.
+
+    The number of steps is about the simulated time divided by the lookahead, so YAWNS works best when the
+    lookahead is large relative to the time between events.
+
+    Attributes:
+        mailbox_size (:obj:`int`): the initial size of each partition's mailboxes, in bytes
+        barrier (:obj:`multiprocessing.Barrier`): during a simulation, the barrier at which each step begins
+        mailboxes (:obj:`SharedMailboxes`): during a simulation, the partitions' mailboxes
+    """
+
+    def __init__(self, build_model, num_partitions, partition, lookahead, get_results=None, mailbox_size=2 ** 16):
+        """
+        Args:
+            build_model (:obj:`callable`): a function that builds the model in a
+                :obj:`~de_sim.simulator.Simulator`
+            num_partitions (:obj:`int`): the number of partitions
+            partition (:obj:`dict` or :obj:`callable`): a map from each simulation object's name to the index of
+                its partition, or a function that provides the index of a simulation object's partition
+            lookahead (:obj:`float` or :obj:`dict`): the minimum delay of events sent between partitions
+            get_results (:obj:`callable`, optional): a function that obtains picklable results from a
+                partition's simulation objects
+            mailbox_size (:obj:`int`, optional): the initial size of each partition's mailboxes, in bytes
+
+        Raises:
+            :obj:`SimulatorError`: if `num_partitions` or `mailbox_size` is not positive
+        """
+        super().__init__(build_model, num_partitions, partition, lookahead, get_results=get_results)
+        if mailbox_size < 1:
+            raise SimulatorError(f"mailbox_size must be positive, but is {mailbox_size}")
+        self.mailbox_size = mailbox_size
+        self.barrier = None
+        self.mailboxes = None
+
+    def simulate(self, max_time, time_init=0.):
+        """ Run a parallel simulation
+
+        See :obj:`~de_sim.parallel.ParallelSimulator.simulate`.
+        """
+        self.barrier = multiprocessing.get_context().Barrier(self.num_partitions)
+        self.mailboxes = SharedMailboxes(self.num_partitions, self.mailbox_size)
+        try:
+            return super().simulate(max_time, time_init)
+        finally:
+            self.mailboxes.unlink()
+            self.barrier = self.mailboxes = None
+
+    def abort_partitions(self):
+        """ Release the other partitions from the barrier after a partition fails """
+        self.barrier.abort()
+
+    def simulate_partition(self, partition, max_time, time_init):
+        """ Simulate a partition, synchronizing it with the other partitions in steps
+
+        The partition's `stats` report the number of steps, `num_steps`.
+
+        Args:
+            partition (:obj:`~de_sim.parallel.Partition`): the partition
+            max_time (:obj:`float`): the maximum time of the end of the simulation
+            time_init (:obj:`float`): the simulation's initial time
+        """
+        index = partition.index
+        event_queue = partition.event_queue
+        mailboxes = self.mailboxes
+        others = [other for other in range(self.num_partitions) if other != index]
+        input_lookaheads = partition.lookaheads[:, index]
+        num_steps = 0
+        try:
+            while True:
+                parity = num_steps % 2
+                outboxes = [[event for event in event_queue.take_outbox(other) if event[1] <= max_time]
+                            for other in range(self.num_partitions)]
+                mailboxes.post(parity, index, outboxes, event_queue.next_event_time())
+                self.barrier.wait()
+
+                # every partition computes the same next event times, and so ends in the same step
+                next_times = mailboxes.get_next_times(parity)
+                if max_time < next_times.min():
+                    break
+                num_steps += 1
+                for sender in others:
+                    partition.receive_events(mailboxes.read(parity, sender, index))
+
+                # execute the events that occur before any events that other partitions may send in this step
+                window_end = min((next_times[other] + input_lookaheads[other] for other in others),
+                                 default=math.inf)
+                partition.execute_events(min(max_time, float(numpy.nextafter(window_end, -math.inf))))
+        finally:
+            mailboxes.close()
+        partition.stats['num_steps'] = num_steps
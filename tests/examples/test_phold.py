@@ -13,8 +13,9 @@ import sys
 import unittest
 import warnings
 
-from de_sim.examples.phold import RunPhold
+from de_sim.examples.phold import RunPhold, build_phold
 from de_sim.testing.utilities_for_testing import make_args
+import de_sim
 
 
 class TestPhold(unittest.TestCase):
@@ -36,6 +37,41 @@ class TestPhold(unittest.TestCase):
         num_events2 = self.run_phold(173, 10)
         self.assertNotEqual(num_events1, num_events2)
 
+    def test_parallel_phold(self):
+        args = RunPhold.parse_args('12 0.3 20 --seed 5 --lookahead 0.5 --num_partitions 3'.split())
+        self.assertEqual(args.lookahead, 0.5)
+        self.assertEqual(args.num_partitions, 3)
+        with CaptureOutput(relay=False):
+            num_events = RunPhold.main(args)
+
+        # the parallel simulation executes the same events as a sequential simulation of the same model
+        simulator = de_sim.Simulator()
+        build_phold(args, simulator)
+        simulator.initialize()
+        self.assertEqual(simulator.simulate(args.max_time).num_events, num_events)
+
+    def test_optimistic_phold(self):
+        args = RunPhold.parse_args('12 0.1 20 --seed 5 --num_partitions 3 --optimistic'.split())
+        self.assertTrue(args.optimistic)
+        with CaptureOutput(relay=False):
+            num_events = RunPhold.main(args)
+
+        simulator = de_sim.Simulator()
+        build_phold(args, simulator)
+        simulator.initialize()
+        self.assertEqual(simulator.simulate(args.max_time).num_events, num_events)
+
+    def test_synchronous_phold(self):
+        args = RunPhold.parse_args('12 0.3 20 --seed 5 --lookahead 0.5 --num_partitions 3 --synchronous'.split())
+        self.assertTrue(args.synchronous)
+        with CaptureOutput(relay=False):
+            num_events = RunPhold.main(args)
+
+        simulator = de_sim.Simulator()
+        build_phold(args, simulator)
+        simulator.initialize()
+        self.assertEqual(simulator.simulate(args.max_time).num_events, num_events)
+
     def test_phold_parse_args(self):
         num_procs = 3
         frac_self = 0.2
@@ -74,4 +110,15 @@ class TestPhold(unittest.TestCase):
                     args = make_args(arguments2, self.required, [])
                     with self.assertRaises(SystemExit):
                         RunPhold.parse_args(args)
+            options = ['lookahead', 'num_partitions']
+            for option_values in [dict(lookahead=-1), dict(num_partitions=0, lookahead=1),
+                                  dict(num_partitions=2)]:
+                args = make_args({**arguments, **option_values}, self.required, options)
+                with self.assertRaises(SystemExit):
+                    RunPhold.parse_args(args)
+            for cli_args in ['2 0.3 10 --optimistic', '2 0.3 10 --synchronous --lookahead 1',
+                             '2 0.3 10 -p 2 --synchronous',
+                             '2 0.3 10 -p 2 --lookahead 1 --synchronous --optimistic']:
+                with self.assertRaises(SystemExit):
+                    RunPhold.parse_args(cli_args.split())
             print('--- done testing RunPhold.parse_args() error handling ---', file=sys.stderr)
@@ -0,0 +1,196 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-12-01
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import functools
+import math
+import os
+import unittest
+
+from de_sim.critical_path import CausalityGraph, TraceRecord, TracingEventQueue
+from de_sim.errors import SimulatorError
+from de_sim.visualize import EventCoordinates, SimulationEventMessage
+from tests.test_parallel import build_passers
+import de_sim
+
+
+class Go(de_sim.EventMessage):
+    "Go"
+
+
+class Msg(de_sim.EventMessage):
+    "Msg"
+
+
+class Repeater(de_sim.SimulationObject):
+    """ Executes twice at time 0, sending an event to another object only in its first execution """
+
+    def __init__(self, name, receiver, **kwargs):
+        super().__init__(name, **kwargs)
+        self.receiver = receiver
+        self.num_executions = 0
+
+    def init_before_run(self):
+        self.send_event(0, self, Go())
+
+    def handle_go(self, event):
+        if not self.num_executions:
+            self.send_event(1, self.receiver, Msg())
+            self.send_event(0, self, Go())
+        self.num_executions += 1
+
+    event_handlers = [(Go, 'handle_go')]
+    messages_sent = [Go, Msg]
+
+
+class Receiver(de_sim.SimulationObject):
+
+    def handle_msg(self, event):
+        pass
+
+    event_handlers = [(Msg, 'handle_msg')]
+    messages_sent = []
+
+
+def record(sender, send_time, receiver, receive_time, wall_time):
+    return TraceRecord('Msg', EventCoordinates(sender, send_time), EventCoordinates(receiver, receive_time),
+                       wall_time)
+
+
+class TestCausalityGraph(unittest.TestCase):
+
+    def setUp(self):
+        # a sends events to b and c, which both send events to d, and to itself at time 3
+        self.graph = graph = CausalityGraph()
+        graph.add_trace([record('a', 0, 'a', 0, 1.),
+                         record('a', 0, 'b', 1, 2.),
+                         record('a', 0, 'c', 1, 3.),
+                         record('b', 1, 'd', 2, 0.5),
+                         record('c', 1, 'd', 2, 0.5),
+                         record('a', 0, 'a', 3, 1.)])
+
+    def test_add_trace(self):
+        graph = self.graph
+        self.assertEqual(graph.names, ['a', 'b', 'c', 'd', 'a'])
+        self.assertEqual(list(graph.work), [1., 2., 3., 1., 1.])
+        self.assertEqual(graph.predecessors, [(), (0,), (0,), (1, 2), (0,)])
+        self.assertEqual(list(graph.finish), [1., 3., 4., 5., 2.])
+
+    def test_critical_path(self):
+        graph = self.graph
+        self.assertEqual(graph.get_total_work(), 8.)
+        self.assertEqual(graph.get_critical_path_length(), 5.)
+        self.assertEqual(graph.get_max_speedup(), 1.6)
+        self.assertEqual(graph.get_critical_path(), [EventCoordinates('a', 0), EventCoordinates('c', 1),
+                                                     EventCoordinates('d', 2)])
+
+        empty_graph = CausalityGraph()
+        self.assertEqual(empty_graph.get_critical_path(), [])
+        self.assertTrue(math.isnan(empty_graph.get_max_speedup()))
+        self.assertEqual(empty_graph.get_parallelism_profile(), [])
+
+    def test_parallelism_profile(self):
+        profile = self.graph.get_parallelism_profile(num_bins=3)
+        self.assertEqual([(interval['start'], interval['end']) for interval in profile], [(0, 1), (1, 2), (2, 3)])
+        self.assertEqual([interval['num_executions'] for interval in profile], [1, 2, 2])
+        self.assertEqual([interval['work'] for interval in profile], [1., 5., 2.])
+        # dependencies on executions in earlier intervals are ignored
+        self.assertEqual([interval['critical_path_length'] for interval in profile], [1., 3., 1.])
+        self.assertEqual([interval['parallelism'] for interval in profile], [1., 5 / 3, 2.])
+
+        profile = self.graph.get_parallelism_profile(num_bins=6)
+        self.assertEqual([interval['num_executions'] for interval in profile], [1, 0, 2, 0, 1, 1])
+        self.assertTrue(math.isnan(profile[1]['parallelism']))
+
+        report = self.graph.report(num_bins=3)
+        self.assertIn('5 executions by 4 objects', report)
+        self.assertIn('critical path: 3 executions, length 5', report)
+        self.assertIn('maximum speedup: 1.60', report)
+
+        with self.assertRaisesRegex(SimulatorError, 'num_bins must be positive'):
+            self.graph.get_parallelism_profile(num_bins=0)
+
+    def test_read_plot_log(self):
+        plot_log = os.path.join(os.path.dirname(__file__), 'fixtures', 'example.de_sim.plot.log')
+        graph = CausalityGraph.read_plot_log(plot_log)
+        self.assertEqual(graph.predecessors, [(), (), (1,), (0, 2), (0, 2)])
+        self.assertEqual(graph.get_critical_path(), [EventCoordinates('obj_1', 0.384),
+                                                     EventCoordinates('obj_1', 0.863),
+                                                     EventCoordinates('obj_1', 1.159)])
+        self.assertEqual(graph.get_max_speedup(), 5 / 3)
+
+
+class TestTracingEventQueue(unittest.TestCase):
+
+    def trace(self, build_model, max_time, stop_condition=None):
+        simulator = de_sim.Simulator()
+        build_model(simulator)
+        event_queue = TracingEventQueue.install(simulator)
+        simulator.initialize()
+        num_executions = simulator.simulate(config_dict=dict(max_time=max_time,
+                                                             stop_condition=stop_condition)).num_events
+        return event_queue, num_executions
+
+    def test_trace(self):
+        num_objects = 6
+        event_queue, num_executions = self.trace(functools.partial(build_passers, num_objects, 1), 20)
+        trace = event_queue.trace
+        self.assertTrue(all(0 <= record.wall_time for record in trace))
+        self.assertTrue(all(record.receive_coordinates.time <= 20 for record in trace))
+        graph = event_queue.get_causality_graph()
+        self.assertEqual(len(graph.names), num_executions)
+        self.assertAlmostEqual(graph.get_total_work(), sum(record.wall_time for record in trace))
+        # each object's executions are sequential
+        self.assertTrue(1 <= graph.get_max_speedup() <= num_objects)
+
+        # a trace without wall times has the same dependencies
+        unit_work_graph = CausalityGraph()
+        unit_work_graph.add_trace([SimulationEventMessage(*record[:3]) for record in trace])
+        self.assertEqual(unit_work_graph.predecessors, graph.predecessors)
+        self.assertEqual(unit_work_graph.get_total_work(), len(trace))
+
+    def test_stop_condition(self):
+        event_queue, num_executions = self.trace(functools.partial(build_passers, 6, 1), 20,
+                                                 stop_condition=lambda time: 10 <= time)
+        graph = event_queue.get_causality_graph()
+        # the execution that was in progress when the stop condition ended the simulation is recorded
+        self.assertEqual(len(graph.names), num_executions)
+        self.assertEqual(event_queue.trace[-1].execution, num_executions - 1)
+
+    def test_sending_executions(self):
+
+        def build_model(simulator):
+            receiver = Receiver('receiver', simulator=simulator)
+            Repeater('repeater', receiver, simulator=simulator)
+
+        event_queue, num_executions = self.trace(build_model, 10)
+        self.assertEqual(num_executions, 3)
+        self.assertEqual([(record.sending_execution, record.execution) for record in event_queue.trace],
+                         [(None, 0), (0, 1), (0, 2)])
+        self.assertEqual(event_queue.sending_executions, {})
+        # the receiver's event is attributed to the repeater's first execution, which sent it
+        graph = event_queue.get_causality_graph()
+        self.assertEqual(graph.names, ['repeater', 'repeater', 'receiver'])
+        self.assertEqual(graph.predecessors, [(), (0,), (0,)])
+
+        # without execution indices, it's attributed to the repeater's latest execution at the send time
+        unit_work_graph = CausalityGraph()
+        unit_work_graph.add_trace([SimulationEventMessage(*record[:3]) for record in event_queue.trace])
+        self.assertEqual(unit_work_graph.names, ['repeater', 'receiver'])
+        self.assertEqual(unit_work_graph.predecessors, [(), (0,)])
+
+    def test_sequential_model(self):
+        event_queue, _ = self.trace(functools.partial(build_passers, 1, 0), 20)
+        unit_work_graph = CausalityGraph()
+        unit_work_graph.add_trace([SimulationEventMessage(*record[:3]) for record in event_queue.trace])
+        self.assertEqual(unit_work_graph.get_max_speedup(), 1.)
+
+    def test_install(self):
+        simulator = de_sim.Simulator()
+        build_passers(2, 0, simulator)
+        simulator.initialize()
+        with self.assertRaisesRegex(SimulatorError, 'a trace must be recorded before events are scheduled'):
+            TracingEventQueue.install(simulator)
@@ -0,0 +1,137 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-25
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import numpy
+import os
+import shutil
+import tempfile
+import unittest
+
+from de_sim.ensemble import EnsembleRun, parameter_grid, run_ensemble, run_seed
+from de_sim.errors import SimulatorError
+from de_sim.examples.sirs import SIR
+from de_sim.simulation_metadata import SimulationMetadata
+from de_sim.simulator import Simulator
+from de_sim.trace import EventTrace
+
+
+def build_sir(simulator, params, seed):
+    sir = SIR('sir', s=98, i=2, N=100, beta=params.get('beta', 0.3), gamma=params.get('gamma', 0.15),
+              recording_period=10)
+    sir.random_state = numpy.random.RandomState(seed)
+    simulator.add_object(sir)
+
+
+def get_sir_state(simulator):
+    sir = simulator.get_object('sir')
+    return (sir.s, sir.i)
+
+
+class TestEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_parameter_grid(self):
+        self.assertEqual(parameter_grid({'a': [1, 2], 'b': ['x', 'y']}),
+                         [{'a': 1, 'b': 'x'}, {'a': 1, 'b': 'y'}, {'a': 2, 'b': 'x'}, {'a': 2, 'b': 'y'}])
+        self.assertEqual(parameter_grid({}), [{}])
+
+    def test_run_seed(self):
+        self.assertEqual(run_seed(7, 3), run_seed(7, 3))
+        seeds = {run_seed(7, index) for index in range(100)}
+        self.assertEqual(len(seeds), 100)
+        self.assertNotEqual(run_seed(7, 0), run_seed(8, 0))
+
+    def test_run_ensemble(self):
+        params = parameter_grid({'beta': [0.3, 0.5], 'gamma': [0.1, 0.15]})
+        num_replicates = 3
+        kwargs = dict(max_time=20, params=params, num_replicates=num_replicates, base_seed=17,
+                      get_results=get_sir_state)
+
+        serial_runs = list(run_ensemble(build_sir, max_workers=0, **kwargs))
+        self.assertEqual([run.index for run in serial_runs], list(range(len(params) * num_replicates)))
+        for run in serial_runs:
+            self.assertTrue(isinstance(run, EnsembleRun))
+            self.assertEqual(run.params, params[run.index // num_replicates])
+            self.assertEqual(run.seed, run_seed(17, run.index))
+            self.assertTrue(0 < run.return_value.num_events)
+            self.assertEqual(run.return_value.profile_stats, None)
+            self.assertTrue(isinstance(run.sim_metadata, SimulationMetadata))
+            self.assertEqual(run.sim_metadata.simulation_config.max_time, 20)
+
+            # the run matches a sequential simulation
+            sir = SIR('sir', s=98, i=2, N=100, recording_period=10, **run.params)
+            sir.random_state = numpy.random.RandomState(run.seed)
+            simulator = Simulator()
+            simulator.add_object(sir)
+            simulator.initialize()
+            self.assertEqual(simulator.simulate(20).num_events, run.return_value.num_events)
+            self.assertEqual(run.results, (sir.s, sir.i))
+
+        # results do not depend on the number of workers or the chunk size
+        for max_workers, chunksize, max_pending in [(1, 1, None), (2, 1, 1), (3, 4, None)]:
+            runs = run_ensemble(build_sir, max_workers=max_workers, chunksize=chunksize,
+                                max_pending=max_pending, **kwargs)
+            runs = sorted(runs, key=lambda run: run.index)
+            self.assertEqual([(run.index, run.params, run.seed, run.return_value, run.results) for run in runs],
+                             [(run.index, run.params, run.seed, run.return_value, run.results)
+                              for run in serial_runs])
+
+    def test_run_ensemble_seeds(self):
+        seeds = [5, 6]
+        runs = list(run_ensemble(build_sir, max_time=10, params=parameter_grid({'beta': [0.3, 0.4]}),
+                                 seeds=seeds, max_workers=2))
+        self.assertEqual(len(runs), 4)
+        self.assertEqual(sorted((run.params['beta'], run.seed) for run in runs),
+                         [(0.3, 5), (0.3, 6), (0.4, 5), (0.4, 6)])
+
+        # with a random base seed, the seeds used are reported
+        runs = list(run_ensemble(build_sir, max_time=10, num_replicates=2, max_workers=0))
+        self.assertEqual([run.params for run in runs], [{}, {}])
+        self.assertNotEqual(runs[0].seed, runs[1].seed)
+
+    def test_run_ensemble_output_dir(self):
+        runs = list(run_ensemble(build_sir, num_replicates=2, max_workers=2, base_seed=1,
+                                 config_dict=dict(max_time=10, output_dir=self.tmp_dir)))
+        for run in runs:
+            run_dir = os.path.join(self.tmp_dir, str(run.index))
+            self.assertEqual(run.sim_metadata.simulation_config.output_dir, run_dir)
+            self.assertTrue(os.path.isfile(SimulationMetadata.get_pathname(run_dir)))
+
+    def test_run_ensemble_trace_file(self):
+        trace_file = os.path.join(self.tmp_dir, 'trace.bin')
+        runs = list(run_ensemble(build_sir, num_replicates=2, max_workers=2, base_seed=1,
+                                 config_dict=dict(max_time=10, trace_file=trace_file)))
+        for run in runs:
+            run_trace_file = os.path.join(self.tmp_dir, f'trace.{run.index}.bin')
+            self.assertEqual(run.sim_metadata.simulation_config.trace_file, run_trace_file)
+            self.assertEqual(len(EventTrace(run_trace_file)), run.return_value.num_events)
+        self.assertFalse(os.path.exists(trace_file))
+
+    def test_run_ensemble_exceptions(self):
+        with self.assertRaisesRegex(SimulatorError, 'max_time must be provided'):
+            run_ensemble(build_sir)
+        with self.assertRaisesRegex(SimulatorError, 'max_time cannot be provided in both'):
+            run_ensemble(build_sir, max_time=3, config_dict=dict(max_time=3))
+        with self.assertRaisesRegex(SimulatorError, 'seeds and base_seed cannot both be provided'):
+            run_ensemble(build_sir, max_time=3, seeds=[1], base_seed=2)
+        with self.assertRaisesRegex(SimulatorError, 'num_replicates must be positive'):
+            run_ensemble(build_sir, max_time=3, num_replicates=0)
+        with self.assertRaisesRegex(SimulatorError, 'max_workers must be non-negative'):
+            run_ensemble(build_sir, max_time=3, max_workers=-1)
+        with self.assertRaisesRegex(SimulatorError, 'chunksize must be positive'):
+            run_ensemble(build_sir, max_time=3, chunksize=0)
+        with self.assertRaisesRegex(SimulatorError, 'max_pending must be positive'):
+            run_ensemble(build_sir, max_time=3, max_workers=2, max_pending=0)
+
+        # errors in runs are raised by the generator
+        with self.assertRaisesRegex(SimulatorError, 'max_time .* must be greater than time_init'):
+            list(run_ensemble(build_sir, config_dict=dict(max_time=1, time_init=2), max_workers=1))
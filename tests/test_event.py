@@ -7,6 +7,8 @@
 
 import unittest
 
+from de_sim.errors import SimulatorError
+from de_sim.event import EventPool
 from de_sim.simulation_object import (SimulationObjMeta, SimObjClassPriority)
 from de_sim.testing.example_simulation_objects import ExampleSimulationObject
 from de_sim.testing.some_message_types import InitMsg, Eg1, MsgWithAttrs
@@ -39,6 +41,11 @@ class TestEvent(unittest.TestCase):
                          (event_time, getattr(ExampleSimulationObject, class_priority_attr),
                           self.sim_obj_a.event_time_tiebreaker))
 
+    def test_get_order_time_with_event_rank(self):
+        self.sim_obj_a.event_rank = 3
+        e = de_sim.Event(0, 2, self.sim_obj_b, self.sim_obj_a, InitMsg())
+        self.assertEqual(e._get_order_time(), (2, 3))
+
     def test_event_inequalities(self):
 
         # test Events with different event times
@@ -132,3 +139,61 @@ class TestEvent(unittest.TestCase):
                     NoBodyMessage())
         self.assertIn('\t'.join(de_sim.Event.BASE_HEADERS), ev2.custom_header())
         # self.assertIn('\t'.join([str(t) for t in times]), str(ev2))
+
+
+class TestEventPool(unittest.TestCase):
+
+    def setUp(self):
+        self.sim_obj_a = ExampleSimulationObject('a')
+        self.sim_obj_b = ExampleSimulationObject('b')
+
+    def test_recycling(self):
+        event_pool = EventPool()
+        events = [event_pool.get(0, t, self.sim_obj_a, self.sim_obj_b, InitMsg()) for t in range(3)]
+        self.assertEqual(event_pool.num_allocated, 3)
+        retained = events[0]
+        event_pool.release(events)
+        self.assertEqual(event_pool.num_retained, 1)
+        self.assertEqual(len(event_pool.free), 2)
+        self.assertEqual(retained.event_time, 0)
+        recycled = event_pool.free[-1]
+        self.assertEqual(recycled.message, None)
+        del events
+
+        msg = Eg1()
+        event = event_pool.get(1, 2, self.sim_obj_b, self.sim_obj_a, msg)
+        self.assertIs(event, recycled)
+        self.assertEqual((event.creation_time, event.event_time, event.sending_object, event.receiving_object,
+                          event.message, event.live), (1, 2, self.sim_obj_b, self.sim_obj_a, msg, True))
+        self.assertEqual(event._order_time, event._get_order_time())
+        self.assertEqual(event_pool.num_reused, 1)
+
+    def test_referenced_events_are_not_reused(self):
+        event_pool = EventPool()
+        events = [event_pool.get(0, t, self.sim_obj_a, self.sim_obj_b, InitMsg()) for t in range(6)]
+        # reference some events from a local variable, a container and an object's attribute
+        local_event = events[0]
+        held_events = {'event': events[1]}
+        self.sim_obj_a.held_event = events[2]
+        event_pool.release(events)
+        self.assertEqual(event_pool.num_retained, 3)
+        referenced = [local_event, held_events['event'], self.sim_obj_a.held_event]
+        del events
+
+        new_events = [event_pool.get(1, 2, self.sim_obj_b, self.sim_obj_a, Eg1()) for _ in range(6)]
+        self.assertEqual(event_pool.num_reused, 3)
+        for event in referenced:
+            self.assertFalse(any(event is new_event for new_event in new_events))
+            self.assertEqual((event.sending_object, event.receiving_object), (self.sim_obj_a, self.sim_obj_b))
+            self.assertIsInstance(event.message, InitMsg)
+        del self.sim_obj_a.held_event
+
+    def test_strict(self):
+        event_pool = EventPool(strict=True)
+        events = [event_pool.get(0, 1, self.sim_obj_a, self.sim_obj_b, InitMsg())]
+        retained = events[0]
+        with self.assertRaisesRegex(SimulatorError, "event at time 1 to 'b' is still referenced"):
+            event_pool.release(events)
+        del retained
+        event_pool.release(events)
+        self.assertEqual(len(event_pool.free), 1)
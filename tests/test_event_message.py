@@ -5,6 +5,8 @@
 :License: MIT
 """
 
+import copy
+import pickle
 import unittest
 import warnings
 
@@ -136,3 +138,115 @@ class TestEventMessageMeta(unittest.TestCase):
                 "Docstring"
                 unit_price: float = 10.0
                 quantity_on_hand: int
+
+    def test_generated_init(self):
+
+        class ExampleEventMessage(de_sim.EventMessage):
+            'My docstring'
+            unit_price: float
+            name: str = 'hi'
+            quantity_on_hand: int = 0
+
+        eem = ExampleEventMessage(2.2)
+        self.assertEqual(eem._values(), [2.2, 'hi', 0])
+        eem = ExampleEventMessage(2.2, 'bye')
+        self.assertEqual(eem._values(), [2.2, 'bye', 0])
+        eem = ExampleEventMessage(quantity_on_hand=5, unit_price=1.5)
+        self.assertEqual(eem._values(), [1.5, 'hi', 5])
+        self.assertEqual(ExampleEventMessage.__init__.__qualname__, 'ExampleEventMessage.__init__')
+
+        with self.assertRaisesRegex(SimulatorError,
+                                    "Constructor .*'ExampleEventMessage' expects 1 to 3 arg.*but 0 provided"):
+            ExampleEventMessage()
+        with self.assertRaisesRegex(SimulatorError,
+                                    "Constructor .*'ExampleEventMessage' expects 1 to 3 arg.*but 4 provided"):
+            ExampleEventMessage(1.0, 'x', 2, 3)
+        with self.assertRaisesRegex(SimulatorError,
+                                    "Constructor .*'ExampleEventMessage1' expects 2 arg.*but 1 provided"):
+            ExampleEventMessage1('x')
+        with self.assertRaisesRegex(SimulatorError,
+                                    "Constructor .*'ExampleEventMessage2' expects 0 arg.*but 1 provided"):
+            ExampleEventMessage2(1)
+
+    def test_generated_eq_and_hash(self):
+        # messages that aren't frozen are equal only to themselves, and hashed by identity
+        msg = ExampleEventMessage1('a', [])
+        self.assertEqual(msg, msg)
+        self.assertNotEqual(ExampleEventMessage1('a', 1), ExampleEventMessage1('a', 1))
+        self.assertNotEqual(ExampleEventMessage2(), ExampleEventMessage2())
+        self.assertEqual(len({msg, msg, ExampleEventMessage1('a', []), ExampleEventMessage2()}), 3)
+        self.assertEqual({msg: 1}[msg], 1)
+
+        class FrozenEventMessage(de_sim.EventMessage, frozen=True):
+            "Docstring"
+            attr1: str
+            attr2: object = None
+
+        class OtherFrozenEventMessage(de_sim.EventMessage, frozen=True):
+            "Docstring"
+
+        self.assertEqual(FrozenEventMessage('a', 1), FrozenEventMessage('a', 1))
+        self.assertNotEqual(FrozenEventMessage('a', 1), FrozenEventMessage('a', 2))
+        self.assertNotEqual(FrozenEventMessage('a'), OtherFrozenEventMessage())
+        self.assertNotEqual(OtherFrozenEventMessage(), 'not a message')
+        self.assertEqual(len({FrozenEventMessage('a', 1), FrozenEventMessage('a', 1),
+                              FrozenEventMessage('a', 2), FrozenEventMessage('b')}), 3)
+        with self.assertRaises(TypeError):
+            hash(FrozenEventMessage('a', []))
+
+    def test_methods_defined_by_subclass(self):
+
+        class ReverseOrderMessage(de_sim.EventMessage):
+            "Docstring"
+            value: int
+
+            def __lt__(self, other):
+                return other.value < self.value
+
+            def __eq__(self, other):
+                return self.value == other.value
+
+        self.assertTrue(ReverseOrderMessage(2) < ReverseOrderMessage(1))
+        self.assertTrue(ReverseOrderMessage(1) > ReverseOrderMessage(2))
+        self.assertEqual(ReverseOrderMessage(1), ReverseOrderMessage(1))
+        # like other classes that define __eq__ but not __hash__, ReverseOrderMessage is not hashable
+        with self.assertRaises(TypeError):
+            hash(ReverseOrderMessage(1))
+
+    def test_pickle(self):
+        self.assertEqual(ExampleEventMessage1.__module__, __name__)
+        for msg in [ExampleEventMessage1('a', 1), ExampleEventMessage3()]:
+            msg_copy = pickle.loads(pickle.dumps(msg))
+            self.assertEqual((msg_copy.__class__, msg_copy._values()), (msg.__class__, msg._values()))
+
+    def test_frozen(self):
+
+        class FrozenEventMessage(de_sim.EventMessage, frozen=True):
+            "Docstring"
+            value: int
+            items: list = []
+
+        class DerivedFrozenEventMessage(FrozenEventMessage):
+            "Docstring"
+            name: str
+
+        self.assertFalse(ExampleEventMessage1._frozen)
+        for frozen_msg in [FrozenEventMessage(1, [2]), DerivedFrozenEventMessage('x')]:
+            self.assertTrue(frozen_msg._frozen)
+            attr = frozen_msg.attrs()[0]
+            with self.assertRaisesRegex(SimulatorError, f"cannot assign to field '{attr}' of frozen EventMessage"):
+                setattr(frozen_msg, attr, 3)
+            with self.assertRaisesRegex(SimulatorError, f"cannot delete field '{attr}' of frozen EventMessage"):
+                delattr(frozen_msg, attr)
+
+        frozen_msg = FrozenEventMessage(1, [2])
+        self.assertEqual(frozen_msg._values(), [1, [2]])
+        self.assertEqual(frozen_msg, FrozenEventMessage(1, [2]))
+        self.assertTrue(FrozenEventMessage(1) < frozen_msg)
+        msg_copy = copy.deepcopy(frozen_msg)
+        self.assertEqual(msg_copy, frozen_msg)
+        self.assertIsNot(msg_copy.items, frozen_msg.items)
+
+        with self.assertRaisesRegex(SimulatorError, "'UnfrozenEventMessage' cannot be unfrozen"):
+            class UnfrozenEventMessage(FrozenEventMessage, frozen=False):
+                "Docstring"
@@ -0,0 +1,147 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-02
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import random
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.event_queue_backends import (EVENT_QUEUE_BACKENDS, HeapEventQueue, CalendarEventQueue,
+                                         LadderEventQueue, TwoLevelEventQueue)
+from de_sim.testing.example_simulation_objects import ExampleSimulationObject
+from de_sim.testing.some_message_types import InitMsg
+import de_sim
+
+
+class TestEventQueueBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.sim_objs = [ExampleSimulationObject(name) for name in 'abcde']
+        self.sender = self.sim_objs[0]
+
+    def make_event(self, event_time, receiver=None):
+        if receiver is None:
+            receiver = random.choice(self.sim_objs)
+        return de_sim.Event(0, event_time, self.sender, receiver, InitMsg())
+
+    def check_same_order(self, backends, num_ops, make_event_time):
+        now = 0
+        for _ in range(num_ops):
+            if random.random() < 0.55 or not len(backends[0]):
+                event = self.make_event(make_event_time(now))
+                for backend in backends:
+                    backend.schedule(event)
+            else:
+                peeked = [backend.peek() for backend in backends]
+                popped = [backend.pop() for backend in backends]
+                for event in peeked + popped:
+                    self.assertEqual(event._order_time, popped[0]._order_time)
+                if popped[0].event_time < float('inf'):
+                    now = max(now, popped[0].event_time)
+            self.assertEqual(len(set(len(backend) for backend in backends)), 1)
+
+        # iteration provides all events
+        order_times = sorted(event._order_time for event in backends[0])
+        for backend in backends[1:]:
+            self.assertEqual(sorted(event._order_time for event in backend), order_times)
+
+        while len(backends[0]):
+            popped = [backend.pop() for backend in backends]
+            for event in popped:
+                self.assertEqual(event._order_time, popped[0]._order_time)
+        for backend in backends:
+            self.assertEqual(backend.peek(), None)
+
+    def test_identical_ordering(self):
+        random.seed(17)
+        event_time_generators = [
+            # exponentially distributed increments
+            lambda now: now + random.expovariate(1.0),
+            # many simultaneous events
+            lambda now: now + random.choice([0, 0.5, 1, 2]),
+            # events scheduled before the earliest event
+            lambda now: random.uniform(0, 100),
+            # skewed increments, with some infinite times
+            lambda now: now + random.expovariate(1.0) ** 4 if random.random() < 0.99 else float('inf'),
+        ]
+        for make_event_time in event_time_generators:
+            backends = [HeapEventQueue(), CalendarEventQueue(), LadderEventQueue(), TwoLevelEventQueue()]
+            self.check_same_order(backends, 3000, make_event_time)
+
+    def test_clear(self):
+        for backend_class in EVENT_QUEUE_BACKENDS.values():
+            backend = backend_class()
+            for i in range(100):
+                backend.schedule(self.make_event(i / 3))
+            self.assertEqual(len(backend), 100)
+            backend.clear()
+            self.assertEqual(len(backend), 0)
+            self.assertEqual(list(backend), [])
+            self.assertEqual(backend.peek(), None)
+            with self.assertRaises(IndexError):
+                backend.pop()
+
+    def test_retain(self):
+        for backend_class in EVENT_QUEUE_BACKENDS.values():
+            backend = backend_class()
+            for i in range(100):
+                backend.schedule(self.make_event(i / 3))
+            backend.retain(lambda event: event.event_time < 10)
+            self.assertEqual(len(backend), 30)
+            popped = [backend.pop().event_time for _ in range(30)]
+            self.assertEqual(popped, [i / 3 for i in range(30)])
+
+    def test_events_for(self):
+        for backend_class in EVENT_QUEUE_BACKENDS.values():
+            backend = backend_class()
+            events = [self.make_event(i) for i in range(50)]
+            for event in events:
+                backend.schedule(event)
+            for sim_obj in self.sim_objs:
+                self.assertEqual(sorted(backend.events_for(sim_obj)),
+                                 sorted(event for event in events if event.receiving_object is sim_obj))
+            self.assertEqual(backend.events_for(ExampleSimulationObject('other')), [])
+
+    def test_two_level_queue(self):
+        two_level_queue = TwoLevelEventQueue()
+        receiver = self.sim_objs[1]
+        late_event = self.make_event(3, receiver=receiver)
+        two_level_queue.schedule(late_event)
+        # an earlier event makes late_event's entry in the global heap stale
+        for event_time in [2, 1, 1]:
+            two_level_queue.schedule(self.make_event(event_time, receiver=receiver))
+        self.assertEqual(len(two_level_queue.global_heap), 3)
+        two_level_queue.schedule(self.make_event(1, receiver=self.sim_objs[2]))
+
+        # superposed events at one receiver are popped together
+        events = two_level_queue.pop_batch()
+        self.assertEqual([(event.event_time, event.receiving_object) for event in events],
+                         [(1, receiver), (1, receiver)])
+        self.assertEqual(two_level_queue.pop().receiving_object, self.sim_objs[2])
+        self.assertEqual(two_level_queue.pop().event_time, 2)
+        self.assertIs(two_level_queue.peek(), late_event)
+        self.assertIs(two_level_queue.pop(), late_event)
+        self.assertEqual(len(two_level_queue), 0)
+        self.assertEqual(two_level_queue.peek(), None)
+        with self.assertRaises(IndexError):
+            two_level_queue.pop_batch()
+
+    def test_ladder_queue_rungs(self):
+        # spawn multiple rungs by scheduling many events in a narrow time range
+        ladder_queue = LadderEventQueue()
+        heap = HeapEventQueue()
+        for i in range(2000):
+            event = self.make_event(random.choice([random.uniform(0, 1), random.uniform(0, 1E-3), 1E6]))
+            ladder_queue.schedule(event)
+            heap.schedule(event)
+        ladder_queue.peek()
+        self.assertTrue(1 < len(ladder_queue.ladder))
+        self.check_same_order([heap, ladder_queue], 2000, lambda now: now + random.uniform(0, 1E-3))
+
+    def test_calendar_queue_exceptions(self):
+        for width in [0, -1, float('inf')]:
+            with self.assertRaisesRegex(SimulatorError, 'must be positive and finite'):
+                CalendarEventQueue(width=width)
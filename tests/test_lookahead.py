@@ -0,0 +1,94 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-30
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import functools
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.lookahead import DelayRecordingEventQueue
+from de_sim.parallel import ConservativeSimulator
+from tests.test_parallel import (DeclaredTokenPasser, HighPriorityTokenPasser, Token, TokenPasser,
+                                 build_passers, passer_partition)
+import de_sim
+
+
+class Multicaster(TokenPasser):
+    """ A :obj:`TokenPasser` that also multicasts tokens to all passers """
+
+    def init_before_run(self):
+        super().init_before_run()
+        passers = [sim_obj for sim_obj in self.simulator.simulation_objects.values() if sim_obj is not self]
+        self.send_event_multicast(0.5, passers, Token(self.name, 0))
+        self.send_events([(3, passers[0], Token(self.name, 0))])
+
+
+class TestDelayRecordingEventQueue(unittest.TestCase):
+
+    def record(self, build_model, max_time):
+        simulator = de_sim.Simulator()
+        build_model(simulator)
+        event_queue = DelayRecordingEventQueue.install(simulator)
+        simulator.initialize()
+        num_events = simulator.simulate(max_time).num_events
+        return event_queue, num_events
+
+    def test_record(self):
+        event_queue, _ = self.record(functools.partial(build_passers, 6, 1, min_delay=2), 30)
+        routes = {(TokenPasser, TokenPasser, Token), (TokenPasser, HighPriorityTokenPasser, Token),
+                  (HighPriorityTokenPasser, TokenPasser, Token),
+                  (HighPriorityTokenPasser, HighPriorityTokenPasser, Token)}
+        self.assertEqual(set(event_queue.min_delays), routes)
+        self.assertEqual(set(event_queue.num_events), routes)
+        # initial events are sent with delays of 0, 1 or 2, and other events with delays of at least 2
+        self.assertEqual(min(event_queue.min_delays.values()), 0)
+        self.assertTrue(0 < min(event_queue.num_events.values()))
+
+        self.assertEqual(event_queue.get_min_delays(),
+                         {sender_class: {Token: min(delay for route, delay in event_queue.min_delays.items()
+                                                    if route[0] is sender_class)}
+                          for sender_class in [TokenPasser, HighPriorityTokenPasser]})
+        self.assertEqual(event_queue.get_lookahead(),
+                         {route[:2]: delay for route, delay in event_queue.min_delays.items()})
+
+    def test_bulk_sends(self):
+        def build_model(simulator):
+            build_passers(3, 4, simulator)
+            Multicaster('multicaster', 4, 4, simulator=simulator)
+
+        event_queue, _ = self.record(build_model, 10)
+        self.assertEqual(event_queue.min_delays[(Multicaster, TokenPasser, Token)], 0.5)
+        self.assertEqual(event_queue.min_delays[(Multicaster, HighPriorityTokenPasser, Token)], 0.5)
+        # passer_0 receives the multicast, the event sent by send_events(), and tokens passed by the multicaster
+        self.assertTrue(2 <= event_queue.num_events[(Multicaster, HighPriorityTokenPasser, Token)])
+
+    def test_lookahead_for_parallel_simulation(self):
+        def build_model(simulator):
+            for index in range(6):
+                DeclaredTokenPasser(f'passer_{index}', 6, 3, simulator=simulator)
+
+        event_queue, num_events = self.record(build_model, 20)
+        self.assertEqual(event_queue.get_min_delays(), {DeclaredTokenPasser: {Token: 1}})
+        self.assertEqual(event_queue.check_min_delays(), [])
+        simulator = ConservativeSimulator(build_model, 2, functools.partial(passer_partition, 2),
+                                          event_queue.get_lookahead())
+        self.assertEqual(simulator.simulate(20).num_events, num_events)
+
+    def test_check_min_delays(self):
+        class TrustedPasser(DeclaredTokenPasser):
+            def init_before_run(self):
+                self.trusted_sends = True
+                self.send_event(0.5, self, Token(self.name, 0))
+
+        event_queue, _ = self.record(lambda simulator: TrustedPasser('passer_0', 1, 0, simulator=simulator), 0.7)
+        self.assertEqual(event_queue.check_min_delays(), [(TrustedPasser, TrustedPasser, Token, 0.5, 1)])
+
+    def test_install(self):
+        simulator = de_sim.Simulator()
+        build_passers(2, 0, simulator)
+        simulator.initialize()
+        with self.assertRaisesRegex(SimulatorError, 'event delays must be recorded before events are scheduled'):
+            DelayRecordingEventQueue.install(simulator)
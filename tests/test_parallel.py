@@ -0,0 +1,198 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-27
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import functools
+import random
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.parallel import ConservativeSimulator, can_send, get_declared_lookahead, get_lookahead
+from de_sim.testing.some_message_types import InitMsg
+import de_sim
+
+
+class Token(de_sim.EventMessage):
+    "A token passed between objects"
+    sender: str
+    hops: int
+
+
+class TokenPasser(de_sim.SimulationObject):
+    """ Pass tokens to randomly selected objects, with integer delays, so that many events are simultaneous """
+
+    def __init__(self, name, num_objects, seed, min_delay=1, simulator=None):
+        self.num_objects = num_objects
+        self.min_delay = min_delay
+        self.rng = random.Random(f'{seed}:{name}')
+        self.history = []
+        super().__init__(name, simulator=simulator)
+
+    def init_before_run(self):
+        self.send_event(self.rng.randint(0, 2), self, Token(self.name, 0))
+
+    def handle_tokens(self, event_or_events):
+        events = event_or_events if isinstance(event_or_events, list) else [event_or_events]
+        self.history.append((self.time, [(event.message.sender, event.message.hops) for event in events]))
+        for event in events:
+            receiver = self.simulator.simulation_objects[f'passer_{self.rng.randrange(self.num_objects)}']
+            self.send_event(self.min_delay + self.rng.randint(0, 2), receiver,
+                            Token(self.name, event.message.hops + 1))
+
+    event_handlers = [(Token, 'handle_tokens')]
+    messages_sent = [Token]
+
+
+class HighPriorityTokenPasser(TokenPasser):
+    """ A :obj:`TokenPasser` whose events execute before those of other passers at the same time """
+    class_priority = de_sim.simulation_object.SimObjClassPriority.HIGH
+
+
+class DeclaredTokenPasser(TokenPasser):
+    """ A :obj:`TokenPasser` that declares the minimum delay of its tokens """
+
+    def init_before_run(self):
+        self.send_event(1 + self.rng.randint(0, 2), self, Token(self.name, 0))
+
+    min_delays = {Token: 1}
+
+
+def build_declared_passers(num_objects, seed, simulator):
+    for index in range(num_objects):
+        DeclaredTokenPasser(f'passer_{index}', num_objects, seed, simulator=simulator)
+
+
+def build_passers(num_objects, seed, simulator, min_delay=1):
+    for index in range(num_objects):
+        cls = HighPriorityTokenPasser if index % 3 == 0 else TokenPasser
+        cls(f'passer_{index}', num_objects, seed, min_delay=min_delay, simulator=simulator)
+
+
+def passer_partition(num_partitions, sim_obj):
+    return int(sim_obj.name.split('_')[1]) % num_partitions
+
+
+def get_histories(simulation_objects):
+    return {sim_obj.name: sim_obj.history for sim_obj in simulation_objects}
+
+
+class Canceller(de_sim.SimulationObject):
+    """ Try to cancel an event sent to another partition """
+
+    def init_before_run(self):
+        self.send_event(0, self, InitMsg())
+
+    def handle_init(self, event):
+        remote_event = self.send_event(2, self.simulator.simulation_objects['passer_1'], Token(self.name, 0))
+        self.cancel_event(remote_event)
+
+    event_handlers = [(InitMsg, 'handle_init')]
+    messages_sent = [InitMsg, Token]
+
+
+def build_canceller(simulator):
+    build_passers(2, 0, simulator)
+    Canceller('canceller', simulator=simulator)
+
+
+class TestConservativeSimulator(unittest.TestCase):
+
+    def simulate_sequentially(self, num_objects, seed, max_time, min_delay=1):
+        simulator = de_sim.Simulator()
+        build_passers(num_objects, seed, simulator, min_delay=min_delay)
+        simulator.initialize()
+        num_events = simulator.simulate(max_time).num_events
+        return num_events, get_histories(simulator.simulation_objects.values())
+
+    def test_get_lookahead(self):
+        self.assertEqual(get_lookahead(2, TokenPasser, Canceller), 2)
+        lookahead = {TokenPasser: 1, (TokenPasser, Canceller): 3}
+        self.assertEqual(get_lookahead(lookahead, TokenPasser, TokenPasser), 1)
+        self.assertEqual(get_lookahead(lookahead, TokenPasser, Canceller), 3)
+        with self.assertRaisesRegex(SimulatorError, "no lookahead provided for events sent by 'Canceller'"):
+            get_lookahead(lookahead, Canceller, TokenPasser)
+        with self.assertRaisesRegex(SimulatorError, "lookahead .* must be positive"):
+            get_lookahead(0, TokenPasser, TokenPasser)
+
+        # lookaheads default to the classes' declarations
+        self.assertEqual(get_lookahead({}, DeclaredTokenPasser, TokenPasser), 1)
+        self.assertEqual(get_lookahead({DeclaredTokenPasser: 2}, DeclaredTokenPasser, TokenPasser), 2)
+        with self.assertRaisesRegex(SimulatorError, "'TokenPasser' does not declare the minimum delays"):
+            get_lookahead({}, TokenPasser, DeclaredTokenPasser)
+
+    def test_get_declared_lookahead(self):
+        self.assertEqual(get_declared_lookahead(DeclaredTokenPasser, TokenPasser), 1)
+        self.assertIsNone(get_declared_lookahead(TokenPasser, TokenPasser))
+        self.assertIsNone(get_declared_lookahead(DeclaredTokenPasser, Canceller))
+
+    def test_can_send(self):
+        self.assertTrue(can_send(TokenPasser, HighPriorityTokenPasser))
+        self.assertTrue(can_send(Canceller, TokenPasser))
+        self.assertFalse(can_send(TokenPasser, Canceller))
+
+    def test_matches_sequential_simulation(self):
+        num_objects, seed, max_time = 12, 7, 40
+        num_events, histories = self.simulate_sequentially(num_objects, seed, max_time)
+        # simultaneous events are superposed
+        self.assertTrue(any(1 < len(tokens) for history in histories.values() for _, tokens in history))
+
+        for num_partitions in [1, 2, 3]:
+            with self.subTest(num_partitions=num_partitions):
+                simulator = ConservativeSimulator(functools.partial(build_passers, num_objects, seed),
+                                                  num_partitions,
+                                                  functools.partial(passer_partition, num_partitions), 1,
+                                                  get_results=get_histories)
+                self.assertEqual(simulator.simulate(max_time).num_events, num_events)
+                self.assertEqual(sum(simulator.partition_num_events), num_events)
+                parallel_histories = {}
+                for results in simulator.results:
+                    parallel_histories.update(results)
+                self.assertEqual(parallel_histories, histories)
+
+    def test_declared_lookaheads(self):
+        num_objects, seed, max_time = 8, 2, 30
+        simulator = de_sim.Simulator()
+        build_declared_passers(num_objects, seed, simulator)
+        simulator.initialize()
+        num_events = simulator.simulate(max_time).num_events
+        simulator = ConservativeSimulator(functools.partial(build_declared_passers, num_objects, seed), 2,
+                                          functools.partial(passer_partition, 2), {})
+        self.assertEqual(simulator.simulate(max_time).num_events, num_events)
+
+    def test_link_lookaheads(self):
+        num_objects, seed, max_time = 6, 3, 20
+        num_events, histories = self.simulate_sequentially(num_objects, seed, max_time, min_delay=2)
+        partition = {f'passer_{index}': index // 2 for index in range(num_objects)}
+        lookahead = {TokenPasser: 2, HighPriorityTokenPasser: 1, (HighPriorityTokenPasser, TokenPasser): 2}
+        simulator = ConservativeSimulator(functools.partial(build_passers, num_objects, seed, min_delay=2), 3,
+                                          partition, lookahead, get_results=get_histories)
+        self.assertEqual(simulator.simulate(max_time).num_events, num_events)
+        parallel_histories = {}
+        for results in simulator.results:
+            parallel_histories.update(results)
+        self.assertEqual(parallel_histories, histories)
+
+    def test_exceptions(self):
+        with self.assertRaisesRegex(SimulatorError, 'num_partitions must be positive'):
+            ConservativeSimulator(build_canceller, 0, {}, 1)
+
+        simulator = ConservativeSimulator(functools.partial(build_passers, 4, 0), 2, {}, 1)
+        with self.assertRaisesRegex(SimulatorError, r'max_time \(0\) must be greater than time_init \(0.0\)'):
+            simulator.simulate(0)
+        with self.assertRaisesRegex(SimulatorError, "(?s)partition . failed:.*'passer_.' is assigned to partition "
+                                                    "'None'"):
+            simulator.simulate(10)
+
+        # a remote event's delay is less than the lookahead
+        simulator = ConservativeSimulator(functools.partial(build_passers, 4, 0), 2,
+                                          functools.partial(passer_partition, 2), 2)
+        with self.assertRaisesRegex(SimulatorError, r"(?s)failed:.*delay \(.*\) of event sent by 'passer_.' to "
+                                                    r"'passer_.' in another partition is less than the lookahead"):
+            simulator.simulate(10)
+
+        simulator = ConservativeSimulator(build_canceller, 2, {'passer_0': 0, 'passer_1': 1, 'canceller': 0}, 1)
+        with self.assertRaisesRegex(SimulatorError, "cannot cancel event sent to 'passer_1' in another partition"):
+            simulator.simulate(10)
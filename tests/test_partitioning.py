@@ -0,0 +1,133 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-30
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import functools
+import math
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.parallel import ConservativeSimulator
+from de_sim.partitioning import CommunicationGraph, CommunicationRecordingEventQueue
+from tests.test_parallel import Token, TokenPasser
+import de_sim
+
+
+class ClusteredTokenPasser(TokenPasser):
+    """ A :obj:`TokenPasser` that usually passes tokens to objects in its cluster """
+
+    def __init__(self, name, num_objects, seed, cluster_size, simulator=None):
+        self.cluster_size = cluster_size
+        super().__init__(name, num_objects, seed, simulator=simulator)
+
+    def handle_tokens(self, event_or_events):
+        events = event_or_events if isinstance(event_or_events, list) else [event_or_events]
+        self.history.append((self.time, [(event.message.sender, event.message.hops) for event in events]))
+        cluster = int(self.name.split('_')[1]) // self.cluster_size
+        for event in events:
+            if self.rng.random() < 0.95:
+                index = cluster * self.cluster_size + self.rng.randrange(self.cluster_size)
+            else:
+                index = self.rng.randrange(self.num_objects)
+            self.send_event(1 + self.rng.randint(0, 2), self.simulator.simulation_objects[f'passer_{index}'],
+                            Token(self.name, event.message.hops + 1))
+
+    event_handlers = [(Token, 'handle_tokens')]
+
+
+def build_clusters(num_clusters, cluster_size, seed, simulator):
+    num_objects = num_clusters * cluster_size
+    for index in range(num_objects):
+        ClusteredTokenPasser(f'passer_{index}', num_objects, seed, cluster_size, simulator=simulator)
+
+
+class TestCommunicationGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = graph = CommunicationGraph()
+        graph.add_object('idle')
+        graph.add_event('a', 'b', 2., volume=10)
+        graph.add_event('a', 'b', 1., volume=10)
+        graph.add_event('b', 'a', 3., volume=5)
+        graph.add_event('c', 'c', 4.)
+
+    def test_add_event(self):
+        graph = self.graph
+        self.assertEqual(graph.work, {'idle': 0, 'a': 1, 'b': 2, 'c': 1})
+        self.assertEqual(graph.edges, {('a', 'b'): [2, 20, 1., 3.], ('b', 'a'): [1, 5, 3., 3.],
+                                       ('c', 'c'): [1, 0, 4., 4.]})
+        self.assertEqual(graph.get_neighbors(), {'idle': {}, 'a': {'b': 3}, 'b': {'a': 3}, 'c': {}})
+        self.assertEqual(graph.get_delay_quantiles((0., 0.5, 1.)), {0.: 1., 0.5: 2.5, 1.: 4.})
+        self.assertTrue(math.isnan(CommunicationGraph().get_delay_quantiles((0.5,))[0.5]))
+
+    def test_evaluate(self):
+        evaluation = self.graph.evaluate({'idle': 1, 'a': 0, 'b': 1, 'c': 0}, remote_cost=0.5)
+        self.assertEqual(evaluation, dict(num_partitions=2, work=[2, 2], imbalance=1., num_events=4,
+                                          num_cut_events=3, cut_volume=25, min_cut_delay=1.,
+                                          estimated_speedup=4 / 3.5))
+        evaluation = self.graph.evaluate({'idle': 0, 'a': 0, 'b': 0, 'c': 0})
+        self.assertEqual(evaluation['min_cut_delay'], math.inf)
+        self.assertEqual(evaluation['estimated_speedup'], 1.)
+        with self.assertRaisesRegex(SimulatorError, 'objects are not assigned partitions: b, idle'):
+            self.graph.evaluate({'a': 0, 'c': 0})
+
+        report = self.graph.report({'idle': 1, 'a': 0, 'b': 1, 'c': 0})
+        self.assertIn('4 objects, 4 events, in 2 partitions', report)
+        self.assertIn('events between partitions: 3 (75.0%), 25 bytes', report)
+
+    def test_partition(self):
+        assignment = self.graph.partition(2)
+        self.assertEqual(set(assignment), {'idle', 'a', 'b', 'c'})
+        self.assertEqual(self.graph.evaluate(assignment)['work'], [2, 2])
+        # objects that exchange events share a partition, if the balance allows
+        assignment = self.graph.partition(2, imbalance=0.5)
+        self.assertEqual(assignment['a'], assignment['b'])
+        self.assertNotEqual(assignment['a'], assignment['c'])
+        self.assertEqual(self.graph.partition(1), {'idle': 0, 'a': 0, 'b': 0, 'c': 0})
+
+        with self.assertRaisesRegex(SimulatorError, 'num_partitions must be positive'):
+            self.graph.partition(0)
+        with self.assertRaisesRegex(SimulatorError, 'imbalance must be non-negative'):
+            self.graph.partition(2, imbalance=-1)
+
+
+class TestCommunicationRecordingEventQueue(unittest.TestCase):
+
+    def record(self, build_model, max_time, **kwargs):
+        simulator = de_sim.Simulator()
+        build_model(simulator)
+        event_queue = CommunicationRecordingEventQueue.install(simulator, **kwargs)
+        simulator.initialize()
+        num_events = simulator.simulate(max_time).num_events
+        return event_queue, num_events
+
+    def test_partition_clusters(self):
+        num_clusters, cluster_size, max_time = 3, 5, 40
+        build_model = functools.partial(build_clusters, num_clusters, cluster_size, 2)
+        event_queue, num_events = self.record(build_model, max_time)
+        graph = event_queue.graph
+        self.assertEqual(len(graph.work), num_clusters * cluster_size)
+        self.assertEqual(sum(edge[CommunicationGraph.NUM_EVENTS] for edge in graph.edges.values()),
+                         len(graph.delays))
+        self.assertTrue(all(0 < edge[CommunicationGraph.VOLUME] for edge in graph.edges.values()))
+        # the delay recorder still records delays
+        self.assertEqual(event_queue.get_min_delays(), {ClusteredTokenPasser: {Token: 0}})
+
+        assignment = graph.partition(num_clusters)
+        evaluation = graph.evaluate(assignment)
+        round_robin = graph.evaluate({name: int(name.split('_')[1]) % num_clusters for name in graph.work})
+        self.assertTrue(evaluation['num_cut_events'] < round_robin['num_cut_events'] / 4)
+        self.assertTrue(round_robin['estimated_speedup'] < evaluation['estimated_speedup'])
+        self.assertTrue(evaluation['imbalance'] < 1.2)
+        self.assertEqual(evaluation['min_cut_delay'], 1)
+
+        # a parallel simulator can use the partition
+        simulator = ConservativeSimulator(build_model, num_clusters, assignment, 1)
+        self.assertEqual(simulator.simulate(max_time).num_events, num_events)
+
+    def test_measure_volume(self):
+        event_queue, _ = self.record(functools.partial(build_clusters, 2, 2, 0), 10, measure_volume=False)
+        self.assertTrue(all(edge[CommunicationGraph.VOLUME] == 0 for edge in event_queue.graph.edges.values()))
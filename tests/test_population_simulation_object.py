@@ -0,0 +1,210 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-20
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import numpy
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.population_simulation_object import AgentEventsDue, PopulationSimulationObject
+import de_sim
+
+
+class Infect(de_sim.EventMessage):
+    "Infect an agent"
+    agent: int
+
+
+class Tick(de_sim.EventMessage):
+    "Tick"
+
+
+class Epidemic(PopulationSimulationObject):
+    """ A population of agents that are infected by other objects, and recover after integer delays """
+    __slots__ = ('infected', 'delays', 'history')
+
+    def __init__(self, name, size, delays, **kwargs):
+        super().__init__(name, size, **kwargs)
+        self.infected = numpy.zeros(size, dtype=bool)
+        self.delays = delays
+        self.history = []
+
+    def handle_message(self, event):
+        self.history.append((self.time, 'infect', event.message.agent))
+        self.infected[event.message.agent] = True
+        self.schedule_agent_events([event.message.agent], self.delays[event.message.agent])
+
+    def handle_agent_events(self, agents):
+        self.history.append((self.time, 'recover', list(agents)))
+        self.infected[agents] = False
+
+    event_handlers = PopulationSimulationObject.event_handlers + \
+        [(Infect, PopulationSimulationObject.handle_population_events)]
+    messages_sent = PopulationSimulationObject.messages_sent
+
+
+class Infector(de_sim.SimulationObject):
+
+    def __init__(self, name, population, infections, **kwargs):
+        super().__init__(name, **kwargs)
+        self.population = population
+        self.infections = infections
+
+    def init_before_run(self):
+        for time, agent in self.infections:
+            self.send_event(time, self.population, Infect(agent))
+
+    def handle_tick(self, event):
+        pass    # pragma: no cover
+
+    event_handlers = [(Tick, 'handle_tick')]
+    messages_sent = [Infect]
+
+
+class Stepper(PopulationSimulationObject):
+    """ A population whose agents each step forward by a random integer delay """
+
+    def __init__(self, name, size, seed, **kwargs):
+        super().__init__(name, size, **kwargs)
+        self.random_state = numpy.random.RandomState(seed)
+        self.steps = numpy.zeros(size, dtype=int)
+        self.batch_sizes = []
+
+    def init_before_run(self):
+        self.schedule_agent_events(numpy.arange(self.size), self.random_state.randint(1, 4, size=self.size))
+
+    def handle_agent_events(self, agents):
+        self.batch_sizes.append(len(agents))
+        self.steps[agents] += 1
+        self.schedule_agent_events(agents, self.random_state.randint(1, 4, size=len(agents)))
+
+
+class StepperAgent(de_sim.SimulationObject):
+    """ An agent in a population of individual simulation objects, equivalent to an agent in a :obj:`Stepper` """
+
+    def __init__(self, name, delays):
+        super().__init__(name)
+        self.delays = delays
+        self.steps = 0
+
+    def init_before_run(self):
+        self.send_event(next(self.delays), self, Tick())
+
+    def handle_tick(self, event):
+        self.steps += 1
+        self.send_event(next(self.delays), self, Tick())
+
+    event_handlers = [(Tick, 'handle_tick')]
+    messages_sent = [Tick]
+
+
+class TestPopulationSimulationObject(unittest.TestCase):
+
+    def test_batched_agent_events(self):
+        size, max_time = 50, 20
+        simulator = de_sim.Simulator()
+        stepper = Stepper('stepper', size, 7, simulator=simulator)
+        simulator.initialize()
+        num_handlers_called = simulator.simulate(max_time).num_events
+        # all agent events at each time are executed by one call to handle_agent_events()
+        self.assertEqual(num_handlers_called, max_time)
+        self.assertEqual(sum(stepper.batch_sizes), stepper.num_agent_events)
+        self.assertEqual(stepper.steps.sum(), stepper.num_agent_events)
+
+        # a model of individual agents that have the same delays takes the same steps
+        random_state = numpy.random.RandomState(7)
+        delays = [random_state.randint(1, 4, size=size)]
+        agent_delays = [[] for _ in range(size)]
+        for agent, delay in enumerate(delays[0]):
+            agent_delays[agent].append(delay)
+        time = 0
+        next_times = numpy.array(delays[0], dtype=float)
+        while True:
+            time = next_times.min()
+            if max_time < time:
+                break
+            agents = numpy.flatnonzero(next_times == time)
+            new_delays = random_state.randint(1, 4, size=len(agents))
+            for agent, delay in zip(agents, new_delays):
+                agent_delays[agent].append(delay)
+            next_times[agents] = time + new_delays
+        simulator = de_sim.Simulator()
+        agents = [StepperAgent(str(i), iter(agent_delays[i] + [max_time + 1])) for i in range(size)]
+        simulator.add_objects(agents)
+        simulator.initialize()
+        simulator.simulate(max_time)
+        self.assertEqual([agent.steps for agent in agents], list(stepper.steps))
+
+    def test_messages_from_other_objects(self):
+        simulator = de_sim.Simulator()
+        delays = numpy.array([3, 1, 1, 5])
+        epidemic = Epidemic('epidemic', len(delays), delays, simulator=simulator)
+        # agent 0 recovers at time 4, when agent 3 is infected
+        Infector('infector', epidemic, [(1, 0), (2, 1), (2, 2), (4, 3)], simulator=simulator)
+        simulator.initialize()
+        simulator.simulate(10)
+        self.assertEqual(epidemic.history, [(1, 'infect', 0),
+                                            (2, 'infect', 1),
+                                            (2, 'infect', 2),
+                                            (3, 'recover', [1, 2]),
+                                            (4, 'infect', 3),
+                                            (4, 'recover', [0]),
+                                            (9, 'recover', [3])])
+        self.assertEqual(epidemic.num_agent_events, 4)
+        self.assertFalse(epidemic.infected.any())
+        self.assertEqual(epidemic.agent_events_due_event, None)
+        self.assertTrue(simulator.event_queue.empty())
+
+    def test_schedule_and_cancel_agent_events(self):
+        simulator = de_sim.Simulator()
+        epidemic = Epidemic('epidemic', 5, None, simulator=simulator)
+        epidemic.schedule_agent_events(numpy.arange(5), 4.0)
+        first_event = epidemic.agent_events_due_event
+        self.assertEqual(first_event.event_time, 4)
+        # later events don't reschedule the pending AgentEventsDue event
+        epidemic.schedule_agent_events([1], 6.0)
+        self.assertIs(epidemic.agent_events_due_event, first_event)
+        # earlier events do
+        epidemic.schedule_agent_events(numpy.array([False, False, True, True, False]), [2.0, 3.0])
+        self.assertEqual(epidemic.agent_events_due_event.event_time, 2)
+        self.assertFalse(first_event.live)
+        self.assertEqual(simulator.event_queue.len(), 1)
+        self.assertEqual(list(epidemic.next_event_times), [4, 6, 2, 3, 4])
+        epidemic.schedule_agent_events([], 1.0)
+        # a mask that selects no agents schedules nothing
+        epidemic.schedule_agent_events(numpy.zeros(5, dtype=bool), 1.0)
+        self.assertEqual(epidemic.agent_events_due_event.event_time, 2)
+        self.assertEqual(simulator.event_queue.len(), 1)
+        epidemic.cancel_agent_events([0, 4])
+        self.assertEqual(list(epidemic.next_event_times), [numpy.inf, 6, 2, 3, numpy.inf])
+
+        simulator.initialize()
+        simulator.simulate(10)
+        self.assertEqual(epidemic.history, [(2, 'recover', [2]), (3, 'recover', [3]), (6, 'recover', [1])])
+
+    def test_exceptions(self):
+        simulator = de_sim.Simulator()
+        epidemic = Epidemic('epidemic', 3, None, simulator=simulator)
+        with self.assertRaisesRegex(SimulatorError, "delay < 0 in schedule_agent_events"):
+            epidemic.schedule_agent_events([0, 1], [1, -1])
+        with self.assertRaisesRegex(SimulatorError, "delay is 'NaN'"):
+            epidemic.schedule_agent_events([0], float('nan'))
+        with self.assertRaisesRegex(SimulatorError, r"delay for each of the 2 agents, but have shape \(3,\)"):
+            epidemic.schedule_agent_events(numpy.array([True, False, True]), [1, 2, 3])
+        with self.assertRaisesRegex(SimulatorError, r"delay for each of the 1 agents, but have shape \(2,\)"):
+            epidemic.schedule_agent_events([0], [1, 2])
+        with self.assertRaisesRegex(SimulatorError, "population size must be non-negative"):
+            Epidemic('bad', -1, None)
+
+        stepper = Stepper('stepper', 2, 1, simulator=simulator)
+        with self.assertRaisesRegex(SimulatorError, "'Stepper' does not handle 'Infect' messages"):
+            stepper.handle_population_events(de_sim.Event(0, 0, epidemic, stepper, Infect(0)))
+
+        # an empty population has no events
+        empty = Stepper('empty', 0, 1)
+        self.assertEqual(empty.next_event_times.size, 0)
+        empty.handle_population_events([de_sim.Event(0, 0, empty, empty, AgentEventsDue())])
+        self.assertEqual(empty.num_agent_events, 0)
@@ -0,0 +1,135 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-24
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import numpy
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.examples.sirs import SIR, ReplicatedSIR, SusceptibleToInfectious
+from de_sim.replicates import ReplicateModel, ReplicateRandomStreams, ReplicateSimulator
+from de_sim.testing.some_message_types import InitMsg, Eg1
+import de_sim
+
+
+class PoissonProcess(ReplicateModel):
+    """ Replicates that count the events of a Poisson process, and alternate between two message types """
+
+    def init_before_run(self, replicates):
+        self.counts = numpy.zeros(len(replicates), dtype=int)
+        self.schedule_events(replicates, self.random.exponential(replicates, 1.0), InitMsg)
+
+    def handle_init(self, replicates):
+        self.counts[replicates] += 1
+        self.schedule_events(replicates, self.random.exponential(replicates, 1.0), Eg1)
+
+    def handle_eg1(self, replicates):
+        self.counts[replicates] += 1
+        self.schedule_events(replicates, self.random.exponential(replicates, 1.0), InitMsg)
+
+    event_handlers = [(InitMsg, 'handle_init'), (Eg1, 'handle_eg1')]
+
+
+class TestReplicateRandomStreams(unittest.TestCase):
+
+    def test_streams_match_random_states(self):
+        seeds = [3, 1, 4, 1]
+        block_size = 5
+        streams = ReplicateRandomStreams(seeds, block_size=block_size)
+        random_states = [numpy.random.RandomState(seed) for seed in seeds]
+        expected = [[] for _ in seeds]
+        actual = [[] for _ in seeds]
+        for draw in range(3 * block_size):
+            # draw from varying subsets of the replicates
+            replicates = numpy.array([r for r in range(len(seeds)) if (r + draw) % 3])
+            if draw % 2:
+                values = streams.random_sample(replicates)
+                for replicate in replicates:
+                    expected[replicate].append(random_states[replicate].random_sample())
+            else:
+                scales = 1.0 / (replicates + 1.5)
+                values = streams.exponential(replicates, scales)
+                for replicate, scale in zip(replicates, scales):
+                    expected[replicate].append(random_states[replicate].exponential(scale))
+            for replicate, value in zip(replicates, values):
+                actual[replicate].append(value)
+        self.assertEqual(actual, expected)
+
+
+class TestReplicateSimulator(unittest.TestCase):
+
+    def test_sir_replicates_match_sequential_runs(self):
+        num_replicates = 40
+        max_time = 60
+        sir_args = dict(s=98, i=2, N=100, beta=0.3, gamma=0.15)
+        seeds = list(range(100, 100 + num_replicates))
+
+        replicated_sir = ReplicatedSIR(**sir_args)
+        replicate_simulator = ReplicateSimulator(replicated_sir, num_replicates, seeds=seeds)
+        num_events = replicate_simulator.simulate(max_time)
+
+        for replicate, seed in enumerate(seeds):
+            simulator = de_sim.Simulator()
+            sir = SIR('sir', recording_period=10, **sir_args)
+            sir.random_state = numpy.random.RandomState(seed)
+            simulator.add_object(sir)
+            simulator.initialize()
+            self.assertEqual(simulator.simulate(max_time).num_events, num_events[replicate])
+            self.assertEqual((sir.s, sir.i), (replicated_sir.s[replicate], replicated_sir.i[replicate]))
+            self.assertEqual(sir.time, replicate_simulator.time[replicate])
+
+        # both major and minor outbreaks occur
+        self.assertTrue(len(set(replicated_sir.s)) > 1)
+
+    def test_simulate(self):
+        model = PoissonProcess()
+        simulator = ReplicateSimulator(model, 20)
+        self.assertIs(model.simulator, simulator)
+        num_events = simulator.simulate(50)
+        self.assertEqual(list(num_events), list(model.counts))
+        self.assertTrue((simulator.time <= 50).all())
+        self.assertTrue((50 < simulator.next_event_times).all())
+        # a Poisson process with rate 1 has about 50 events by time 50
+        self.assertTrue(30 < num_events.mean() < 70)
+
+        # replicates are reproducible
+        rerun_num_events = ReplicateSimulator(PoissonProcess(), 20, seeds=simulator.seeds).simulate(50)
+        self.assertEqual(list(num_events), list(rerun_num_events))
+
+        # time_init
+        num_events = ReplicateSimulator(PoissonProcess(), 20, seeds=simulator.seeds).simulate(60, time_init=10)
+        self.assertEqual(list(num_events), list(rerun_num_events))
+
+    def test_exceptions(self):
+        with self.assertRaisesRegex(SimulatorError, 'num_replicates must be positive'):
+            ReplicateSimulator(PoissonProcess(), 0)
+        with self.assertRaisesRegex(SimulatorError, '2 seeds provided for 3 replicates'):
+            ReplicateSimulator(PoissonProcess(), 3, seeds=[1, 2])
+
+        class BadMessageType(ReplicateModel):
+            event_handlers = [(int, 'handle')]
+        with self.assertRaisesRegex(SimulatorError, "is not a subclass of EventMessage"):
+            ReplicateSimulator(BadMessageType(), 3)
+
+        class BadHandler(ReplicateModel):
+            event_handlers = [(InitMsg, 'no_such_handler')]
+        with self.assertRaisesRegex(SimulatorError, "'BadHandler' does not have handler 'no_such_handler'"):
+            ReplicateSimulator(BadHandler(), 3)
+
+        model = PoissonProcess()
+        simulator = ReplicateSimulator(model, 3)
+        simulator.simulate(1)
+        replicates = numpy.arange(3)
+        with self.assertRaisesRegex(SimulatorError, "'PoissonProcess' does not handle "
+                                                    "'SusceptibleToInfectious' messages"):
+            model.schedule_events(replicates, 1, SusceptibleToInfectious)
+        with self.assertRaisesRegex(SimulatorError, "delay is 'NaN'"):
+            model.schedule_events(replicates, float('nan'), InitMsg)
+        with self.assertRaisesRegex(SimulatorError, r"delay < 0 in schedule_events\(\): -1"):
+            model.schedule_events(replicates, [1, -1, 2], InitMsg)
+        with self.assertRaisesRegex(SimulatorError, "a replicate can have only one pending event"):
+            model.schedule_events(replicates, 1, InitMsg)
+        model.schedule_events([], 1, InitMsg)
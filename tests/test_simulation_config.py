@@ -111,6 +111,21 @@ class TestSimulationConfig(unittest.TestCase):
             cfg = SimulationConfig(self.max_time, object_memory_change_interval=-3)
             cfg.validate_individual_fields()
 
+        with self.assertRaisesRegex(SimulatorError, "event_count_interval .* must be non-negative"):
+            cfg = SimulationConfig(self.max_time, event_count_interval=-1)
+            cfg.validate_individual_fields()
+
+        with self.assertRaisesRegex(SimulatorError, "event_queue_backend .* must be one of"):
+            cfg = SimulationConfig(self.max_time, event_queue_backend='no_such_backend')
+            cfg.validate_individual_fields()
+
+        cfg = SimulationConfig(self.max_time, trace_file=os.path.join(self.tmp_dir, '.', 'trace'))
+        cfg.validate_individual_fields()
+        self.assertEqual(cfg.trace_file, os.path.join(self.tmp_dir, 'trace'))
+        with self.assertRaisesRegex(SimulatorError, "directory of trace_file .* does not exist"):
+            cfg = SimulationConfig(self.max_time, trace_file=os.path.join(self.tmp_dir, 'missing_dir', 'trace'))
+            cfg.validate_individual_fields()
+
     def test_all_fields(self):
         profile = True
         kwargs = dict(max_time=self.max_time,
@@ -148,6 +163,12 @@ class TestSimulationConfig(unittest.TestCase):
             self.simulation_config.validate()
 
         self.simulation_config.max_time = 10
+        self.simulation_config.strict_event_recycling = True
+        with self.assertRaisesRegex(SimulatorError, 'strict_event_recycling requires recycle_events'):
+            self.simulation_config.validate()
+        self.simulation_config.recycle_events = True
+        self.simulation_config.validate()
+
         self.simulation_config.profile = True
         self.simulation_config.object_memory_change_interval = 100
         with self.assertRaisesRegex(SimulatorError, 'profile and object_memory_change_interval cannot both be active'):
@@ -11,8 +11,8 @@ import unittest
 import warnings
 
 from de_sim.errors import SimulatorError
-from de_sim.simulation_object import (SimulationObject, SimulationObjMeta, SimulationObjectMetadata,
-                                      SimObjClassPriority)
+from de_sim.simulation_object import (BaseSimulationObject, SimulationObject, SimulationObjMeta,
+                                      SimulationObjectMetadata, SimObjClassPriority)
 from de_sim.testing.example_simulation_objects import (ALL_MESSAGE_TYPES, ExampleSimulationObject,
                                                        ImproperlyRegisteredSimulationObject)
 from de_sim.testing.some_message_types import InitMsg, Eg1, MsgWithAttrs, UnregisteredMsg
@@ -41,6 +41,41 @@ class SOwithDefaultClassPriority(SimulationObject):
     event_handlers = [(InitMsg, 'handler')]
 
 
+class FrozenMsg(de_sim.EventMessage, frozen=True):
+    "Frozen message"
+    values: list
+
+
+class MutableMsg(de_sim.EventMessage):
+    "Mutable message"
+    values: list
+
+
+class SOwithMessageBodies(ExampleSimulationObject):
+    def handler(self, event):
+        pass  # pragma: no cover
+    event_handlers = [(FrozenMsg, 'handler'), (MutableMsg, 'handler')]
+    messages_sent = [FrozenMsg, MutableMsg]
+
+
+class SlottedSimulationObject(SimulationObject):
+    __slots__ = ('state',)
+
+    def __init__(self, name, state, simulator=None):
+        super().__init__(name, simulator=simulator)
+        self.state = state
+
+    def handler(self, event):
+        self.state += 1
+
+    event_handlers = [(Eg1, 'handler')]
+    messages_sent = [Eg1]
+
+
+class SOwithMinDelays(ExampleSimulationObject):
+    min_delays = {Eg1: 2}
+
+
 class TestSimulationObjMeta(unittest.TestCase):
 
     def test_correct_code(self):
@@ -98,6 +133,53 @@ class TestSimulationObjMeta(unittest.TestCase):
         # test inherited class_priority
         self.assertEqual(SOwithoutEventHandlers.class_priority, SimObjClassPriority.HIGH)
 
+    def test_min_delays(self):
+        self.assertEqual(ExampleSimulationObject.metadata.min_delays, {})
+        self.assertEqual(SOwithMinDelays.metadata.min_delays, {Eg1: 2})
+
+        # declarations are inherited for the message types that are still sent
+        class SOsubclass(SOwithMinDelays):
+            pass
+        self.assertEqual(SOsubclass.metadata.min_delays, {Eg1: 2})
+
+        class SOsendingInitMsgs(SOwithMinDelays):
+            messages_sent = [InitMsg]
+        self.assertEqual(SOsendingInitMsgs.metadata.min_delays, {})
+
+        with self.assertRaisesRegex(SimulatorError, "'min_delays' must be a dict"):
+            class BadSO1(ExampleSimulationObject):
+                min_delays = [(Eg1, 2)]
+        with self.assertRaisesRegex(SimulatorError, "'MsgWithAttrs' in 'min_delays' must be in 'messages_sent'"):
+            class BadSO2(ExampleSimulationObject):
+                min_delays = {MsgWithAttrs: 2}
+        for min_delay in [-1, float('nan'), '2']:
+            with self.assertRaisesRegex(SimulatorError, "minimum delay of 'Eg1' messages in 'min_delays' must be a "
+                                                        "non-negative number"):
+                class BadSO3(ExampleSimulationObject):
+                    min_delays = {Eg1: min_delay}
+
+    def test_dispatch_tables(self):
+
+        class SOwithSharedHandler(SimulationObject):
+            def handler_a(self, event):
+                pass
+
+            def handler_b(self, event):
+                pass
+            event_handlers = [(InitMsg, handler_a), (MsgWithAttrs, handler_b), (Eg1, handler_a)]
+            messages_sent = [InitMsg]
+
+        class SOsubclass(SOwithSharedHandler):
+            pass
+
+        for so_class in [SOwithSharedHandler, SOsubclass]:
+            self.assertIs(so_class._dispatch_table, so_class.metadata.event_handlers_dict)
+            self.assertIs(so_class._superposition_groups, so_class.metadata.superposition_groups)
+            self.assertEqual(so_class._dispatch_table[Eg1], SOwithSharedHandler.handler_a)
+            self.assertEqual(so_class._superposition_groups,
+                             {InitMsg: frozenset([InitMsg, Eg1]), Eg1: frozenset([InitMsg, Eg1]),
+                              MsgWithAttrs: frozenset([MsgWithAttrs])})
+
     def test_errors(self):
         warnings.simplefilter("ignore")
 
@@ -241,6 +323,33 @@ class TestSimulationObject(unittest.TestCase):
         self.assertEqual(0, self.eso1.num_events)
         self.assertEqual(None, self.eso1.simulator)
 
+    def test_slotted_simulation_object(self):
+        simulator = de_sim.Simulator()
+        sim_obj = SlottedSimulationObject('slotted', 3, simulator=simulator)
+        self.assertFalse(hasattr(sim_obj, '__dict__'))
+        self.assertEqual(sim_obj.state, 3)
+        with self.assertRaises(AttributeError):
+            sim_obj.undeclared_attribute = 1
+        # subclasses that don't declare __slots__ still have a __dict__
+        self.assertTrue(hasattr(self.eso1, '__dict__'))
+
+        # an object constructed with a simulator shares its config and loggers, and is added to it
+        self.assertIs(simulator.get_object('slotted'), sim_obj)
+        self.assertIs(sim_obj.simulator, simulator)
+        self.assertIs(sim_obj.debug_logs, simulator.debug_logs)
+        self.assertIs(sim_obj.fast_debug_file_logger, simulator.fast_debug_file_logger)
+        self.assertIs(sim_obj.fast_plot_file_logger, simulator.fast_plotting_logger)
+        for option in ['log_events', 'trusted_sends', 'copy_event_bodies']:
+            self.assertEqual(getattr(sim_obj, option), simulator.de_sim_config[option])
+        with self.assertRaisesRegex(SimulatorError, "cannot add simulation object 'slotted'"):
+            SlottedSimulationObject('slotted', 4, simulator=simulator)
+
+        # a slotted object can run
+        simulator.initialize()
+        sim_obj.send_event(1, sim_obj, Eg1())
+        self.assertEqual(simulator.simulate(5).num_events, 1)
+        self.assertEqual(sim_obj.state, 4)
+
     def test_set_simulator(self):
         simulator = de_sim.Simulator()
         o1 = ExampleSimulationObject('o1')
@@ -265,6 +374,52 @@ class TestSimulationObject(unittest.TestCase):
         with self.assertRaisesRegex(SimulatorError, "event_time is 'NaN'"):
             self.eso1.send_event_absolute(float('NaN'), self.eso1, UnregisteredMsg())
 
+    def test_checked_routes(self):
+        route = (ExampleSimulationObject, ExampleSimulationObject, Eg1)
+        BaseSimulationObject.checked_routes.discard(route)
+        self.o1.send_event(1, self.o2, Eg1())
+        self.assertIn(route, BaseSimulationObject.checked_routes)
+        # invalid routes are not cached
+        with self.assertRaises(SimulatorError):
+            self.o1.send_event(1, self.o2, UnregisteredMsg())
+        self.assertNotIn((ExampleSimulationObject, ExampleSimulationObject, UnregisteredMsg),
+                         BaseSimulationObject.checked_routes)
+        # times are checked on every send
+        with self.assertRaisesRegex(SimulatorError, "event_time is 'NaN'"):
+            self.o1.send_event_absolute(float('NaN'), self.o2, Eg1())
+
+    def test_min_delays(self):
+        simulator = de_sim.Simulator()
+        sender = SOwithMinDelays('sender', simulator=simulator)
+        receiver = ExampleSimulationObject('receiver', simulator=simulator)
+        simulator.initialize()
+        sender.send_event(2, receiver, Eg1())
+        sender.send_event(0, receiver, InitMsg())
+        expected = r"delay \(1\) of 'Eg1' message sent by 'sender' is less than the minimum delay \(2\) " \
+                   r"declared by 'SOwithMinDelays'"
+        with self.assertRaisesRegex(SimulatorError, expected):
+            sender.send_event(1, receiver, Eg1())
+        with self.assertRaisesRegex(SimulatorError, expected):
+            sender.send_event_absolute(1, receiver, Eg1())
+        with self.assertRaisesRegex(SimulatorError, expected):
+            sender.send_events([(2, receiver, Eg1()), (1, receiver, Eg1())])
+        with self.assertRaisesRegex(SimulatorError, expected):
+            sender.send_event_multicast(1, [receiver], Eg1())
+        self.assertEqual(simulator.event_queue.len(), 2)
+
+        # trusted sends aren't checked
+        sender.trusted_sends = True
+        sender.send_event(1, receiver, Eg1())
+
+    def test_trusted_sends(self):
+        self.o1.trusted_sends = True
+        # the message type isn't checked, but the event queue checks the event's times
+        self.o1.send_event(1, self.o2, UnregisteredMsg())
+        self.o1.send_events([(1, self.o2, UnregisteredMsg())])
+        self.assertEqual(self.simulator.event_queue.len(), 2)
+        with self.assertRaisesRegex(SimulatorError, 'send_time .* and/or receive_time .* is NaN'):
+            self.o1.send_event_absolute(float('NaN'), self.o2, Eg1())
+
     def test_get_receiving_priorities_dict(self):
         self.assertTrue(ExampleSimulationObject.metadata.event_handler_priorities[InitMsg] <
                         ExampleSimulationObject.metadata.event_handler_priorities[Eg1])
@@ -286,6 +441,101 @@ class TestSimulationObject(unittest.TestCase):
                     self.o2.simulator.event_queue.next_events()
                 self.assertEqual(self.o2.simulator.event_queue.next_events(), [])
 
+    def test_send_events_in_bulk(self):
+        for copy in [False, True]:
+            message = Eg1()
+            events = self.o1.send_events([(2, self.o2, message), (1, self.o1, InitMsg()), (1, self.o2, Eg1())],
+                                         copy=copy)
+            self.assertEqual([(event.event_time, event.receiving_object) for event in events],
+                             [(2, self.o2), (1, self.o1), (1, self.o2)])
+            self.assertEqual(events[0].message is message, not copy)
+            event_queue = self.simulator.event_queue
+            self.assertEqual(event_queue.len(), 3)
+            self.assertEqual(event_queue.next_events(), [events[1]])
+            self.assertEqual(event_queue.next_events(), [events[2]])
+            self.assertEqual(event_queue.next_events(), [events[0]])
+
+        with self.assertRaisesRegex(SimulatorError, re.escape("delay < 0 in send_events(): -1")):
+            self.o1.send_events([(1, self.o2, Eg1()), (-1, self.o2, Eg1())])
+        with self.assertRaisesRegex(SimulatorError, "delay is 'NaN'"):
+            self.o1.send_events([(float('nan'), self.o2, Eg1())])
+        with self.assertRaisesRegex(SimulatorError, "not registered to send 'UnregisteredMsg' messages"):
+            self.o1.send_events([(1, self.o2, UnregisteredMsg())])
+        self.assertTrue(self.simulator.event_queue.empty())
+
+    def test_copy_event_bodies(self):
+        simulator = de_sim.Simulator()
+        sender, receiver = SOwithMessageBodies('sender'), SOwithMessageBodies('receiver')
+        simulator.add_objects([sender, receiver])
+        simulator.initialize()
+        self.assertFalse(sender.copy_event_bodies)
+        for copy_event_bodies in [False, True]:
+            sender.copy_event_bodies = copy_event_bodies
+            frozen_msg, mutable_msg = FrozenMsg([1]), MutableMsg([1])
+            events = [sender.send_event(1, receiver, frozen_msg), sender.send_event(1, receiver, mutable_msg)]
+            events.extend(sender.send_events([(1, receiver, frozen_msg), (1, receiver, mutable_msg)]))
+            # frozen messages are never copied
+            for event in events[0::2]:
+                self.assertIs(event.message, frozen_msg)
+            for event in events[1::2]:
+                self.assertEqual(event.message is mutable_msg, not copy_event_bodies)
+                self.assertEqual(event.message._values(), mutable_msg._values())
+
+            # the copy argument overrides copy_event_bodies
+            for copy in [False, True]:
+                self.assertIs(sender.send_event(1, receiver, frozen_msg, copy=copy).message, frozen_msg)
+                self.assertEqual(sender.send_event(1, receiver, mutable_msg, copy=copy).message is mutable_msg,
+                                 not copy)
+
+    def test_send_event_multicast(self):
+        simulator = de_sim.Simulator()
+        sender = SOwithMessageBodies('sender')
+        receivers = [SOwithMessageBodies(f'receiver_{i}') for i in range(5)] + [ExampleSimulationObject('other')]
+        simulator.add_objects([sender] + receivers)
+        simulator.initialize()
+
+        frozen_msg = FrozenMsg([1])
+        events = sender.send_event_multicast(2, receivers[:-1], frozen_msg)
+        self.assertEqual([event.receiving_object for event in events], receivers[:-1])
+        for event in events:
+            self.assertEqual(event.event_time, 2)
+            self.assertIs(event.message, frozen_msg)
+        self.assertEqual(sender.send_event_multicast(1, [], frozen_msg), [])
+
+        mutable_msg = MutableMsg([1])
+        events = sender.send_event_multicast(1, iter(receivers[:2]), mutable_msg, copy=True)
+        self.assertEqual(len({id(event.message) for event in events}), 2)
+        self.assertEqual(events[0].message._values(), mutable_msg._values())
+        self.assertIsNot(events[0].message, mutable_msg)
+        self.assertEqual(simulator.event_queue.len(), 7)
+        for event in events:
+            self.assertEqual(simulator.event_queue.next_events(), [event])
+
+        with self.assertRaisesRegex(SimulatorError, "'.*ExampleSimulationObject' simulation objects not "
+                                                    "registered to receive 'FrozenMsg' messages"):
+            sender.send_event_multicast(1, receivers, frozen_msg)
+        with self.assertRaisesRegex(SimulatorError, re.escape("delay < 0 in send_event_multicast(): -1")):
+            sender.send_event_multicast(-1, receivers[:-1], frozen_msg)
+        with self.assertRaisesRegex(SimulatorError, "delay is 'NaN'"):
+            sender.send_event_multicast(float('nan'), receivers[:-1], frozen_msg)
+        self.assertEqual(simulator.event_queue.len(), 5)
+
+    def test_cancel_event(self):
+        event_queue = self.simulator.event_queue
+        timeout = self.o1.send_event(3, self.o2, Eg1())
+        self.assertEqual(timeout.event_time, 3)
+        event = self.o1.send_event_absolute(2, self.o2, InitMsg())
+        self.o1.cancel_event(timeout)
+        self.assertEqual(event_queue.len(), 1)
+        self.assertEqual(event_queue.next_events(), [event])
+        self.assertEqual(event_queue.next_events(), [])
+
+        event = self.o1.send_event(1, self.o2, Eg1())
+        with self.assertRaisesRegex(SimulatorError, "'o2' cannot cancel an event sent by 'o1'"):
+            self.o2.cancel_event(event)
+        with self.assertRaisesRegex(SimulatorError, 'already been cancelled or executed'):
+            self.o1.cancel_event(timeout)
+
     def test_simultaneous_event_times(self):
         self.o1.send_event(0, self.o2, Eg1())
         self.o1.send_event(2, self.o2, InitMsg())
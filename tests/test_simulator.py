@@ -6,11 +6,13 @@
 """
 
 from capturer import CaptureOutput
+from collections import Counter
 from datetime import datetime
 from logging2 import LogRegister
 from logging2.levels import LogLevel
 import contextlib
 import cProfile
+import gc
 import io
 import os
 import pstats
@@ -25,8 +27,10 @@ import warnings
 
 from de_sim.config import core
 from de_sim.errors import SimulatorError
+from de_sim.event_queue_backends import EVENT_QUEUE_BACKENDS
 from de_sim.simulation_config import SimulationConfig
 from de_sim.simulation_metadata import SimulationMetadata, AuthorMetadata
+from de_sim.simulation_object import SimObjClassPriority
 from de_sim.simulator import EventQueue
 from de_sim.template_sim_objs import TemplatePeriodicSimulationObject
 from de_sim.testing.some_message_types import InitMsg, Eg1, MsgWithAttrs
@@ -114,6 +118,165 @@ class TestEventQueue(unittest.TestCase):
         for event in next_events:
             self.assertEqual(event.receiving_object, self.receiver2)
 
+    def test_next_event_batch(self):
+        for backend in EVENT_QUEUE_BACKENDS:
+            event_queue = EventQueue(backend=backend)
+            self.assertEqual(event_queue.next_event_batch(), (float('inf'), None, []))
+            receiver2 = ExampleSimulationObject('receiver2')
+            for receiver in [self.receiver, receiver2, self.receiver, receiver2, self.receiver]:
+                event_queue.schedule_event(0, 1, self.sender, receiver, Eg1())
+            event_queue.schedule_event(0, 1, self.sender, self.receiver, InitMsg())
+            event_queue.schedule_event(0, 2, self.sender, self.receiver, InitMsg())
+
+            # events after max_time are not popped
+            self.assertEqual(event_queue.next_event_batch(max_time=0.5), (1, self.receiver, []))
+            self.assertEqual(event_queue.len(), 7)
+
+            # receiver sorts before receiver2
+            time, receiver, events = event_queue.next_event_batch()
+            self.assertEqual((time, receiver), (1, self.receiver))
+            # InitMsg has a higher priority than Eg1
+            self.assertEqual([type(event.message) for event in events], [InitMsg, Eg1, Eg1, Eg1])
+            time, receiver, events = event_queue.next_event_batch()
+            self.assertEqual((time, receiver, len(events)), (1, receiver2, 2))
+            time, receiver, events = event_queue.next_event_batch()
+            self.assertEqual((time, receiver, len(events)), (2, self.receiver, 1))
+            self.assertTrue(event_queue.empty())
+
+    def test_schedule_events(self):
+        for backend in EVENT_QUEUE_BACKENDS:
+            event_queue = EventQueue(backend=backend)
+            num_events = 100
+            event_times = [random.uniform(0, 10) for _ in range(num_events)]
+            # small batches are pushed and large batches are heapified
+            for batch in [event_times[:2], event_times[2:]]:
+                events = event_queue.schedule_events([(0, event_time, self.sender, self.receiver, InitMsg())
+                                                      for event_time in batch])
+                self.assertEqual([event.event_time for event in events], batch)
+            self.assertEqual(event_queue.len(), num_events)
+            popped_times = []
+            while not event_queue.empty():
+                popped_times.extend([event.event_time for event in event_queue.next_events()])
+            self.assertEqual(popped_times, sorted(event_times))
+
+        # no events are scheduled if any is invalid
+        with self.assertRaisesRegex(SimulatorError, 'receive_time < send_time'):
+            self.event_queue.schedule_events([(0, 1, self.sender, self.receiver, InitMsg()),
+                                              (2, 1, self.sender, self.receiver, InitMsg())])
+        self.assertEqual(self.event_queue.len(), self.num_events)
+
+    def test_schedule_multicast(self):
+        receivers = [ExampleSimulationObject(f'multicast_receiver_{i}') for i in range(4)]
+        message = Eg1()
+        self.assertEqual(self.event_queue.schedule_multicast(0, 1, self.sender, [], message), [])
+        events = self.event_queue.schedule_multicast(0, 0.5, self.sender, receivers, message)
+        self.assertEqual([event.receiving_object for event in events], receivers)
+        self.assertEqual(self.event_queue.len(), self.num_events + len(receivers))
+        for event in events:
+            self.assertEqual((event.event_time, event.message), (0.5, message))
+            self.assertIs(event.message, message)
+        popped = [self.event_queue.next_events() for _ in receivers]
+        self.assertEqual(sorted(event for events in popped for event in events), sorted(events))
+
+        event_queue = EventQueue()
+        event_queue.event_pool = de_sim.event.EventPool()
+        events = event_queue.schedule_multicast(0, 1, self.sender, receivers, message)
+        self.assertEqual(event_queue.event_pool.num_allocated, len(receivers))
+
+        with self.assertRaisesRegex(SimulatorError, 'receive_time < send_time'):
+            self.event_queue.schedule_multicast(2, 1, self.sender, receivers, message)
+        self.event_queue.ranked_receivers = True
+        receivers[0].event_rank = 0
+        with self.assertRaisesRegex(SimulatorError, "receiving object 'multicast_receiver_1' has no event_rank"):
+            self.event_queue.schedule_multicast(0, 1, self.sender, receivers, message)
+        self.assertEqual(self.event_queue.len(), self.num_events)
+
+    def test_bulk_scheduling(self):
+        self.event_queue.start_bulk_scheduling()
+        self.event_queue.schedule_event(0, 0.5, self.sender, self.receiver, InitMsg())
+        self.event_queue.schedule_events([(0, 0.25, self.sender, self.receiver, InitMsg())])
+        self.assertEqual(self.event_queue.len(), self.num_events)
+        self.event_queue.end_bulk_scheduling()
+        self.assertEqual(self.event_queue.len(), self.num_events + 2)
+        self.assertEqual(self.event_queue.next_event_time(), 0.25)
+        self.event_queue.end_bulk_scheduling()
+        self.assertEqual(self.event_queue.deferred_events, None)
+
+        # a deferred event that's cancelled isn't counted as a tombstone, and isn't inserted
+        self.event_queue.start_bulk_scheduling()
+        events = [self.event_queue.schedule_event(0, 3, self.sender, self.receiver, InitMsg()) for _ in range(2)]
+        self.event_queue.cancel_event(events[0])
+        self.assertEqual(self.event_queue.num_cancelled, 0)
+        self.assertEqual(self.event_queue.len(), self.num_events + 2)
+        self.event_queue.end_bulk_scheduling()
+        self.assertEqual(self.event_queue.len(), self.num_events + 3)
+        self.assertEqual(len(self.event_queue.backend), self.num_events + 3)
+
+    def test_cancel_event(self):
+        for backend in EVENT_QUEUE_BACKENDS:
+            event_queue = EventQueue(backend=backend)
+            receiver2 = ExampleSimulationObject('receiver2')
+            events = [event_queue.schedule_event(0, 1, self.sender, receiver, InitMsg())
+                      for receiver in [self.receiver, self.receiver, receiver2]]
+            event_2 = event_queue.schedule_event(0, 2, self.sender, self.receiver, InitMsg())
+
+            # cancel an event in the middle of a batch
+            event_queue.cancel_event(events[1])
+            self.assertEqual(event_queue.len(), 3)
+            self.assertEqual(event_queue.num_cancelled, 1)
+            self.assertEqual(len(event_queue.render(as_list=True)), 3 + 1)
+            self.assertEqual(event_queue.next_events(), [events[0]])
+            self.assertEqual(event_queue.num_cancelled, 0)
+
+            # cancel the earliest event
+            event_queue.cancel_event(events[2])
+            self.assertEqual(event_queue.next_event_time(), 2)
+            self.assertEqual(event_queue.next_event_obj(), self.receiver)
+            self.assertEqual(event_queue.next_event_batch(), (2, self.receiver, [event_2]))
+            self.assertTrue(event_queue.empty())
+
+            # cancelled and executed events cannot be cancelled
+            for event in [events[0], events[2]]:
+                with self.assertRaisesRegex(SimulatorError, 'it has already been cancelled or executed'):
+                    event_queue.cancel_event(event)
+
+            # cancelled events are not moved into a new backend
+            event = event_queue.schedule_event(0, 3, self.sender, self.receiver, InitMsg())
+            event_queue.cancel_event(event)
+            event_queue.set_backend('heap' if backend != 'heap' else 'ladder')
+            self.assertEqual((len(event_queue.backend), event_queue.num_cancelled), (0, 0))
+
+    def test_compaction(self):
+        event_queue = EventQueue()
+        num_events = 4 * EventQueue.MIN_COMPACTION_SIZE
+        events = [event_queue.schedule_event(0, i, self.sender, self.receiver, InitMsg())
+                  for i in range(num_events)]
+        random.shuffle(events)
+        # cancellation compacts the backend when more than half of its events have been cancelled
+        for event in events[:num_events // 2]:
+            event_queue.cancel_event(event)
+        self.assertEqual(len(event_queue.backend), num_events)
+        event_queue.cancel_event(events[num_events // 2])
+        self.assertEqual(event_queue.num_cancelled, 0)
+        num_live = num_events // 2 - 1
+        self.assertEqual(len(event_queue.backend), num_live)
+        self.assertEqual(event_queue.len(), num_live)
+        event_times = []
+        while not event_queue.empty():
+            event_times.extend([event.event_time for event in event_queue.next_events()])
+        self.assertEqual(event_times, sorted(event.event_time for event in events[num_events // 2 + 1:]))
+
+    def test_inactive_logging(self):
+        # events aren't formatted for an inactive log
+        def log_event(event):
+            raise ValueError('event logged')
+        self.event_queue.log_event = log_event
+        self.event_queue.fast_debug_file_logger.active = False
+        self.assertEqual(len(self.event_queue.next_events()), 1)
+        self.event_queue.fast_debug_file_logger.active = True
+        with self.assertRaisesRegex(ValueError, 'event logged'):
+            self.event_queue.next_events()
+
     def test_exceptions(self):
         eq = EventQueue()
 
@@ -160,6 +323,29 @@ class TestEventQueue(unittest.TestCase):
         for attr in MsgWithAttrs.__slots__:
             self.assertIn("\t{}:".format(attr), test_eq.render())
 
+    def test_backends(self):
+        for backend in EVENT_QUEUE_BACKENDS:
+            event_queue = EventQueue(backend=backend)
+            self.assertIsInstance(event_queue.backend, EVENT_QUEUE_BACKENDS[backend])
+            for i in range(self.num_events):
+                event_queue.schedule_event(i, i + 1, self.sender, self.receiver, InitMsg())
+            self.assertEqual(event_queue.render(), self.event_queue.render())
+            self.assertEqual(event_queue.next_event_time(), 1)
+
+        with self.assertRaisesRegex(SimulatorError, "unknown event queue backend 'no_such_backend'"):
+            EventQueue(backend='no_such_backend')
+
+    def test_set_backend(self):
+        rendered = self.event_queue.render()
+        backend = self.event_queue.backend
+        self.event_queue.set_backend('heap')
+        self.assertIs(self.event_queue.backend, backend)
+        for name in ['ladder', 'calendar', 'two_level', 'heap']:
+            self.event_queue.set_backend(name)
+            self.assertIsInstance(self.event_queue.backend, EVENT_QUEUE_BACKENDS[name])
+            self.assertEqual(self.event_queue.len(), self.num_events)
+            self.assertEqual(self.event_queue.render(), rendered)
+
     def test_filtered_render(self):
         # test multiple receivers and filtered by receiver
         receiver2 = ExampleSimulationObject('receiver2')
@@ -453,6 +639,19 @@ class TestSimulator(unittest.TestCase):
         self.simulator.reset()
         self.assertEqual(len(self.simulator.simulation_objects), 0)
 
+    def test_event_counts(self):
+        expected_counts = {0: 0, 1: 9, 2: 5}
+        for event_count_interval, expected_count in expected_counts.items():
+            self.simulator.reset()
+            objs = [ExampleSimulationObject(obj_name(i)) for i in range(1, 4)]
+            self.simulator.add_objects(objs)
+            self.simulator.initialize()
+            sim_config = SimulationConfig(5.0, event_count_interval=event_count_interval)
+            self.assertEqual(self.simulator.simulate(sim_config=sim_config).num_events, 9)
+            self.assertEqual(sum(self.simulator.event_counts.values()), expected_count)
+        self.assertEqual(set(sim_obj for sim_obj, _ in self.simulator.event_counts), set(objs))
+        self.assertEqual(len(self.simulator.provide_event_counts().split('\n')), 1 + len(self.simulator.event_counts))
+
     def test_multi_interacting_object_simulation(self):
         num_sim_objects = 3
         sim_objects = [InteractingSimulationObject(obj_name(i)) for i in range(num_sim_objects)]
@@ -476,6 +675,103 @@ class TestSimulator(unittest.TestCase):
         self.simulator.initialize()
         self.assertTrue(0 < self.simulator.simulate(20).num_events)
 
+    def test_rank_objects(self):
+        self.simulator.integer_event_order_keys = True
+
+        class LowPrioritySimulationObject(BasicExampleSimulationObject):
+            def __init__(self, name, **kwargs):
+                de_sim.SimulationObject.__init__(self, name, **kwargs)
+            class_priority = SimObjClassPriority.LOW
+
+        class HighPrioritySimulationObject(BasicExampleSimulationObject):
+            class_priority = SimObjClassPriority.HIGH
+
+        low_1 = LowPrioritySimulationObject('a')
+        low_2 = LowPrioritySimulationObject('b')
+        # equal (class priority, tiebreaker) pairs receive equal ranks
+        low_3 = LowPrioritySimulationObject('c', event_time_tiebreaker='b')
+        high = HighPrioritySimulationObject('z')
+        self.simulator.add_objects([low_1, low_2, low_3, high])
+
+        # an event scheduled before ranks are assigned is re-keyed
+        self.simulator.event_queue.schedule_event(0, 1, high, low_1, InitMsg())
+        self.simulator.initialize()
+        self.assertEqual([sim_obj.event_rank for sim_obj in [high, low_1, low_2, low_3]], [0, 1, 2, 2])
+        for event in self.simulator.event_queue.backend:
+            self.assertEqual(len(event._order_time), 2)
+        self.assertEqual(self.simulator.event_queue.next_event_obj(), high)
+        self.assertEqual(len(self.simulator.event_queue.next_events()), 1)
+        self.assertEqual(self.simulator.event_queue.next_event_obj(), low_1)
+        events = self.simulator.event_queue.next_events()
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]._order_time, (1, low_1.event_rank))
+
+        # events must be sent to objects in the simulation
+        not_added = LowPrioritySimulationObject('not_added')
+        with self.assertRaisesRegex(SimulatorError, "receiving object 'not_added' has no event_rank"):
+            high.send_event(1, not_added, InitMsg())
+
+        self.simulator.reset()
+        self.assertEqual(low_1.event_rank, None)
+
+        # ranks are not assigned if integer_event_order_keys is not set
+        self.simulator.integer_event_order_keys = False
+        self.simulator.add_objects([low_1, high])
+        self.simulator.initialize()
+        self.assertEqual(low_1.event_rank, None)
+
+    def test_cancel_event_during_initialization(self):
+
+        class CancellingSimulationObject(de_sim.SimulationObject):
+            def init_before_run(self):
+                self.send_event(1, self, InitMsg())
+                self.cancel_event(self.send_event(2, self, InitMsg()))
+
+            def handle_event(self, event):
+                pass
+
+            event_handlers = [(InitMsg, handle_event)]
+            messages_sent = [InitMsg]
+
+        self.simulator.add_object(CancellingSimulationObject('cancelling'))
+        self.simulator.initialize()
+        self.assertEqual(self.simulator.event_queue.len(), 1)
+        self.assertEqual(self.simulator.event_queue.num_cancelled, 0)
+        self.assertEqual(self.simulator.simulate(10).num_events, 1)
+
+    def test_recycle_events(self):
+
+        class RetainingSimulationObject(de_sim.SimulationObject):
+            def init_before_run(self):
+                self.send_event(1, self, InitMsg())
+
+            def handle_event(self, event):
+                self.retained = event
+                if self.time < 3:
+                    self.send_event(1, self, InitMsg())
+
+            event_handlers = [(InitMsg, handle_event)]
+            messages_sent = [InitMsg]
+
+        def make_simulation():
+            self.simulator.reset()
+            sim_obj = RetainingSimulationObject('retaining')
+            self.simulator.add_object(sim_obj)
+            self.simulator.initialize()
+            return sim_obj
+
+        # events retained by a handler are not recycled
+        sim_obj = make_simulation()
+        self.simulator.simulate(sim_config=SimulationConfig(10, recycle_events=True))
+        self.assertEqual(self.simulator.event_pool.num_retained, 3)
+        self.assertEqual(sim_obj.retained.event_time, 3)
+        self.assertEqual(sim_obj.retained.receiving_object, sim_obj)
+
+        make_simulation()
+        with self.assertRaisesRegex(SimulatorError, "event at time 1 to 'retaining' is still referenced"):
+            self.simulator.simulate(sim_config=SimulationConfig(10, recycle_events=True,
+                                                                strict_event_recycling=True))
+
     def test_message_queues(self):
         warnings.simplefilter("ignore")
         # test with an empty event queue
@@ -654,6 +950,41 @@ class TestSimulator(unittest.TestCase):
         print(f'Performance summary, written to {performance_log}')
         print("\n".join(unprofiled_perf))
 
+    @unittest.skip("takes about 1 min.")
+    def test_event_recycling_performance(self):
+        # compare the events allocated, garbage collections and run time with and without event recycling
+        existing_levels = self.suspend_logging(self.log_names)
+        simulator = de_sim.Simulator()
+        end_sim_time = 200
+        num_sim_objs = 1000
+        gc_collections = Counter()
+
+        def count_collections(phase, info):
+            if phase == 'start':
+                gc_collections[info['generation']] += 1
+
+        gc.callbacks.append(count_collections)
+        print()
+        print(f"Event recycling performance on a cyclical messaging network of {num_sim_objs} objects")
+        perf = ["recycle events\t# events\tevents allocated\tgen 0, 1, 2 GCs\trun time (s)".expandtabs(18)]
+        for recycle_events in [False, True]:
+            self.prep_simulation(simulator, num_sim_objs)
+            gc.collect()
+            gc_collections.clear()
+            start_time = time.process_time()
+            sim_config = SimulationConfig(end_sim_time, recycle_events=recycle_events)
+            num_events = simulator.simulate(sim_config=sim_config).num_events
+            run_time = time.process_time() - start_time
+            events_allocated = num_events
+            if recycle_events:
+                events_allocated = simulator.event_pool.num_allocated
+            collections = ', '.join(str(gc_collections[generation]) for generation in range(3))
+            perf.append(f"{recycle_events}\t{num_events}\t{events_allocated}\t{collections}\t"
+                        f"{run_time:8.3f}".expandtabs(18))
+        gc.callbacks.remove(count_collections)
+        self.restore_logging_levels(self.log_names, existing_levels)
+        print("\n".join(perf))
+
     def test_profiling(self):
         existing_levels = self.suspend_logging(self.log_names)
         simulator = de_sim.Simulator()
@@ -777,6 +1108,75 @@ class TestSimulationReproducibility(unittest.TestCase):
             self.assertEqual(0, sim_obj.disordered_delicates)
 
 
+class TracingSimulationObject(de_sim.SimulationObject):
+    """ Send messages at random to random objects, and record the events handled in a shared trace """
+
+    def __init__(self, name, trace):
+        super().__init__(name)
+        self.trace = trace
+
+    def init_before_run(self):
+        self.send_random_events()
+
+    def send_random_events(self):
+        for _ in range(random.randrange(3)):
+            receiver = random.choice(list(self.simulator.get_objects()))
+            delay = random.choice([0, 1, 2, random.expovariate(1.0)])
+            message = random.choice([InitMsg(), Delicate(random.randrange(3))])
+            self.send_event(delay, receiver, message)
+
+    def handle_superposed_events(self, event_list):
+        if not isinstance(event_list, list):
+            event_list = [event_list]
+        for event in event_list:
+            self.trace.append((event.event_time, self.name, type(event.message).__name__,
+                               event.message.values()))
+        self.send_random_events()
+
+    event_handlers = [(InitMsg, handle_superposed_events), (Delicate, handle_superposed_events)]
+
+    messages_sent = [InitMsg, Delicate]
+
+
+class TestEventQueueBackendReproducibility(unittest.TestCase):
+
+    def run_traced_simulation(self, backend, seed=7, num_sim_objs=20, max_time=30,
+                              integer_event_order_keys=False, **sim_config_kwargs):
+        random.seed(seed)
+        trace = []
+        self.simulator = simulator = de_sim.Simulator()
+        simulator.integer_event_order_keys = integer_event_order_keys
+        for i in range(num_sim_objs):
+            simulator.add_object(TracingSimulationObject(obj_name(i), trace))
+        simulator.initialize()
+        sim_config = SimulationConfig(max_time, event_queue_backend=backend, **sim_config_kwargs)
+        num_events = simulator.simulate(sim_config=sim_config).num_events
+        return num_events, trace
+
+    def test_identical_results(self):
+        heap_num_events, heap_trace = self.run_traced_simulation('heap')
+        self.assertTrue(100 < heap_num_events)
+        for backend in ['calendar', 'ladder', 'two_level']:
+            num_events, trace = self.run_traced_simulation(backend)
+            self.assertEqual(heap_num_events, num_events)
+            self.assertEqual(heap_trace, trace)
+
+    def test_integer_event_order_keys(self):
+        num_events, trace = self.run_traced_simulation('heap')
+        self.assertEqual((num_events, trace),
+                         self.run_traced_simulation('heap', integer_event_order_keys=True))
+
+    def test_recycle_events(self):
+        num_events, trace = self.run_traced_simulation('heap')
+        self.assertEqual(self.simulator.event_pool, None)
+        for backend in EVENT_QUEUE_BACKENDS:
+            self.assertEqual((num_events, trace),
+                             self.run_traced_simulation(backend, recycle_events=True, strict_event_recycling=True))
+            event_pool = self.simulator.event_pool
+            self.assertTrue(num_events / 2 < event_pool.num_reused)
+            self.assertEqual(event_pool.num_retained, 0)
+
+
 class Double(de_sim.EventMessage):
     'Double value'
 
@@ -0,0 +1,229 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-28
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import copy
+import functools
+import numpy
+import random
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.time_warp import StateSaver, TimeWarpSimulator
+from de_sim.testing.some_message_types import InitMsg
+from tests.test_parallel import (Token, TokenPasser, build_canceller, build_passers, get_histories,
+                                 passer_partition)
+import de_sim
+
+
+class Timeout(de_sim.EventMessage):
+    "A timeout"
+
+
+class TimedTokenPasser(TokenPasser):
+    """ A :obj:`TokenPasser` that restarts a timer whenever it receives tokens """
+
+    def __init__(self, name, num_objects, seed, min_delay=1, simulator=None):
+        self.timer = None
+        super().__init__(name, num_objects, seed, min_delay=min_delay, simulator=simulator)
+
+    def handle_tokens(self, event_or_events):
+        super().handle_tokens(event_or_events)
+        if self.timer is not None and self.timer.live:
+            self.cancel_event(self.timer)
+        # timeouts occur between the integer times of tokens
+        self.timer = self.send_event(2.5, self, Timeout())
+
+    def handle_timeout(self, event):
+        self.history.append((self.time, 'timeout'))
+
+    event_handlers = [(Token, 'handle_tokens'), (Timeout, 'handle_timeout')]
+    messages_sent = [Token, Timeout]
+
+
+def build_timed_passers(num_objects, seed, simulator):
+    for index in range(num_objects):
+        TimedTokenPasser(f'passer_{index}', num_objects, seed, simulator=simulator)
+
+
+class SlottedObject(de_sim.SimulationObject):
+    __slots__ = ('count', '__private', 'rng', 'partner', 'event')
+
+    def __init__(self, name, simulator=None):
+        super().__init__(name, simulator=simulator)
+        self.count = 0
+        self.__private = [1]
+        self.rng = random.Random(1)
+
+    def init_before_run(self):
+        pass
+
+    def handle_init(self, event):
+        pass
+
+    event_handlers = [(InitMsg, 'handle_init')]
+
+
+class DictObject(de_sim.SimulationObject):
+
+    def __init__(self, name, simulator=None):
+        super().__init__(name, simulator=simulator)
+        self.values = {'a': [1, 2]}
+        self.random_state = numpy.random.RandomState(3)
+        self.parameters = {'rate': 1}
+
+    constant_attributes = ('parameters',)
+
+    def init_before_run(self):
+        pass
+
+    def handle_init(self, event):
+        pass
+
+    event_handlers = [(InitMsg, 'handle_init')]
+
+
+class TestStateSaver(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = de_sim.Simulator()
+        self.slotted = SlottedObject('slotted', simulator=self.simulator)
+        self.dict_object = DictObject('dict_object', simulator=self.simulator)
+        self.state_saver = StateSaver(self.simulator)
+
+    def test_get_state_slots(self):
+        self.assertEqual(self.state_saver.get_state_slots(SlottedObject),
+                         ['count', '_SlottedObject__private', 'rng', 'partner', 'event', 'time', 'num_events'])
+        self.assertEqual(self.state_saver.get_state_slots(DictObject), ['time', 'num_events'])
+
+    def test_save_and_restore(self):
+        slotted = self.slotted
+        slotted.partner = self.dict_object
+        slotted.event = de_sim.Event(0, 1, slotted, self.dict_object, InitMsg())
+        rng = slotted.rng
+        state = self.state_saver.save(slotted)
+        random_numbers = [rng.random() for _ in range(3)]
+        slotted.count = 2
+        slotted._SlottedObject__private.append(2)
+        event = slotted.event
+        del slotted.partner
+        slotted.time = 4
+        self.state_saver.restore(slotted, state)
+        self.assertEqual(slotted.count, 0)
+        self.assertEqual(slotted._SlottedObject__private, [1])
+        self.assertIs(slotted.partner, self.dict_object)
+        self.assertIs(slotted.event, event)
+        self.assertEqual(slotted.time, 0)
+        # random number generators are restored in place
+        self.assertIs(slotted.rng, rng)
+        self.assertEqual([rng.random() for _ in range(3)], random_numbers)
+
+        # unset slots are unset again
+        state = self.state_saver.save(slotted)
+        slotted.partner = None
+        del slotted.event
+        self.state_saver.restore(slotted, state)
+        self.assertIs(slotted.partner, self.dict_object)
+        self.assertIs(slotted.event, event)
+
+        dict_object = self.dict_object
+        random_state = dict_object.random_state
+        state = self.state_saver.save(dict_object)
+        random_numbers = random_state.random_sample(3)
+        dict_object.values['a'].append(3)
+        dict_object.added = 1
+        parameters = dict_object.parameters
+        self.state_saver.restore(dict_object, state)
+        self.assertEqual(dict_object.values, {'a': [1, 2]})
+        self.assertFalse(hasattr(dict_object, 'added'))
+        # constant attributes are not saved
+        self.assertNotIn('parameters', state[0])
+        self.assertIs(dict_object.parameters, parameters)
+        self.assertIs(dict_object.random_state, random_state)
+        numpy.testing.assert_array_equal(random_state.random_sample(3), random_numbers)
+
+    def test_events_are_not_copied(self):
+
+        class Holder(object):
+            __slots__ = ('event',)
+
+        dict_object = self.dict_object
+        event = de_sim.Event(0, 1, self.slotted, dict_object, InitMsg())
+        holder = Holder()
+        holder.event = event
+        dict_object.timers = {'a': [event], 'b': (1, [event])}
+        dict_object.holder = holder
+        attributes, _ = self.state_saver.save(dict_object)
+        self.assertIsNot(attributes['timers']['a'], dict_object.timers['a'])
+        self.assertIs(attributes['timers']['a'][0], event)
+        self.assertIs(attributes['timers']['b'][1][0], event)
+        self.assertIsNot(attributes['holder'], holder)
+        self.assertIs(attributes['holder'].event, event)
+        self.assertEqual(self.state_saver.find_events([[event, holder], {1: 2}]), {id(event): event})
+
+        # other deep copies of events are copies
+        event_copy = copy.deepcopy(event, {id(self.slotted): self.slotted, id(dict_object): dict_object})
+        self.assertIsNot(event_copy, event)
+        self.assertIs(event_copy.receiving_object, dict_object)
+
+
+class TestTimeWarpSimulator(unittest.TestCase):
+
+    def simulate_sequentially(self, build_model, max_time):
+        simulator = de_sim.Simulator()
+        build_model(simulator)
+        simulator.initialize()
+        num_events = simulator.simulate(max_time).num_events
+        return num_events, get_histories(simulator.simulation_objects.values())
+
+    def check_time_warp(self, build_model, num_partitions, max_time, **kwargs):
+        num_events, histories = self.simulate_sequentially(build_model, max_time)
+        simulator = TimeWarpSimulator(build_model, num_partitions, functools.partial(passer_partition, num_partitions),
+                                      get_results=get_histories, **kwargs)
+        self.assertEqual(simulator.simulate(max_time).num_events, num_events)
+        self.assertEqual(sum(simulator.partition_num_events), num_events)
+        parallel_histories = {}
+        for results in simulator.results:
+            parallel_histories.update(results)
+        self.assertEqual(parallel_histories, histories)
+        for stats in simulator.partition_stats:
+            self.assertEqual(set(stats), {'num_rollbacks', 'num_rolled_back', 'num_gvt_rounds'})
+            self.assertTrue(0 < stats['num_gvt_rounds'])
+        return simulator
+
+    def test_matches_sequential_simulation(self):
+        for num_partitions in [1, 2, 3]:
+            with self.subTest(num_partitions=num_partitions):
+                simulator = self.check_time_warp(functools.partial(build_passers, 12, 7), num_partitions, 40,
+                                                 gvt_interval=20)
+                if num_partitions == 1:
+                    self.assertEqual(simulator.partition_stats[0]['num_rollbacks'], 0)
+
+    def test_rollback_of_cancellations(self):
+        # rolled back handlers cancel timers, and send the timers that they cancel
+        for num_partitions in [2, 3]:
+            with self.subTest(num_partitions=num_partitions):
+                self.check_time_warp(functools.partial(build_timed_passers, 9, 2), num_partitions, 30,
+                                     gvt_interval=10)
+
+    def test_time_window(self):
+        self.check_time_warp(functools.partial(build_passers, 8, 4), 2, 30, gvt_interval=5, time_window=2)
+
+    def test_exceptions(self):
+        with self.assertRaisesRegex(SimulatorError, 'gvt_interval must be positive'):
+            TimeWarpSimulator(build_canceller, 2, {}, gvt_interval=0)
+        with self.assertRaisesRegex(SimulatorError, 'time_window must be positive'):
+            TimeWarpSimulator(build_canceller, 2, {}, time_window=0)
+
+        simulator = TimeWarpSimulator(build_canceller, 2, {'passer_0': 0, 'passer_1': 1, 'canceller': 0})
+        with self.assertRaisesRegex(SimulatorError, "cannot cancel event sent to 'passer_1' in another partition"):
+            simulator.simulate(10)
+
+        # with zero delays, passers send tokens that execute before the senders' tokens
+        simulator = TimeWarpSimulator(functools.partial(build_passers, 6, 0, min_delay=0), 2,
+                                      functools.partial(passer_partition, 2))
+        with self.assertRaisesRegex(SimulatorError, "(?s)failed:.*would execute before the sender's events"):
+            simulator.simulate(10)
@@ -0,0 +1,107 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-12-01
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from de_sim.critical_path import CausalityGraph, TracingEventQueue
+from de_sim.errors import SimulatorError
+from de_sim.event import Event
+from de_sim.simulation_config import SimulationConfig
+from de_sim.trace import EventTrace, HEADER, RECORD, TraceWriter
+from de_sim.visualize import EventCoordinates, SimulationEventMessage, SpaceTime
+from tests.test_parallel import Token, build_passers
+import de_sim
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.trace_file = os.path.join(self.tmp_dir, 'trace')
+        self.simulator = de_sim.Simulator()
+        build_passers(3, 0, self.simulator)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def make_event(self, send_time, receive_time, sender, receiver):
+        objects = self.simulator.simulation_objects
+        return Event(send_time, receive_time, objects[sender], objects[receiver], Token(sender, 0))
+
+    def test_write_and_read(self):
+        events = [self.make_event(0., 1., 'passer_0', 'passer_1'),
+                  self.make_event(0., 1., 'passer_2', 'passer_1'),
+                  self.make_event(0.5, 2., 'passer_2', 'passer_2'),
+                  self.make_event(1., 3., 'passer_1', 'passer_0'),
+                  self.make_event(2., 3.5, 'passer_2', 'passer_0')]
+        with TraceWriter(self.trace_file, block_size=2) as trace_writer:
+            trace_writer.write_events(events[:1])
+            trace_writer.write_events(events[1:])
+            self.assertEqual(trace_writer.num_records, 4)
+        self.assertEqual(trace_writer.num_records, 5)
+        trace_writer.close()
+
+        trace = EventTrace(self.trace_file)
+        self.assertEqual(len(trace), 5)
+        self.assertEqual(trace.object_names, ['passer_0', 'passer_1', 'passer_2'])
+        self.assertEqual(trace.message_type_names, ['Token'])
+        self.assertEqual(trace.send_times.tolist(), [0., 0., 0.5, 1., 2.])
+        self.assertEqual(trace.receive_times.tolist(), [1., 1., 2., 3., 3.5])
+        self.assertEqual(trace.senders.tolist(), [0, 2, 2, 1, 2])
+        self.assertEqual(trace.receivers.tolist(), [1, 1, 2, 0, 0])
+        self.assertEqual(trace.message_types.tolist(), [0] * 5)
+        self.assertEqual(trace.get_event_messages()[3],
+                         SimulationEventMessage('Token', EventCoordinates('passer_1', 1.),
+                                                EventCoordinates('passer_0', 3.)))
+        self.assertTrue(HEADER.size + 5 * RECORD.size < os.path.getsize(self.trace_file))
+
+    def test_empty_trace(self):
+        TraceWriter(self.trace_file).close()
+        trace = EventTrace(self.trace_file)
+        self.assertEqual(len(trace), 0)
+        self.assertEqual(trace.get_event_messages(), [])
+
+    def test_exceptions(self):
+        with self.assertRaisesRegex(SimulatorError, 'block_size must be positive'):
+            TraceWriter(self.trace_file, block_size=0)
+
+        trace_writer = TraceWriter(self.trace_file)
+        trace_writer.write_events([self.make_event(0., 1., 'passer_0', 'passer_1')])
+        trace_writer.flush()
+        with self.assertRaisesRegex(SimulatorError, 'is incomplete'):
+            EventTrace(self.trace_file)
+        trace_writer.close()
+        self.assertEqual(len(EventTrace(self.trace_file)), 1)
+
+        not_a_trace = os.path.join(self.tmp_dir, 'not_a_trace')
+        with open(not_a_trace, 'w') as file:
+            file.write('# 2020-12-01 12:00:00\n')
+        self.assertFalse(EventTrace.is_event_trace(not_a_trace))
+        with self.assertRaisesRegex(SimulatorError, 'is not an event trace'):
+            EventTrace(not_a_trace)
+
+    def test_simulation_trace(self):
+        simulator = de_sim.Simulator()
+        build_passers(6, 1, simulator)
+        event_queue = TracingEventQueue.install(simulator)
+        simulator.initialize()
+        simulator.simulate(sim_config=SimulationConfig(20, trace_file=self.trace_file))
+        self.assertTrue(0 < simulator.trace_writer.num_records)
+
+        # the trace contains the executed events, in the order they were executed
+        event_messages = [SimulationEventMessage(*record[:3]) for record in event_queue.trace]
+        trace = EventTrace(self.trace_file)
+        self.assertEqual(len(trace), simulator.trace_writer.num_records)
+        self.assertEqual(trace.get_event_messages(), event_messages)
+        self.assertEqual(SpaceTime().get_data(self.trace_file), event_messages)
+
+        unit_work_graph = CausalityGraph()
+        unit_work_graph.add_trace(event_messages)
+        self.assertEqual(CausalityGraph.read_plot_log(self.trace_file).predecessors, unit_work_graph.predecessors)
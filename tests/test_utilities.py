@@ -118,6 +118,21 @@ class TestFastLogger(unittest.TestCase):
             fast_logger.fast_log(message)
             self.assertTrue(capturer.get_text().endswith(message))
 
+    def test_fast_log_format_args(self):
+
+        class Unformattable(object):
+            def __format__(self, format_spec):
+                raise ValueError('formatted')
+
+        # an inactive logger doesn't format its message
+        fast_logger = FastLogger(self.fixture_logger, 'info')
+        fast_logger.fast_log('{} {}', 'x', Unformattable())
+
+        with CaptureOutput(relay=False) as capturer:
+            fast_logger = FastLogger(self.fixture_logger, self.fixture_level.name)
+            fast_logger.fast_log('hi {} {:4.1f}', 'mom', 3)
+            self.assertTrue(capturer.get_text().endswith('hi mom  3.0'))
+
     def test_config(self):
         debug_config = core.get_debug_logs_config(cfg_path=('tests', 'fixtures/config/debug.default.cfg'))
         debug_log_manager = DebugLogsManager().setup_logs(debug_config)
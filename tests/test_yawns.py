@@ -0,0 +1,111 @@
+"""
+:Author: Arthur Goldberg <Arthur.Goldberg@mssm.edu>
+:Date: 2020-11-29
+:Copyright: 2020, Karr Lab
+:License: MIT
+"""
+
+import functools
+import math
+import unittest
+
+from de_sim.errors import SimulatorError
+from de_sim.yawns import SharedMailboxes, YawnsSimulator
+from tests.test_parallel import (Token, TokenPasser, HighPriorityTokenPasser, build_canceller, build_passers,
+                                 get_histories, passer_partition)
+import de_sim
+
+
+def values(events):
+    # event messages that aren't frozen are equal only to themselves, so compare their values
+    return [(*event[:4], event[4]._values()) for event in events]
+
+
+class TestSharedMailboxes(unittest.TestCase):
+
+    def setUp(self):
+        self.mailboxes = SharedMailboxes(3, 64)
+
+    def tearDown(self):
+        self.mailboxes.unlink()
+
+    def test_post_and_read(self):
+        mailboxes = self.mailboxes
+        events = [(0., 2., 'passer_0', 'passer_1', Token('passer_0', 0)),
+                  (0., 1., 'passer_0', 'passer_1', Token('passer_0', 1))]
+        mailboxes.post(0, 0, [[], events, []], 3.)
+        mailboxes.post(0, 1, [[], [], []], 4.)
+        mailboxes.post(0, 2, [[], [], []], math.inf)
+        self.assertEqual(values(mailboxes.read(0, 0, 1)), values(events))
+        self.assertEqual(mailboxes.read(0, 0, 2), [])
+        self.assertEqual(list(mailboxes.get_next_times(0)), [3., 1., math.inf])
+
+        # the other parity's mailboxes are independent
+        mailboxes.post(1, 0, [[], [], events[:1]], 5.)
+        self.assertEqual(values(mailboxes.read(1, 0, 2)), values(events[:1]))
+        self.assertEqual(values(mailboxes.read(0, 0, 1)), values(events))
+
+    def test_grow(self):
+        mailboxes = self.mailboxes
+        # another process that attaches to the mailboxes
+        reader = SharedMailboxes(*mailboxes.__getstate__())
+        try:
+            events = [(0., float(time), 'passer_0', 'passer_2', Token('passer_0', time)) for time in range(20)]
+            mailboxes.post(0, 0, [[], [], events], 0.)
+            self.assertEqual(mailboxes.generations[0, 0], 1)
+            self.assertEqual(values(reader.read(0, 0, 2)), values(events))
+            mailboxes.post(0, 0, [[], [], events[:1]], 0.)
+            self.assertEqual(mailboxes.generations[0, 0], 1)
+            self.assertEqual(values(reader.read(0, 0, 2)), values(events[:1]))
+        finally:
+            reader.close()
+
+
+class TestYawnsSimulator(unittest.TestCase):
+
+    def simulate_sequentially(self, build_model, max_time):
+        simulator = de_sim.Simulator()
+        build_model(simulator)
+        simulator.initialize()
+        num_events = simulator.simulate(max_time).num_events
+        return num_events, get_histories(simulator.simulation_objects.values())
+
+    def check_yawns(self, build_model, num_partitions, partition, lookahead, max_time, **kwargs):
+        num_events, histories = self.simulate_sequentially(build_model, max_time)
+        simulator = YawnsSimulator(build_model, num_partitions, partition, lookahead, get_results=get_histories,
+                                   **kwargs)
+        self.assertEqual(simulator.simulate(max_time).num_events, num_events)
+        self.assertEqual(sum(simulator.partition_num_events), num_events)
+        parallel_histories = {}
+        for results in simulator.results:
+            parallel_histories.update(results)
+        self.assertEqual(parallel_histories, histories)
+        # all partitions take the same steps
+        self.assertEqual(len({stats['num_steps'] for stats in simulator.partition_stats}), 1)
+        return simulator
+
+    def test_matches_sequential_simulation(self):
+        for num_partitions in [1, 2, 3]:
+            with self.subTest(num_partitions=num_partitions):
+                simulator = self.check_yawns(functools.partial(build_passers, 12, 7), num_partitions,
+                                             functools.partial(passer_partition, num_partitions), 1, 40)
+                if num_partitions == 1:
+                    self.assertEqual(simulator.partition_stats[0]['num_steps'], 1)
+
+    def test_link_lookaheads(self):
+        partition = {f'passer_{index}': index // 2 for index in range(6)}
+        lookahead = {TokenPasser: 2, HighPriorityTokenPasser: 1, (HighPriorityTokenPasser, TokenPasser): 2}
+        self.check_yawns(functools.partial(build_passers, 6, 3, min_delay=2), 3, partition, lookahead, 20)
+
+    def test_mailboxes_grow(self):
+        self.check_yawns(functools.partial(build_passers, 12, 5), 2, functools.partial(passer_partition, 2), 1, 20,
+                         mailbox_size=1)
+
+    def test_exceptions(self):
+        with self.assertRaisesRegex(SimulatorError, 'mailbox_size must be positive'):
+            YawnsSimulator(build_canceller, 2, {}, 1, mailbox_size=0)
+
+        # partition 0 fails while partition 1 waits at the barrier
+        simulator = YawnsSimulator(build_canceller, 2, {'passer_0': 0, 'passer_1': 1, 'canceller': 0}, 1)
+        with self.assertRaisesRegex(SimulatorError, "cannot cancel event sent to 'passer_1' in another partition"):
+            simulator.simulate(10)